@@ -1,9 +1,12 @@
 import streamlit as st
-from utils import load_data, create_bad_column, create_new_features
-import pandas as pd
+from utils import load_preview
+from profiling import begin_page, end_page
 
 # Configuração da página
 st.set_page_config(page_title="Case OpenCo", layout="wide")
+begin_page("Pagina Inicial")
+# Sem o worker de pré-cálculo aqui: ele é iniciado pela primeira página que lê a base,
+# e a página inicial não importa `precompute` nem disputa CPU com ele no início a frio
 
 # Título principal
 st.markdown("""
@@ -16,8 +19,8 @@ Você pode navegar pelas respostas de cada pergunta utilizando a barra lateral.
 Além disso, todas as análises realizadas estão disponíveis em um notebook, que pode ser encontrado na pasta **Notebooks** deste repositório.
 """)
 
-# Exemplo de pré-carregamento leve dos dados
-df = load_data()
-
+# Só as primeiras linhas do CSV: a página inicial não espera a base inteira
 st.markdown("### Visualização rápida da base (primeiras linhas)")
-st.dataframe(df.head())
+st.dataframe(load_preview())
+
+end_page()
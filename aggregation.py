@@ -0,0 +1,312 @@
+import os
+import pickle
+import streamlit as st
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from profiling import profiled
+from utils import (
+    ARTIFACTS, BAD_ATRASO_DIAS, CACHE_DIR, DATA_PATH, LOSS_CORTE, REGIOES, cache_stem, data_version, iter_contract_chunks,
+    percent_of
+)
+
+# Colunas lidas do arquivo para montar o agregado
+AGGREGATE_COLUMNS: List[str] = [
+    'estado', 'setor', 'taxa', 'atraso_corrente', 'prazo',
+    'valor_contrato', 'valor_contrato_mais_juros', 'valor_em_aberto'
+]
+GROUP_COLUMNS: List[str] = ['estado', 'setor', 'regiao']
+# Pasta ou padrão glob de partições (ver `partitions.py`) de onde o app lê o agregado
+PARTITIONS_ENV = 'APP_PARTITIONS'
+
+
+@dataclass
+class PortfolioAggregate:
+    """
+    Estado parcial e mesclável das métricas da carteira.
+
+    Guarda apenas somas, somas ponderadas e contagens, de modo que blocos da base
+    (ou partições processadas em paralelo) podem ser agregados separadamente e
+    combinados com `merge`, com memória limitada ao tamanho de um bloco.
+
+    Atributos:
+    - n_contratos (int): Número de contratos agregados.
+    - soma_valor_contrato (float): Soma de 'valor_contrato'.
+    - soma_taxa_ponderada (float): Soma de 'taxa' * 'valor_contrato'.
+    - soma_prazo_ponderado (float): Soma de 'prazo' * 'valor_contrato'.
+    - n_bad (int): Contratos com 'Bad' == 1.
+    - n_loss (int): Contratos com 'Loss_cat' == 1.
+    - group_counts (dict[str, pd.DataFrame]): Para cada coluna de GROUP_COLUMNS, contagens
+      de 'Contratos', 'Bad' e 'Loss_cat' por categoria.
+    """
+    n_contratos: int = 0
+    soma_valor_contrato: float = 0.0
+    soma_taxa_ponderada: float = 0.0
+    soma_prazo_ponderado: float = 0.0
+    n_bad: int = 0
+    n_loss: int = 0
+    group_counts: dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    def update(self, chunk: pd.DataFrame) -> 'PortfolioAggregate':
+        """
+        Incorpora um bloco de contratos ao estado parcial.
+
+        Parâmetros:
+        - chunk (pd.DataFrame): Bloco com as colunas de AGGREGATE_COLUMNS.
+
+        Retorna:
+        - PortfolioAggregate: O próprio agregado, atualizado.
+        """
+        return self.merge(PortfolioAggregate.from_frame(chunk))
+
+    def merge(self, other: 'PortfolioAggregate') -> 'PortfolioAggregate':
+        """
+        Combina dois agregados parciais, atualizando este.
+
+        Parâmetros:
+        - other (PortfolioAggregate): Agregado de outro bloco ou partição.
+
+        Retorna:
+        - PortfolioAggregate: O próprio agregado, atualizado.
+        """
+        return self._combine(other, 1)
+
+    def subtract(self, other: 'PortfolioAggregate') -> 'PortfolioAggregate':
+        """
+        Remove do estado parcial a contribuição de um subconjunto já agregado.
+
+        Usado na ingestão incremental: a versão antiga das linhas alteradas é
+        subtraída e a nova é somada com `merge`.
+
+        Parâmetros:
+        - other (PortfolioAggregate): Agregado das linhas a remover.
+
+        Retorna:
+        - PortfolioAggregate: O próprio agregado, atualizado.
+        """
+        return self._combine(other, -1)
+
+    def _combine(self, other: 'PortfolioAggregate', sign: int) -> 'PortfolioAggregate':
+        self.n_contratos += sign * other.n_contratos
+        self.soma_valor_contrato += sign * other.soma_valor_contrato
+        self.soma_taxa_ponderada += sign * other.soma_taxa_ponderada
+        self.soma_prazo_ponderado += sign * other.soma_prazo_ponderado
+        self.n_bad += sign * other.n_bad
+        self.n_loss += sign * other.n_loss
+        for col, counts in other.group_counts.items():
+            if col in self.group_counts:
+                self.group_counts[col] = self.group_counts[col].add(sign * counts, fill_value=0).astype(np.int64)
+            else:
+                self.group_counts[col] = sign * counts
+        return self
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'PortfolioAggregate':
+        """
+        Calcula o agregado parcial de um DataFrame em memória.
+
+        Parâmetros:
+        - df (pd.DataFrame): DataFrame com as colunas de AGGREGATE_COLUMNS.
+
+        Retorna:
+        - PortfolioAggregate: Agregado do DataFrame.
+        """
+        valor = df['valor_contrato'].to_numpy(dtype=np.float64)
+        bad = (df['atraso_corrente'].to_numpy() > BAD_ATRASO_DIAS).astype(np.int64)
+        loss = df['valor_em_aberto'].to_numpy(dtype=np.float64) / df['valor_contrato_mais_juros'].to_numpy(dtype=np.float64)
+        loss_cat = (loss > LOSS_CORTE).astype(np.int64)
+
+        flags = pd.DataFrame({'Contratos': 1, 'Bad': bad, 'Loss_cat': loss_cat}, index=df.index)
+        group_counts = {}
+        for col in GROUP_COLUMNS:
+            if col == 'regiao' and col not in df.columns:
+                keys = df['estado'].astype(object).map(REGIOES)
+            else:
+                keys = df[col].astype(object)
+            group_counts[col] = flags.groupby(keys).sum().astype(np.int64)
+
+        return cls(
+            n_contratos=len(df),
+            soma_valor_contrato=float(valor.sum()),
+            soma_taxa_ponderada=float((df['taxa'].to_numpy(dtype=np.float64) * valor).sum()),
+            soma_prazo_ponderado=float((df['prazo'].to_numpy(dtype=np.float64) * valor).sum()),
+            n_bad=int(bad.sum()),
+            n_loss=int(loss_cat.sum()),
+            group_counts=group_counts,
+        )
+
+    def metrics(self) -> tuple[float, float, float]:
+        """
+        Métricas gerais equivalentes a `utils.calculate_metrics`.
+
+        Retorna:
+        - ticket_medio (float): Média dos valores de contrato.
+        - taxa_media (float): Taxa média ponderada pelo valor do contrato.
+        - prazo_medio (float): Prazo médio ponderado pelo valor do contrato.
+        """
+        ticket_medio = self.soma_valor_contrato / self.n_contratos
+        taxa_media = self.soma_taxa_ponderada / self.soma_valor_contrato
+        prazo_medio = self.soma_prazo_ponderado / self.soma_valor_contrato
+        return ticket_medio, taxa_media, prazo_medio
+
+    def class_totals(self, class_column: str = 'Bad') -> pd.Series:
+        """
+        Totais por classe, no formato de `df[class_column].value_counts()`.
+
+        Parâmetros:
+        - class_column (str): 'Bad' ou 'Loss_cat'.
+
+        Retorna:
+        - pd.Series: Contagem das classes 0 e 1.
+        """
+        positivos = {'Bad': self.n_bad, 'Loss_cat': self.n_loss}[class_column]
+        return pd.Series({0: self.n_contratos - positivos, 1: positivos}, name='count')
+
+    def risk_tables(
+        self,
+        categorical_columns: List[str],
+        class_columns: List[str]
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Tabelas de risco por categoria no formato de `utils.compute_risk_tables`.
+
+        Parâmetros:
+        - categorical_columns (List[str]): Colunas entre GROUP_COLUMNS.
+        - class_columns (List[str]): Alvos entre 'Bad' e 'Loss_cat'.
+
+        Retorna:
+        - tabelas (pd.DataFrame): Formato longo, uma linha por ('variavel', 'alvo', 'categoria').
+        - totais (pd.DataFrame): Totais e percentuais globais de cada classe, indexados pelo alvo.
+        """
+        totais = pd.DataFrame([self.class_totals(c).to_numpy() for c in class_columns], columns=['Total Bom Pagador', 'Total Mau Pagador'])
+        totais['% Bom Pagador'] = percent_of(totais['Total Bom Pagador'], self.n_contratos)
+        totais['% Mau Pagador'] = percent_of(totais['Total Mau Pagador'], self.n_contratos)
+        totais.index = pd.Index(class_columns, name='alvo')
+
+        partes = []
+        for col in categorical_columns:
+            counts = self.group_counts[col]
+            counts = counts[counts['Contratos'] > 0].sort_index()
+            for class_column in class_columns:
+                mau = counts[class_column].to_numpy()
+                bom = counts['Contratos'].to_numpy() - mau
+                partes.append(pd.DataFrame({
+                    'variavel': col,
+                    'alvo': class_column,
+                    'categoria': counts.index,
+                    'Total Bom Pagador': bom,
+                    'Total Mau Pagador': mau,
+                    '% Interno Bom Pagador': percent_of(bom, bom + mau),
+                    '% Interno Mau Pagador': percent_of(mau, bom + mau),
+                    '% Global Bom Pagador': percent_of(bom, totais.loc[class_column, 'Total Bom Pagador']),
+                    '% Global Mau Pagador': percent_of(mau, totais.loc[class_column, 'Total Mau Pagador']),
+                }))
+        return pd.concat(partes, ignore_index=True), totais
+
+
+def aggregate_chunks(chunks: Iterable[pd.DataFrame]) -> PortfolioAggregate:
+    """
+    Agrega uma sequência de blocos de contratos.
+
+    Parâmetros:
+    - chunks (Iterable[pd.DataFrame]): Blocos com as colunas de AGGREGATE_COLUMNS.
+
+    Retorna:
+    - PortfolioAggregate: Agregado de todos os blocos.
+    """
+    aggregate = PortfolioAggregate()
+    for chunk in chunks:
+        aggregate.update(chunk)
+    return aggregate
+
+
+@profiled()
+def aggregate_file(path: Path = DATA_PATH, chunksize: int = 100_000) -> PortfolioAggregate:
+    """
+    Agrega a base de contratos lendo o arquivo em blocos de tamanho fixo.
+
+    Os totais são os mesmos das funções em memória (`calculate_metrics`,
+    `create_bad_column`, `create_loss_column`); as médias podem diferir apenas no
+    arredondamento de ponto flutuante causado pela ordem das somas.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de contratos.
+    - chunksize (int): Número de linhas por bloco.
+
+    Retorna:
+    - PortfolioAggregate: Agregado da base inteira.
+    """
+    return aggregate_chunks(iter_contract_chunks(path, AGGREGATE_COLUMNS, chunksize))
+
+
+def _state_path(path: Path) -> Path:
+    return CACHE_DIR / f'{cache_stem(path)}.aggregate.pkl'
+
+
+def save_aggregate_state(aggregate: PortfolioAggregate, path: Path = DATA_PATH) -> None:
+    """
+    Persiste o agregado junto com a versão atual do arquivo de dados.
+
+    Permite que `load_aggregate` reaproveite um agregado atualizado incrementalmente
+    (ver `ingestion.ContractBook`) em vez de reagregar o arquivo inteiro.
+
+    Parâmetros:
+    - aggregate (PortfolioAggregate): Agregado correspondente ao conteúdo atual do arquivo.
+    - path (Path): Caminho do CSV de contratos.
+    """
+    state = _state_path(path)
+    state.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump((data_version(path), aggregate), f)
+    tmp.replace(state)
+
+
+def read_aggregate_state(path: Path = DATA_PATH) -> Optional[PortfolioAggregate]:
+    """
+    Lê o agregado persistido, se ele corresponder à versão atual do arquivo.
+
+    Retorna:
+    - PortfolioAggregate ou None: Agregado persistido, ou None se ausente/desatualizado.
+    """
+    try:
+        with open(_state_path(path), 'rb') as f:
+            version, aggregate = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    return aggregate if version == data_version(path) else None
+
+
+@st.cache_data
+@ARTIFACTS.cached('aggregate')
+def _load_aggregate_cached(path: str, version: tuple[int, int], chunksize: int) -> PortfolioAggregate:
+    aggregate = read_aggregate_state(Path(path))
+    return aggregate if aggregate is not None else aggregate_file(Path(path), chunksize)
+
+
+@profiled()
+def load_aggregate(path: Path = DATA_PATH, chunksize: int = 100_000) -> PortfolioAggregate:
+    """
+    Versão memoizada de `aggregate_file`, invalidada quando o arquivo muda.
+
+    Se houver um agregado persistido para a versão atual do arquivo (gravado pela
+    ingestão incremental), ele é usado sem reler a base. Com a variável de ambiente
+    APP_PARTITIONS (pasta ou padrão glob de partições), a base do app (DATA_PATH) é
+    lida das partições, uma tarefa por partição em um pool de processos
+    (`partitions.load_partitioned_aggregate`).
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de contratos.
+    - chunksize (int): Número de linhas por bloco.
+
+    Retorna:
+    - PortfolioAggregate: Agregado da base inteira.
+    """
+    partitions = os.environ.get(PARTITIONS_ENV)
+    if partitions and Path(path) == DATA_PATH:
+        from partitions import load_partitioned_aggregate
+        return load_partitioned_aggregate(partitions)
+    return _load_aggregate_cached(str(path), data_version(path), chunksize)
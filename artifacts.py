@@ -0,0 +1,327 @@
+"""
+Armazenamento em disco dos artefatos derivados da base (DataFrames, agregados e figuras).
+
+- `write_columns` / `read_columns`: DataFrame como uma pasta com um `.npy` por coluna,
+  lido de volta com mapeamento em memória (sem cópia, compartilhado entre processos).
+- `ArtifactCache`: cache versionado e com descarte LRU, usado pelos loaders memoizados
+  (`ArtifactCache.cached`) e preenchido em segundo plano por `precompute.py`.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Versão do formato em disco; mude ao alterar `write_columns` ou a montagem das chaves
+CACHE_FORMAT = 1
+
+
+def source_fingerprint(directory: Path) -> str:
+    """
+    Hash do código que produz os artefatos: o conteúdo dos módulos `.py` de `directory`
+    (sem subpastas) e CACHE_FORMAT.
+
+    Parâmetros:
+    - directory (Path): Pasta dos módulos do app.
+
+    Retorna:
+    - str: Hash curto; muda quando qualquer módulo muda.
+    """
+    digest = hashlib.sha1(str(CACHE_FORMAT).encode())
+    for path in sorted(Path(directory).glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def write_columns(directory: Path, df: pd.DataFrame) -> None:
+    """
+    Grava as colunas do DataFrame em `directory`: um `.npy` por coluna e um 'manifest.json'.
+
+    Colunas categóricas (e de texto) são gravadas com codificação de dicionário: os
+    códigos inteiros no `.npy` e as categorias no manifesto. O índice não é gravado.
+
+    Parâmetros:
+    - directory (Path): Pasta de destino (criada se não existir).
+    - df (pd.DataFrame): DataFrame a gravar.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {'rows': len(df), 'columns': {}}
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        spec = {'file': f'{i}.npy'}
+        if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            spec['text'] = str(values.dtype)
+            values = values.astype('category')
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(directory / spec['file'], values.array.codes)
+            spec['categories'] = values.cat.categories.tolist()
+        else:
+            np.save(directory / spec['file'], values.to_numpy())
+        manifest['columns'][col] = spec
+    (directory / 'manifest.json').write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+
+
+def read_columns(directory: Path) -> pd.DataFrame:
+    """
+    Abre uma pasta gravada por `write_columns` como DataFrame mapeado em memória.
+
+    Cada coluna numérica ou categórica é um mapeamento somente leitura, sem cópia;
+    colunas que eram de texto são materializadas de volta a partir das categorias.
+
+    Parâmetros:
+    - directory (Path): Pasta com 'manifest.json'.
+
+    Retorna:
+    - pd.DataFrame: DataFrame com índice padrão.
+    """
+    manifest = json.loads((directory / 'manifest.json').read_text(encoding='utf-8'))
+    columns = {}
+    for col, spec in manifest['columns'].items():
+        # View ndarray comum sobre o mapeamento (sem a subclasse np.memmap)
+        values = np.load(directory / spec['file'], mmap_mode='r').view(np.ndarray)
+        if 'categories' in spec:
+            values = pd.Categorical.from_codes(values, categories=spec['categories'], validate=False)
+        series = pd.Series(values, name=col, copy=False)
+        columns[col] = series.astype(spec['text']) if 'text' in spec else series
+    return pd.DataFrame(columns, copy=False)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(repr(value).encode()).hexdigest()[:16]
+
+
+def _is_column_frame(value: Any) -> bool:
+    # Só DataFrames com índice padrão e nomes de coluna únicos voltam idênticos de write_columns
+    return (
+        isinstance(value, pd.DataFrame)
+        and isinstance(value.index, pd.RangeIndex) and value.index.start == 0 and value.index.step == 1
+        and value.columns.is_unique and all(isinstance(c, str) for c in value.columns)
+    )
+
+
+class ArtifactCache:
+    """
+    Cache em disco de artefatos derivados, versionado pela versão do arquivo de dados e
+    com descarte LRU por tamanho total.
+
+    Cada artefato é identificado por um nome, pelos argumentos que o produziram, pela
+    versão dos dados e pela versão do código ('raiz/nome/hash dos argumentos/hash das
+    duas versões'): depois de uma mudança no código (ex.: em LOSS_CORTE ou em uma classe
+    gravada com pickle) os artefatos antigos deixam de ser lidos, mesmo com os dados
+    iguais. Ao gravar uma versão nova, as anteriores do mesmo artefato são removidas. DataFrames com índice
+    padrão são gravados como colunas `.npy` (lidos com mapeamento em memória); os demais
+    valores, com pickle. Leituras atualizam a data de acesso usada pelo LRU. A gravação é
+    atômica (arquivo ou pasta temporária renomeada), de modo que vários processos podem
+    ler e gravar ao mesmo tempo.
+
+    O tamanho total é estimado por processo: medido por inteiro na primeira gravação e
+    depois somado a cada gravação. A pasta só é percorrida de novo (em `evict`) quando a
+    estimativa passa de `max_bytes` ou quando o processo já gravou 1/8 de `max_bytes`
+    desde a última medição, o que limita o erro causado por gravações de outros processos.
+
+    Atributos:
+    - root (Path): Pasta do cache.
+    - max_bytes (int): Tamanho máximo; acima dele os artefatos menos usados são removidos.
+    - code_version (Hashable): Versão do código (ex.: `source_fingerprint`), parte de toda chave.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 2 << 30, code_version: Hashable = CACHE_FORMAT):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.code_version = code_version
+        self._total: Optional[int] = None
+        self._written = 0
+        self._size_lock = threading.Lock()
+
+    def _entry_dir(self, name: str, key: Hashable) -> Path:
+        return self.root / name / _digest(key)
+
+    def _stem(self, name: str, key: Hashable, version: Hashable) -> Path:
+        return self._entry_dir(name, key) / _digest((self.code_version, version))
+
+    def _find(self, name: str, key: Hashable, version: Hashable) -> Optional[Path]:
+        stem = self._stem(name, key, version)
+        for path in (stem.with_suffix('.pkl'), stem.with_suffix('.columns')):
+            if path.exists():
+                return path
+        return None
+
+    def get(self, name: str, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        Lê um artefato.
+
+        Parâmetros:
+        - name (str): Nome do artefato (ex.: o loader que o produz).
+        - key (Hashable): Argumentos que o identificam.
+        - version (Hashable): Versão dos dados.
+
+        Retorna:
+        - Any ou None: O artefato, ou None se ausente, de outra versão ou ilegível
+          (inclusive um pickle de classe que mudou ou não existe mais).
+        """
+        path = self._find(name, key, version)
+        if path is None:
+            return None
+        try:
+            if path.suffix == '.columns':
+                value = read_columns(path)
+                os.utime(path / 'manifest.json')
+            else:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                os.utime(path)
+        except Exception:
+            # O unpickling pode falhar de muitas formas (AttributeError, ImportError,
+            # TypeError...); qualquer falha de leitura é só uma ausência no cache
+            return None
+        return value
+
+    def put(self, name: str, key: Hashable, version: Hashable, value: Any) -> None:
+        """
+        Grava um artefato, remove as outras versões dele e aplica o limite de tamanho.
+
+        Falhas de gravação (ex.: pasta sem permissão) são ignoradas: o cache é opcional.
+
+        Parâmetros:
+        - name (str): Nome do artefato.
+        - key (Hashable): Argumentos que o identificam.
+        - version (Hashable): Versão dos dados.
+        - value (Any): Artefato (DataFrame ou qualquer objeto serializável com pickle).
+        """
+        entry = self._entry_dir(name, key)
+        stem = self._stem(name, key, version)
+        writer = f'{os.getpid()}-{threading.get_ident()}'
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            if _is_column_frame(value):
+                target = stem.with_suffix('.columns')
+                tmp = stem.with_name(f'{stem.name}.{writer}.tmp')
+                write_columns(tmp, value)
+            else:
+                target = stem.with_suffix('.pkl')
+                tmp = stem.with_name(f'{stem.name}.{writer}.pkl.tmp')
+                with open(tmp, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            try:
+                os.replace(tmp, target)
+            except OSError:
+                # Outro processo gravou a mesma versão primeiro (pastas não são substituídas)
+                shutil.rmtree(tmp, ignore_errors=True)
+            added = _size(target)
+            for old in entry.iterdir():
+                if old != target and not old.name.endswith('.tmp'):
+                    added -= _size(old)
+                    _remove(old)
+        except (OSError, pickle.PicklingError):
+            return
+        with self._size_lock:
+            if self._total is not None:
+                self._total += added
+                self._written += max(added, 0)
+            stale = (
+                self._total is None or self._total > self.max_bytes
+                or self._written > self.max_bytes // 8
+            )
+        if stale:
+            self.evict()
+
+    def entries(self) -> list[tuple[float, int, Path]]:
+        """
+        Artefatos gravados.
+
+        Retorna:
+        - list[tuple[float, int, Path]]: Último acesso, tamanho em bytes e caminho de cada artefato.
+        """
+        found = []
+        if not self.root.exists():
+            return found
+        for path in self.root.glob('*/*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                if path.is_dir():
+                    found.append(((path / 'manifest.json').stat().st_mtime, _size(path), path))
+                else:
+                    stat = path.stat()
+                    found.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        return found
+
+    def evict(self) -> None:
+        """
+        Mede a pasta e remove os artefatos com acesso mais antigo até o total caber em
+        `max_bytes`. Percorre o cache inteiro: `put` só a chama quando a estimativa do
+        tamanho total pede.
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+        with self._size_lock:
+            self._total, self._written = total, 0
+
+    def cached(self, name: str) -> Callable[[Callable], Callable]:
+        """
+        Decorador de loaders com parâmetro `version`: lê o resultado do disco e só o calcula
+        (e grava) se ele não existir para a versão pedida.
+
+        Os demais argumentos formam a chave. Usado por baixo de `st.cache_data` /
+        `st.cache_resource`, que continuam memoizando o resultado no processo.
+
+        Parâmetros:
+        - name (str): Nome do artefato.
+
+        Retorna:
+        - Callable: Decorador.
+        """
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = dict(bound.arguments)
+                version = arguments.pop('version')
+                key = tuple(arguments.items())
+                value = self.get(name, key, version)
+                if value is None:
+                    value = func(*args, **kwargs)
+                    self.put(name, key, version, value)
+                return value
+            return wrapper
+        return decorator
+
+
+def _size(path: Path) -> int:
+    # Tamanho de um artefato: o arquivo `.pkl` ou os arquivos da pasta `.columns`
+    try:
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.iterdir() if p.is_file())
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _remove(path: Path) -> None:
+    # Processos que ainda mapeiam colunas removidas continuam lendo os arquivos abertos
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,108 @@
+"""
+Benchmark de memória com vários processos: base em pandas (`read_contracts`) contra o
+armazenamento colunar mapeado em memória (`open_column_store`).
+
+Cada processo carrega a base, percorre todas as colunas e calcula `derive_features`
+e `calculate_metrics`, como uma página faria. Para cada processo são lidos de
+/proc/self/smaps_rollup o RSS e o PSS (RSS com as páginas compartilhadas divididas
+entre os processos que as mapeiam); a soma dos PSS é a memória total da implantação.
+
+Uso:
+    python benchmarks/column_store.py --rows 2e6 --processes 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Executado em cada processo filho, com o diretório de trabalho no diretório temporário.
+_CHILD = '''
+import json, sys, time
+import numpy as np
+from utils import ID_COLUMN, calculate_metrics, derive_features, open_column_store, read_contracts
+
+def smaps_mb():
+    values = {}
+    for line in open('/proc/self/smaps_rollup'):
+        parts = line.split()
+        if parts[0] in ('Rss:', 'Pss:'):
+            values[parts[0][:-1].lower() + '_mb'] = int(parts[1]) / 1024
+    return values
+
+mode, path, ready, go = sys.argv[1:]
+start = time.perf_counter()
+df = open_column_store(path) if mode == 'mmap' else read_contracts(path)
+for col in df.columns:
+    np.asarray(df[col].array.codes if df[col].dtype == 'category' else df[col]).sum()
+calculate_metrics(derive_features(df.drop(columns=ID_COLUMN)))
+elapsed = time.perf_counter() - start
+open(ready, 'w').close()
+# Mede só depois que todos os processos carregaram a base, para o PSS refletir o compartilhamento
+while not __import__('os').path.exists(go):
+    time.sleep(0.05)
+print(json.dumps({'segundos': elapsed, **smaps_mb()}))
+'''
+
+
+def run(mode: str, path: Path, processes: int, workdir: Path) -> dict:
+    """
+    Executa `processes` processos simultâneos no modo indicado e soma RSS e PSS.
+    """
+    go = workdir / f'{mode}.go'
+    ready = [workdir / f'{mode}.{i}.ready' for i in range(processes)]
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    procs = [
+        subprocess.Popen([sys.executable, '-c', _CHILD, mode, str(path), str(r), str(go)],
+                         cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for r in ready
+    ]
+    while not all(r.exists() for r in ready):
+        if any(p.poll() not in (None, 0) for p in procs):
+            raise RuntimeError(f'processo do modo {mode} falhou')
+        time.sleep(0.05)
+    go.touch()
+    results = [json.loads(p.communicate()[0].splitlines()[-1]) for p in procs]
+    return {
+        'modo': mode,
+        'processos': processes,
+        'segundos_max': max(r['segundos'] for r in results),
+        'rss_total_mb': sum(r['rss_mb'] for r in results),
+        'pss_total_mb': sum(r['pss_mb'] for r in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=1e6)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    args = parser.parse_args()
+    output = args.json.resolve() if args.json else None
+
+    from synthetic import write_synthetic
+    from utils import build_column_store, read_contracts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        os.chdir(workdir)
+        path = write_synthetic(Path('data/sintetico.csv'), int(args.rows))
+        # Sidecar Parquet e armazenamento colunar prontos antes das medições
+        build_column_store(path, read_contracts(path))
+        results = [run(mode, path, args.processes, workdir) for mode in ('pandas', 'mmap')]
+
+    for r in results:
+        print(f"{r['modo']:<7} {r['processos']} processos: RSS {r['rss_total_mb']:8.1f} MB  "
+              f"PSS {r['pss_total_mb']:8.1f} MB  carga {r['segundos_max']:.3f} s")
+    if output:
+        output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark do cubo de risco: tempo de uma consulta filtrada (métricas e tabelas de risco)
+pelo cubo, comparado a filtrar as linhas e rodar `calculate_metrics` e
+`compute_risk_tables`, para bases sintéticas de tamanhos crescentes.
+
+A consulta é a do exemplo dos analistas: região Sudeste, setor VAREJO e score abaixo
+de 400. O tempo do cubo separa a soma das células (`select`) da montagem das tabelas.
+
+Uso:
+    python benchmarks/cube.py
+    python benchmarks/cube.py --rows 1e4 1e5 1e6 5e6 --json cubo.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cube import RiskCube  # noqa: E402
+from synthetic import generate_contracts  # noqa: E402
+from utils import DATA_PATH, calculate_metrics, compute_risk_tables, derive_features, read_contracts  # noqa: E402
+
+CATEGORICAL_COLUMNS = ['estado', 'setor', 'regiao']
+CLASS_COLUMNS = ['Bad', 'Loss_cat']
+FILTERS = {'regioes': ['Sudeste'], 'setores': ['VAREJO'], 'score': (0, 400)}
+
+
+def best_of(fn, repeat: int) -> float:
+    """
+    Menor tempo de `repeat` execuções de `fn`, em segundos.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def filter_rows(df):
+    mask = (df['regiao'] == 'Sudeste') & (df['setor'] == 'VAREJO') & (df['score'] < 400)
+    sub = df[mask]
+    return calculate_metrics(sub), compute_risk_tables(sub, CATEGORICAL_COLUMNS, CLASS_COLUMNS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, nargs='+', default=[1e4, 1e5, 1e6])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    args = parser.parse_args()
+
+    source = read_contracts(ROOT / DATA_PATH)
+    results = []
+    for rows in args.rows:
+        df = derive_features(generate_contracts(int(rows), source=source))
+        start = time.perf_counter()
+        cube = RiskCube.from_frame(df)
+        build_s = time.perf_counter() - start
+        selection = cube.select(**FILTERS)
+        results.append({
+            'linhas': int(rows),
+            'cube_build_s': build_s,
+            'cube_select_ms': best_of(lambda: cube.select(**FILTERS), args.repeat) * 1e3,
+            'cube_tables_ms': best_of(lambda: (selection.metrics(), selection.risk_tables(CATEGORICAL_COLUMNS, CLASS_COLUMNS)), args.repeat) * 1e3,
+            'filtro_linhas_ms': best_of(lambda: filter_rows(df), args.repeat) * 1e3,
+        })
+        r = results[-1]
+        print(f"{r['linhas']:>10,} linhas: cubo montado em {r['cube_build_s']:.3f} s | select {r['cube_select_ms']:.3f} ms"
+              f" + tabelas {r['cube_tables_ms']:.2f} ms | filtro nas linhas {r['filtro_linhas_ms']:.2f} ms")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
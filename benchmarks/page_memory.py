@@ -0,0 +1,103 @@
+"""
+Benchmark de memória: pico de RSS ao renderizar cada página do app.
+
+Cada página roda em um processo novo via `streamlit.testing.v1.AppTest`, e o pico
+de RSS é lido de `resource.getrusage`. Com `--ref`, a mesma medição é feita em uma
+cópia da árvore extraída do git na referência indicada, para comparar antes/depois.
+
+Uso:
+    python benchmarks/page_memory.py
+    python benchmarks/page_memory.py --ref HEAD~1
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Executado em um processo filho, com o diretório de trabalho na raiz da árvore medida.
+_CHILD = '''
+import json, resource, sys, time
+from streamlit.testing.v1 import AppTest
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+page = sys.argv[1]
+before = peak_mb()
+start = time.perf_counter()
+at = AppTest.from_file(page, default_timeout=600).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'peak_rss_mb': peak_mb(),
+    'render_delta_mb': peak_mb() - before,
+    'seconds': elapsed,
+    'errors': [e.value for e in at.exception],
+}))
+'''
+
+
+def list_pages(root: Path) -> list[str]:
+    """
+    Lista os scripts de página de uma árvore do app, com a página inicial primeiro.
+    """
+    return ['Pagina Inicial.py'] + sorted(str(p.relative_to(root)) for p in (root / 'pages').glob('*.py'))
+
+
+def measure(root: Path) -> dict[str, dict]:
+    """
+    Mede o pico de RSS de cada página de uma árvore do app.
+
+    Parâmetros:
+    - root (Path): Raiz da árvore (contendo 'Pagina Inicial.py' e 'pages/').
+
+    Retorna:
+    - dict[str, dict]: Medições por página.
+    """
+    results = {}
+    for page in list_pages(root):
+        out = subprocess.run(
+            [sys.executable, '-c', _CHILD, str(root / page)],
+            cwd=root, capture_output=True, text=True, check=True
+        )
+        results[page] = json.loads(out.stdout.strip().splitlines()[-1])
+    return results
+
+
+def export_ref(ref: str, dest: Path) -> Path:
+    """
+    Extrai a árvore do repositório na referência git indicada.
+    """
+    archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', str(dest)], input=archive, check=True)
+    return dest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ref', help='Referência git para comparação (ex.: HEAD~1).')
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    args = parser.parse_args()
+
+    runs = {'atual': measure(ROOT)}
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            runs[args.ref] = measure(export_ref(args.ref, Path(tmp)))
+
+    print(f"{'página':<22}" + ''.join(f'{name:>24}' for name in runs))
+    for page in runs['atual']:
+        cells = []
+        for run in runs.values():
+            r = run.get(page)
+            cells.append(f"{r['peak_rss_mb']:8.1f} MB ({r['render_delta_mb']:+7.1f})" if r else f"{'-':>24}")
+        print(f'{page:<22}' + ''.join(f'{c:>24}' for c in cells))
+
+    if args.json:
+        args.json.write_text(json.dumps(runs, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark da execução particionada: tempo de `PartitionedDataset.aggregate` e
+`PartitionedDataset.derive_features` por número de processos, comparado ao arquivo único.
+
+Uma base sintética (ver `benchmarks/synthetic.py`) é gravada inteira e dividida em uma
+partição por estado. Para cada número de workers, uma execução de aquecimento (início
+do pool e cache Parquet das partições) precede as medições.
+
+Uso:
+    python benchmarks/partitions.py
+    python benchmarks/partitions.py --rows 5e6 --workers 1 2 4 8 --json particoes.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aggregation import aggregate_file  # noqa: E402
+from partitions import PartitionedDataset, split_by_column  # noqa: E402
+from synthetic import write_synthetic  # noqa: E402
+from utils import ID_COLUMN, derive_features, read_contracts  # noqa: E402
+
+
+def best_of(fn, repeat: int) -> float:
+    """
+    Menor tempo de `repeat` execuções de `fn`, em segundos.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=float, default=2e6)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    args = parser.parse_args()
+    output = args.json.resolve() if args.json else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # O cache Parquet ('data/.cache') fica dentro do diretório temporário
+        os.chdir(tmp)
+        single = write_synthetic(Path('data/sintetico.csv'), int(args.rows))
+        shards = split_by_column(single, Path('data/particoes'))
+
+        read_contracts(single)
+        results = [{
+            'modo': 'arquivo único',
+            'workers': 1,
+            'aggregate_s': best_of(lambda: aggregate_file(single), args.repeat),
+            'derive_features_s': best_of(lambda: derive_features(read_contracts(single).drop(columns=ID_COLUMN)), args.repeat),
+        }]
+        for workers in args.workers:
+            dataset = PartitionedDataset(shards, max_workers=workers)
+            dataset.aggregate()
+            results.append({
+                'modo': f'{len(shards)} partições',
+                'workers': workers,
+                'aggregate_s': best_of(dataset.aggregate, args.repeat),
+                'derive_features_s': best_of(dataset.derive_features, args.repeat),
+            })
+
+    base = results[1]
+    for r in results:
+        r['speedup_aggregate'] = base['aggregate_s'] / r['aggregate_s']
+        print(f"{r['modo']:<15} workers {r['workers']:>3}: aggregate {r['aggregate_s']:7.3f} s "
+              f"(x{r['speedup_aggregate']:.2f})  derive_features {r['derive_features_s']:7.3f} s")
+    if output:
+        output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark da escoragem em lote: linhas por segundo e latência p99 por tamanho de lote.
+
+Os lotes são reamostrados (com reposição) da base de contratos. Por padrão mede a
+API em processo (`score_batch`); com `--http`, mede o endpoint local de
+`scoring.make_server` com corpo CSV.
+
+Uso:
+    python benchmarks/scoring.py
+    python benchmarks/scoring.py --http --json resultados.json
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from scoring import APPLICATION_COLUMNS, get_risk_model, make_server, score_batch  # noqa: E402
+from utils import DATA_PATH, read_contracts  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+
+
+def measure(call, batches: list, min_seconds: float) -> list[float]:
+    """
+    Executa `call` sobre os lotes, em ciclo, até somar `min_seconds` (mínimo de 20 chamadas).
+
+    Retorna:
+    - list[float]: Latência de cada chamada, em segundos.
+    """
+    latencies = []
+    start = time.perf_counter()
+    i = 0
+    while len(latencies) < 20 or time.perf_counter() - start < min_seconds:
+        t0 = time.perf_counter()
+        call(batches[i % len(batches)])
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=BATCH_SIZES)
+    parser.add_argument('--seconds', type=float, default=1.0, help='Tempo mínimo de medição por tamanho.')
+    parser.add_argument('--http', action='store_true', help='Mede o endpoint HTTP local.')
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    args = parser.parse_args()
+
+    base = read_contracts(ROOT / DATA_PATH, APPLICATION_COLUMNS)
+    model = get_risk_model(ROOT / DATA_PATH)
+    rng = np.random.default_rng(0)
+
+    if args.http:
+        server = make_server(model, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/score'
+
+        def call(body: bytes) -> None:
+            request = urllib.request.Request(url, body, {'Content-Type': 'text/csv'})
+            urllib.request.urlopen(request).read()
+    else:
+        def call(batch) -> None:
+            score_batch(batch, model)
+
+    results = []
+    for size in args.sizes:
+        batches = [base.iloc[rng.integers(0, len(base), size)].reset_index(drop=True) for _ in range(5)]
+        if args.http:
+            batches = [b.to_csv(index=False).encode() for b in batches]
+        latencies = np.array(measure(call, batches, args.seconds))
+        results.append({
+            'modo': 'http' if args.http else 'batch',
+            'tamanho_lote': size,
+            'chamadas': len(latencies),
+            'linhas_por_segundo': size * len(latencies) / latencies.sum(),
+            'p50_ms': float(np.percentile(latencies, 50) * 1000),
+            'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        })
+        r = results[-1]
+        print(f"lote {size:>7}: {r['linhas_por_segundo']:>12,.0f} linhas/s  p50 {r['p50_ms']:8.3f} ms  p99 {r['p99_ms']:8.3f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
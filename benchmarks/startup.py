@@ -0,0 +1,107 @@
+"""
+Benchmark de inicialização das páginas: tempo de importação e tempo até a primeira
+renderização de cada página do app, em um processo Python novo por página.
+
+Para cada página, o processo filho mede:
+- importacao_s: os `import` do topo do script da página (módulos do app e bibliotecas);
+- primeira_renderizacao_s: a primeira execução completa da página (`AppTest`), com os
+  caches do Streamlit vazios (os caches em disco, como o Parquet e o armazenamento
+  colunar, são reaproveitados se já existirem);
+- reexecucao_s: uma segunda execução, com os caches do Streamlit quentes;
+- bibliotecas de gráficos carregadas após os imports e após a renderização.
+
+O processo pai mede ainda o tempo total do processo, incluindo a partida do interpretador.
+O worker de pré-cálculo (`precompute.py`) fica desativado nos processos medidos.
+
+Uso:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --pages "Pagina Inicial.py" --json startup.json
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PLOTTING_MODULES = ['seaborn', 'matplotlib', 'plotly.express', 'scipy']
+
+
+def app_pages() -> list[str]:
+    """
+    Scripts das páginas, relativos à raiz: a página inicial e as da pasta 'pages'.
+    """
+    return ['Pagina Inicial.py'] + sorted(str(p.relative_to(ROOT)) for p in (ROOT / 'pages').glob('*.py'))
+
+
+def loaded_plotting_modules() -> list[str]:
+    return [name for name in PLOTTING_MODULES if name in sys.modules]
+
+
+def child(page: str) -> dict:
+    """
+    Mede uma página no processo atual (deve ser um processo novo).
+    """
+    script = ROOT / page
+    tree = ast.parse(script.read_text(encoding='utf-8'))
+    imports = ast.Module(body=[node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], type_ignores=[])
+    start = time.perf_counter()
+    exec(compile(imports, str(script), 'exec'), {'__name__': '__startup__'})
+    import_s = time.perf_counter() - start
+    after_import = loaded_plotting_modules()
+
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(script), default_timeout=600)
+    start = time.perf_counter()
+    app.run()
+    first_render_s = time.perf_counter() - start
+    start = time.perf_counter()
+    app.run()
+    rerun_s = time.perf_counter() - start
+    return {
+        'pagina': page,
+        'importacao_s': import_s,
+        'primeira_renderizacao_s': first_render_s,
+        'reexecucao_s': rerun_s,
+        'excecoes': len(app.exception),
+        'graficos_apos_import': after_import,
+        'graficos_apos_render': loaded_plotting_modules(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', nargs='+', help='Scripts das páginas, relativos à raiz. Por padrão, todos.')
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child)))
+        return
+
+    results = []
+    for page in args.pages or app_pages():
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', page],
+            cwd=ROOT, capture_output=True, text=True, check=True, env={**os.environ, 'APP_PRECOMPUTE': '0'}
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result['processo_s'] = time.perf_counter() - start
+        results.append(result)
+        print(f"{page:<32} import {result['importacao_s']:6.2f} s | 1ª renderização {result['primeira_renderizacao_s']:6.2f} s"
+              f" | reexecução {result['reexecucao_s']:5.2f} s | processo {result['processo_s']:6.2f} s"
+              f" | gráficos após import: {', '.join(result['graficos_apos_import']) or '-'}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
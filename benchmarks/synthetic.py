@@ -0,0 +1,111 @@
+"""
+Gerador de contratos sintéticos com o schema e as distribuições de `base_de_dados_case.csv`.
+
+As linhas são reamostradas da base original (bootstrap), o que preserva as
+distribuições marginais e as relações entre colunas. Os valores contínuos recebem
+um ruído multiplicativo pequeno para não repetir exatamente as mesmas linhas; os
+três valores do contrato usam o mesmo fator, mantendo 'Loss' e as razões.
+
+Uso:
+    python benchmarks/synthetic.py 1000000 data/sintetico_1M.csv
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import DATA_PATH, ID_COLUMN, read_contracts  # noqa: E402
+
+# Desvio padrão do ruído log-normal aplicado aos valores contínuos
+NOISE = 0.05
+CONTRACT_VALUE_COLUMNS = ['valor_contrato', 'valor_contrato_mais_juros', 'valor_em_aberto']
+
+
+def generate_contracts(
+    n: int,
+    seed: Union[int, np.random.SeedSequence] = 0,
+    source: pd.DataFrame = None,
+    first_id: int = 0
+) -> pd.DataFrame:
+    """
+    Gera `n` contratos sintéticos.
+
+    Parâmetros:
+    - n (int): Número de contratos.
+    - seed (int ou np.random.SeedSequence): Semente do gerador aleatório.
+    - source (pd.DataFrame, opcional): Base de referência. Por padrão, a base do case.
+    - first_id (int): Primeiro id de contrato (ID_COLUMN).
+
+    Retorna:
+    - pd.DataFrame: Contratos com as mesmas colunas e tipos da base de referência.
+    """
+    if source is None:
+        source = read_contracts(ROOT / DATA_PATH)
+    rng = np.random.default_rng(seed)
+    df = source.iloc[rng.integers(0, len(source), n)].reset_index(drop=True)
+
+    contract_factor = rng.lognormal(0, NOISE, n)
+    for col in CONTRACT_VALUE_COLUMNS:
+        df[col] = (df[col].to_numpy() * contract_factor).round(2)
+    for col in ['faturamento_informado', 'divida_total_pj']:
+        df[col] = (df[col].to_numpy() * rng.lognormal(0, NOISE, n)).round(-3)
+    df['taxa'] = (df['taxa'].to_numpy() * rng.lognormal(0, NOISE / 5, n)).round(4)
+    df['score'] = np.clip(df['score'].to_numpy() + rng.integers(-10, 11, n), 0, 1000).astype(df['score'].dtype)
+    df[ID_COLUMN] = np.arange(first_id, first_id + n)
+    return df
+
+
+def iter_synthetic_chunks(n: int, chunksize: int = 1_000_000, seed: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Gera `n` contratos sintéticos em blocos, com memória limitada ao tamanho do bloco.
+
+    Cada bloco usa um fluxo aleatório independente, derivado de `seed` por
+    `SeedSequence.spawn`: sementes vizinhas não geram blocos deslocados uns dos outros.
+
+    Retorna:
+    - Iterator[pd.DataFrame]: Blocos consecutivos, com ids contínuos.
+    """
+    source = read_contracts(ROOT / DATA_PATH)
+    starts = range(0, n, chunksize)
+    for start, chunk_seed in zip(starts, np.random.SeedSequence(seed).spawn(len(starts))):
+        yield generate_contracts(min(chunksize, n - start), chunk_seed, source, first_id=start)
+
+
+def write_synthetic(path: Path, n: int, chunksize: int = 1_000_000, seed: int = 0) -> Path:
+    """
+    Grava `n` contratos sintéticos em CSV, no mesmo formato do arquivo original.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de destino.
+    - n (int): Número de contratos.
+    - chunksize (int): Linhas geradas e gravadas por vez.
+    - seed (int): Semente do gerador aleatório.
+
+    Retorna:
+    - Path: Caminho gravado.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for i, chunk in enumerate(iter_synthetic_chunks(n, chunksize, seed)):
+        chunk.rename(columns={ID_COLUMN: ''}).to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('n', type=float, help='Número de contratos (aceita notação como 1e6).')
+    parser.add_argument('output', type=Path)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args()
+    write_synthetic(args.output, int(args.n), args.chunksize, args.seed)
+
+
+if __name__ == '__main__':
+    main()
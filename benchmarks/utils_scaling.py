@@ -0,0 +1,155 @@
+"""
+Benchmark de escala das funções de `utils` sobre bases sintéticas de 10^4 a 10^8 linhas.
+
+Para cada escala, um CSV é gerado com `benchmarks/synthetic.py` e as funções são
+medidas em um processo novo (uma escala que estoure a memória não derruba as demais):
+tempo (melhor de `--repeat` execuções) e pico de memória alocada (tracemalloc, em
+uma execução à parte, para não distorcer o tempo), além do pico de RSS do processo.
+As funções de gráfico com Seaborn só rodam até `--plot-max-rows` linhas.
+
+Uso:
+    python benchmarks/utils_scaling.py
+    python benchmarks/utils_scaling.py --sizes 1e4 1e6 1e8 --json escala.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SIZES = [1e4, 1e5, 1e6]
+CATEGORICAL_COLUMNS = ['estado', 'setor', 'regiao']
+CLASS_COLUMNS = ['Bad', 'Loss_cat']
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> dict:
+    """
+    Mede o tempo (melhor de `repeat`) e o pico de memória alocada de `fn`.
+
+    Parâmetros:
+    - fn (Callable): Função sem argumentos a medir.
+    - repeat (int): Número de execuções cronometradas.
+    - setup (Callable, opcional): Executada antes de cada execução, fora da medição.
+
+    Retorna:
+    - dict: 'segundos' e 'pico_alocado_mb'.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'segundos': min(times), 'pico_alocado_mb': peak / 2**20}
+
+
+def run_scale(path: Path, repeat: int, plot_max_rows: int) -> dict:
+    """
+    Mede todas as funções sobre um CSV. Executada no processo filho, com o diretório de
+    trabalho no diretório temporário (onde fica o cache Parquet, 'data/.cache').
+    """
+    import utils
+    from aggregation import aggregate_file
+    from distributions import summarize_distribution
+
+    def drop_sidecar() -> None:
+        utils._sidecar_path(path).unlink(missing_ok=True)
+
+    results = {}
+
+    def step(name: str, fn: Callable[[], object], setup: Optional[Callable[[], None]] = None) -> None:
+        try:
+            results[name] = measure(fn, repeat, setup)
+        except MemoryError:
+            results[name] = {'erro': 'MemoryError'}
+        print(f'  {name:<32} {json.dumps(results[name])}', file=sys.stderr, flush=True)
+
+    step('read_contracts (CSV)', lambda: utils.read_contracts(path), setup=drop_sidecar)
+    step('read_contracts (Parquet)', lambda: utils.read_contracts(path))
+    df = utils.read_contracts(path).drop(columns=utils.ID_COLUMN)
+    n = len(df)
+    step('aggregate_file', lambda: aggregate_file(path))
+
+    step('calculate_metrics', lambda: utils.calculate_metrics(df))
+    step('create_bad_column', lambda: utils.create_bad_column(df))
+    step('create_loss_column', lambda: utils.create_loss_column(df))
+    step('create_new_features', lambda: utils.create_new_features(df))
+    step('derive_features', lambda: utils.derive_features(df))
+    features = utils.derive_features(df)
+    step('compute_risk_tables', lambda: utils.compute_risk_tables(features, CATEGORICAL_COLUMNS, CLASS_COLUMNS))
+    step('summarize_distribution', lambda: summarize_distribution(features, 'score', 'Bad'))
+    step('build_scatter_figure', lambda: utils.build_scatter_figure(features, 'Loss', ['score']))
+    if n <= plot_max_rows:
+        step('build_histogram_figure', lambda: utils.build_histogram_figure(features, 'score', 'Bad', 'score'))
+        step('build_boxplot_figure', lambda: utils.build_boxplot_figure(features, 'Bad', 'score', 'score'))
+
+    return {
+        'linhas': n,
+        'tamanho_csv_mb': path.stat().st_size / 2**20,
+        'pico_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'funcoes': results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=float, nargs='+', default=SIZES, help='Número de linhas (ex.: 1e4 1e8).')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--plot-max-rows', type=int, default=1_000_000)
+    parser.add_argument('--workdir', type=Path, help='Diretório das bases geradas (por padrão, temporário).')
+    parser.add_argument('--json', type=Path, help='Grava os resultados em JSON neste caminho.')
+    parser.add_argument('--child', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scale(args.child, args.repeat, args.plot_max_rows)))
+        return
+
+    from synthetic import write_synthetic
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = (args.workdir or Path(tmp)).resolve()
+        results = []
+        for size in map(int, args.sizes):
+            path = workdir / 'data' / f'sintetico_{size}.csv'
+            if not path.exists():
+                print(f'gerando {size:,} linhas em {path}', file=sys.stderr)
+                write_synthetic(path, size)
+            print(f'{size:,} linhas', file=sys.stderr)
+            proc = subprocess.run(
+                [sys.executable, __file__, '--child', str(path), '--repeat', str(args.repeat),
+                 '--plot-max-rows', str(args.plot_max_rows)],
+                cwd=workdir, capture_output=True, text=True,
+                env={**os.environ, 'PYTHONPATH': str(ROOT)}
+            )
+            sys.stderr.write(''.join(l + '\n' for l in proc.stderr.splitlines() if l.startswith('  ')))
+            if proc.returncode == 0:
+                results.append(json.loads(proc.stdout.splitlines()[-1]))
+            else:
+                results.append({'linhas': size, 'erro': proc.stderr.strip().splitlines()[-1:] or f'código {proc.returncode}'})
+                print(f'  falhou: {results[-1]["erro"]}', file=sys.stderr)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
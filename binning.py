@@ -0,0 +1,334 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from profiling import profiled
+from utils import ARTIFACTS, NEW_METRIC_COLUMNS, data_version, load_features
+
+# Suavização das contagens no cálculo do WoE (evita log de zero em bins puros)
+WOE_SMOOTHING = 0.5
+
+# Métricas ranqueadas por IV na Questão 3
+IV_COLUMNS: list[str] = NEW_METRIC_COLUMNS + ['estado', 'setor', 'regiao']
+# Faixas usuais de interpretação do Information Value
+IV_STRENGTH: list[tuple[float, str]] = [
+    (0.02, 'Não preditiva'),
+    (0.1, 'Fraca'),
+    (0.3, 'Média'),
+    (0.5, 'Forte'),
+    (np.inf, 'Muito forte (verificar vazamento)'),
+]
+
+
+@dataclass
+class FeatureBinning:
+    """
+    Bins supervisionados de uma variável, com Weight of Evidence e Information Value.
+
+    Variáveis numéricas são divididas por pontos de corte (`edges`); categóricas, por
+    grupos de categorias (`category_bins`). Valores ausentes (e categorias não vistas
+    no ajuste) vão para um bin próprio, o último, com WoE 0 se não houver casos.
+
+    Atributos:
+    - column (str): Variável.
+    - kind (str): 'numeric' ou 'categorical'.
+    - edges (np.ndarray): Pontos de corte crescentes; o bin i contém edges[i-1] <= x < edges[i].
+    - category_bins (dict): Bin de cada categoria (variáveis categóricas).
+    - table (pd.DataFrame): Por bin: 'bin', 'Contratos', 'Bom Pagador', 'Mau Pagador', '% Mau Pagador', 'WoE' e 'IV'.
+    - woe (np.ndarray): WoE por índice de bin (o último é o de ausentes).
+    - iv (float): Information Value da variável.
+    """
+    column: str
+    kind: str
+    edges: np.ndarray = field(default_factory=lambda: np.empty(0))
+    category_bins: dict = field(default_factory=dict)
+    table: pd.DataFrame = field(default_factory=pd.DataFrame)
+    woe: np.ndarray = field(default_factory=lambda: np.empty(0))
+    iv: float = 0.0
+
+    @property
+    def n_bins(self) -> int:
+        """
+        Número de bins, sem contar o de ausentes.
+        """
+        return len(self.woe) - 1
+
+    def transform_bins(self, values) -> np.ndarray:
+        """
+        Índice do bin de cada valor: `searchsorted` nos cortes, O(n log k).
+
+        Parâmetros:
+        - values (array-like ou pd.Series): Valores da variável.
+
+        Retorna:
+        - np.ndarray: Índice do bin; ausentes e categorias desconhecidas recebem `n_bins`.
+        """
+        if self.kind == 'categorical':
+            values = pd.Series(values)
+            return values.map(self.category_bins).fillna(self.n_bins).to_numpy(dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        bins = np.searchsorted(self.edges, values, side='right')
+        bins[np.isnan(values)] = self.n_bins
+        return bins
+
+    def transform_woe(self, values) -> np.ndarray:
+        """
+        WoE do bin de cada valor.
+
+        Parâmetros:
+        - values (array-like ou pd.Series): Valores da variável.
+
+        Retorna:
+        - np.ndarray: WoE por linha.
+        """
+        return self.woe[self.transform_bins(values)]
+
+
+def _segment_iv(good: np.ndarray, bad: np.ndarray, total_good: float, total_bad: float) -> np.ndarray:
+    """
+    Contribuição de IV de segmentos com as contagens dadas (vetorizado).
+    """
+    dist_good = (good + WOE_SMOOTHING) / (total_good + WOE_SMOOTHING)
+    dist_bad = (bad + WOE_SMOOTHING) / (total_bad + WOE_SMOOTHING)
+    return (dist_good - dist_bad) * np.log(dist_good / dist_bad)
+
+
+def _optimal_partition(
+    cum_good: np.ndarray,
+    cum_bad: np.ndarray,
+    max_bins: int,
+    min_count: float
+) -> list[int]:
+    """
+    Escolhe, entre os limites candidatos, a partição de maior IV total.
+
+    Com as contagens acumuladas, o IV de qualquer segmento [i, j) sai em O(1); a
+    partição ótima em até `max_bins` segmentos com pelo menos `min_count` contratos é
+    encontrada por programação dinâmica (o IV é aditivo entre os bins).
+
+    Parâmetros:
+    - cum_good, cum_bad (np.ndarray): Contagens acumuladas nos m + 1 limites candidatos (começando em 0).
+    - max_bins (int): Número máximo de bins.
+    - min_count (float): Tamanho mínimo de cada bin.
+
+    Retorna:
+    - list[int]: Índices dos limites internos escolhidos, em ordem.
+    """
+    m = len(cum_good) - 1
+    total_good, total_bad = cum_good[-1], cum_bad[-1]
+    good = cum_good[None, :] - cum_good[:, None]
+    bad = cum_bad[None, :] - cum_bad[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iv = _segment_iv(good, bad, total_good, total_bad)
+    valid = (np.arange(m + 1)[None, :] > np.arange(m + 1)[:, None]) & (good + bad >= min_count)
+    iv = np.where(valid, iv, -np.inf)
+
+    # best[k, j]: maior IV dividindo os j primeiros candidatos em k segmentos
+    best = np.full((max_bins + 1, m + 1), -np.inf)
+    choice = np.zeros((max_bins + 1, m + 1), dtype=np.int64)
+    best[0, 0] = 0.0
+    for k in range(1, max_bins + 1):
+        candidates = best[k - 1][:, None] + iv
+        choice[k] = np.argmax(candidates, axis=0)
+        best[k] = candidates[choice[k], np.arange(m + 1)]
+
+    k = int(np.argmax(best[:, m]))
+    if not np.isfinite(best[k, m]):
+        return []
+    cuts, j = [], m
+    while k > 0:
+        j = choice[k, j]
+        k -= 1
+        if j > 0:
+            cuts.append(int(j))
+    return cuts[::-1]
+
+
+def _bin_table(labels: list[str], good: np.ndarray, bad: np.ndarray) -> tuple[pd.DataFrame, np.ndarray, float]:
+    """
+    Tabela de WoE/IV a partir das contagens por bin (o último bin é o de ausentes).
+    """
+    total_good, total_bad = good.sum(), bad.sum()
+    dist_good = (good + WOE_SMOOTHING) / (total_good + WOE_SMOOTHING)
+    dist_bad = (bad + WOE_SMOOTHING) / (total_bad + WOE_SMOOTHING)
+    woe = np.log(dist_good / dist_bad)
+    iv = (dist_good - dist_bad) * woe
+    empty = good + bad == 0
+    woe[empty], iv[empty] = 0.0, 0.0
+    table = pd.DataFrame({
+        'bin': labels,
+        'Contratos': (good + bad).astype(np.int64),
+        'Bom Pagador': good.astype(np.int64),
+        'Mau Pagador': bad.astype(np.int64),
+        '% Mau Pagador': np.divide(bad, good + bad, out=np.zeros(len(bad)), where=~empty) * 100,
+        'WoE': woe,
+        'IV': iv,
+    })
+    return table, woe, float(iv.sum())
+
+
+def _fit_numeric(
+    column: str,
+    values: np.ndarray,
+    y: np.ndarray,
+    max_bins: int,
+    min_count: float,
+    max_prebins: int
+) -> FeatureBinning:
+    missing = np.isnan(values)
+    v, t = values[~missing], y[~missing]
+    order = np.argsort(v, kind='stable')
+    v, t = v[order], t[order]
+
+    # Limites candidatos: posições onde o valor muda, próximas de quantis igualmente espaçados
+    changes = np.flatnonzero(np.diff(v)) + 1
+    targets = np.linspace(0, len(v), max_prebins + 1)[1:-1]
+    idx = np.unique(np.clip(np.searchsorted(changes, targets), 0, max(len(changes) - 1, 0)))
+    boundaries = np.unique(changes[idx]) if len(changes) else np.empty(0, dtype=np.int64)
+
+    cum_bad_rows = np.concatenate([[0], np.cumsum(t)])
+    positions = np.concatenate([[0], boundaries, [len(v)]])
+    cum_bad = cum_bad_rows[positions].astype(np.float64)
+    cum_good = positions - cum_bad
+    cuts = _optimal_partition(cum_good, cum_bad, max_bins, min_count)
+
+    chosen = np.concatenate([[0], positions[cuts], [len(v)]]).astype(np.int64)
+    edges = v[chosen[1:-1]]
+    bad = np.diff(cum_bad_rows[chosen]).astype(np.float64)
+    good = np.diff(chosen) - bad
+    bounds = np.concatenate([[-np.inf], edges, [np.inf]])
+    labels = [f'[{lo:,.4g}, {hi:,.4g})' for lo, hi in zip(bounds[:-1], bounds[1:])] + ['Ausente']
+    good = np.append(good, (y[missing] == 0).sum())
+    bad = np.append(bad, (y[missing] == 1).sum())
+    table, woe, iv = _bin_table(labels, good, bad)
+    return FeatureBinning(column=column, kind='numeric', edges=edges, table=table, woe=woe, iv=iv)
+
+
+def _fit_categorical(
+    column: str,
+    values: pd.Series,
+    y: np.ndarray,
+    max_bins: int,
+    min_count: float
+) -> FeatureBinning:
+    codes, categories = pd.factorize(values, sort=True)
+    missing = codes < 0
+    counts = np.bincount(codes[~missing], minlength=len(categories)).astype(np.float64)
+    bad_counts = np.bincount(codes[~missing], weights=y[~missing], minlength=len(categories))
+    # Categorias ordenadas pela taxa de maus; só categorias vizinhas nessa ordem são agrupadas
+    order = np.argsort(bad_counts / np.maximum(counts, 1), kind='stable')
+    cum_bad = np.concatenate([[0], np.cumsum(bad_counts[order])])
+    cum_good = np.concatenate([[0], np.cumsum(counts[order])]) - cum_bad
+    cuts = _optimal_partition(cum_good, cum_bad, max_bins, min_count)
+
+    chosen = np.concatenate([[0], cuts, [len(categories)]]).astype(np.int64)
+    category_bins, labels = {}, []
+    for b, (start, stop) in enumerate(zip(chosen[:-1], chosen[1:])):
+        members = [categories[i] for i in order[start:stop]]
+        category_bins.update({category: b for category in members})
+        labels.append(', '.join(map(str, members)))
+    bad = np.append(np.diff(cum_bad[chosen]), (y[missing] == 1).sum())
+    good = np.append(np.diff(cum_good[chosen]), (y[missing] == 0).sum())
+    table, woe, iv = _bin_table(labels + ['Ausente'], good, bad)
+    return FeatureBinning(column=column, kind='categorical', category_bins=category_bins, table=table, woe=woe, iv=iv)
+
+
+def fit_binning(
+    df: pd.DataFrame,
+    column: str,
+    target: str = 'Bad',
+    max_bins: int = 6,
+    min_bin_share: float = 0.05,
+    max_prebins: int = 50
+) -> FeatureBinning:
+    """
+    Ajusta bins supervisionados de uma variável contra um alvo binário.
+
+    Variáveis numéricas são ordenadas uma vez; as contagens acumuladas de bons e maus
+    nos limites candidatos (até `max_prebins`, em quantis) dão o IV de qualquer bin, e
+    os cortes que maximizam o IV total são escolhidos por programação dinâmica.
+    Variáveis categóricas são ordenadas pela taxa de maus e agrupadas da mesma forma.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com a variável e o alvo.
+    - column (str): Variável.
+    - target (str): Alvo binário (0 = bom pagador, 1 = mau pagador).
+    - max_bins (int): Número máximo de bins (sem contar o de ausentes).
+    - min_bin_share (float): Fração mínima dos contratos em cada bin.
+    - max_prebins (int): Número máximo de limites candidatos.
+
+    Retorna:
+    - FeatureBinning: Bins, tabela de WoE e IV.
+    """
+    y = df[target].to_numpy(dtype=np.int64)
+    min_count = max(min_bin_share * len(df), 1)
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(values.dtype):
+        return _fit_categorical(column, values, y, max_bins, min_count)
+    return _fit_numeric(column, values.to_numpy(dtype=np.float64), y, max_bins, min_count, max_prebins)
+
+
+def rank_by_iv(binnings: dict[str, FeatureBinning]) -> pd.DataFrame:
+    """
+    Ordena as variáveis pelo Information Value.
+
+    Parâmetros:
+    - binnings (dict[str, FeatureBinning]): Bins ajustados por variável.
+
+    Retorna:
+    - pd.DataFrame: 'variavel', 'IV', 'Bins' e 'Poder preditivo', do maior para o menor IV.
+    """
+    ranking = pd.DataFrame({
+        'variavel': list(binnings),
+        'IV': [b.iv for b in binnings.values()],
+        'Bins': [b.n_bins for b in binnings.values()],
+    })
+    limits = [limit for limit, _ in IV_STRENGTH]
+    labels = [label for _, label in IV_STRENGTH]
+    ranking['Poder preditivo'] = [labels[i] for i in np.searchsorted(limits, ranking['IV'], side='right')]
+    return ranking.sort_values('IV', ascending=False, ignore_index=True)
+
+
+def plot_woe(binning: FeatureBinning):
+    """
+    Gráfico de barras do WoE por bin (sem o bin de ausentes, se estiver vazio).
+
+    Parâmetros:
+    - binning (FeatureBinning): Bins ajustados.
+
+    Retorna:
+    - plotly.graph_objects.Figure: Figura com o WoE e a % de maus pagadores por bin.
+    """
+    import plotly.express as px
+
+    table = binning.table
+    if table['Contratos'].iloc[-1] == 0:
+        table = table.iloc[:-1]
+    return px.bar(
+        table, x='bin', y='WoE', hover_data=['Contratos', '% Mau Pagador'],
+        title=f'WoE por bin de {binning.column} (IV = {binning.iv:.3f})'
+    )
+
+
+@st.cache_data
+@ARTIFACTS.cached('binnings')
+def _load_binnings_cached(columns: tuple[str, ...], target: str, version: tuple[int, int]) -> dict[str, FeatureBinning]:
+    df = load_features()
+    return {col: fit_binning(df, col, target) for col in columns}
+
+
+@profiled()
+def load_binnings(columns: Sequence[str], target: str = 'Bad') -> dict[str, FeatureBinning]:
+    """
+    Bins ajustados sobre `load_features()`, memoizados por variáveis, alvo e versão do arquivo.
+
+    Parâmetros:
+    - columns (Sequence[str]): Variáveis.
+    - target (str): Alvo binário.
+
+    Retorna:
+    - dict[str, FeatureBinning]: Bins por variável.
+    """
+    return _load_binnings_cached(tuple(columns), target, data_version())
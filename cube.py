@@ -0,0 +1,188 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from aggregation import AGGREGATE_COLUMNS, GROUP_COLUMNS, PortfolioAggregate
+from profiling import profiled
+from utils import ARTIFACTS, BAD_ATRASO_DIAS, LOSS_CORTE, REGIOES, data_version, load_data
+
+# Colunas lidas da base para montar o cubo
+CUBE_COLUMNS: List[str] = AGGREGATE_COLUMNS + ['score']
+# Faixas de 'score' e 'prazo': [e_i, e_i+1); valores fora do intervalo vão para a faixa da ponta
+SCORE_EDGES: np.ndarray = np.arange(0, 1001, 50)
+PRAZO_EDGES: np.ndarray = np.arange(0, 28, 3)
+# Medidas guardadas por célula
+MEASURES: List[str] = [
+    'Contratos', 'Bad', 'Loss_cat', 'soma_valor_contrato', 'soma_taxa_ponderada', 'soma_prazo_ponderado'
+]
+
+
+def _bin_codes(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+def _range_bounds(limits: Optional[tuple[float, float]], edges: np.ndarray) -> tuple[int, int]:
+    """
+    Faixas [a, b) cobertas por um intervalo (mín., máx.), arredondado para fora até os cortes.
+    """
+    n_bins = len(edges) - 1
+    if limits is None:
+        return 0, n_bins
+    low, high = limits
+    a = 0 if low is None else int(np.clip(np.searchsorted(edges, low, side='right') - 1, 0, n_bins))
+    b = n_bins if high is None else int(np.clip(np.searchsorted(edges, high, side='left'), a, n_bins))
+    return a, b
+
+
+@dataclass
+class RiskCube:
+    """
+    Cubo de agregados da carteira por estado × setor × faixa de score × faixa de prazo.
+
+    Cada célula guarda as medidas de MEASURES (contagem, Bad, Loss_cat e as somas de
+    `calculate_metrics`). Nos eixos de score e prazo o cubo guarda somas acumuladas, de
+    modo que qualquer intervalo sai de quatro cantos (inclusão-exclusão) e o custo de uma
+    consulta depende só do número de estados e setores, não do tamanho da base. A
+    região é derivada do estado, e filtrá-la equivale a filtrar os seus estados.
+
+    Contratos sem estado ou setor ocupam uma posição extra no fim do eixo: entram nos
+    totais, mas não nas tabelas por categoria (como em `compute_risk_tables`).
+
+    Atributos:
+    - estados (pd.Index): Estados, em ordem.
+    - setores (pd.Index): Setores, em ordem.
+    - regioes (pd.Index): Regiões dos estados, em ordem (derivado).
+    - prefix (np.ndarray): Somas acumuladas, forma (medidas, estados + 1, setores + 1, faixas de score + 1, faixas de prazo + 1).
+    """
+    estados: pd.Index
+    setores: pd.Index
+    prefix: np.ndarray = field(repr=False)
+
+    def __post_init__(self):
+        # Índices simples (não categóricos) e a matriz estado -> região, montados uma vez
+        self.estados = pd.Index(np.asarray(self.estados, dtype=object))
+        self.setores = pd.Index(np.asarray(self.setores, dtype=object))
+        regioes = self.estados.map(REGIOES)
+        self.regioes = pd.Index(sorted(set(regioes.dropna())))
+        self._estado_regiao = (self.regioes.to_numpy()[:, None] == regioes.to_numpy()[None, :]).astype(np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'RiskCube':
+        """
+        Monta o cubo a partir dos contratos, em uma passada de `np.bincount` por medida.
+
+        Parâmetros:
+        - df (pd.DataFrame): DataFrame com as colunas de CUBE_COLUMNS.
+
+        Retorna:
+        - RiskCube: Cubo da base.
+        """
+        estado_codes, estados = pd.factorize(df['estado'], sort=True)
+        setor_codes, setores = pd.factorize(df['setor'], sort=True)
+        estado_codes = np.where(estado_codes < 0, len(estados), estado_codes)
+        setor_codes = np.where(setor_codes < 0, len(setores), setor_codes)
+        score_codes = _bin_codes(df['score'].to_numpy(dtype=np.float64), SCORE_EDGES)
+        prazo_codes = _bin_codes(df['prazo'].to_numpy(dtype=np.float64), PRAZO_EDGES)
+        shape = (len(estados) + 1, len(setores) + 1, len(SCORE_EDGES) - 1, len(PRAZO_EDGES) - 1)
+        cell = np.ravel_multi_index((estado_codes, setor_codes, score_codes, prazo_codes), shape)
+
+        valor = df['valor_contrato'].to_numpy(dtype=np.float64)
+        loss = df['valor_em_aberto'].to_numpy(dtype=np.float64) / df['valor_contrato_mais_juros'].to_numpy(dtype=np.float64)
+        weights = {
+            'Contratos': None,
+            'Bad': (df['atraso_corrente'].to_numpy() > BAD_ATRASO_DIAS).astype(np.float64),
+            'Loss_cat': (loss > LOSS_CORTE).astype(np.float64),
+            'soma_valor_contrato': valor,
+            'soma_taxa_ponderada': df['taxa'].to_numpy(dtype=np.float64) * valor,
+            'soma_prazo_ponderado': df['prazo'].to_numpy(dtype=np.float64) * valor,
+        }
+        size = int(np.prod(shape))
+        cells = np.stack([np.bincount(cell, weights=weights[m], minlength=size) for m in MEASURES]).reshape(len(MEASURES), *shape)
+
+        prefix = np.zeros(cells.shape[:3] + (shape[2] + 1, shape[3] + 1))
+        prefix[..., 1:, 1:] = cells.cumsum(axis=3).cumsum(axis=4)
+        return cls(estados=pd.Index(estados), setores=pd.Index(setores), prefix=prefix)
+
+    def _mask(self, labels: pd.Index, selected: Optional[Sequence[str]]) -> np.ndarray:
+        # A posição extra (categoria ausente) só entra quando não há filtro
+        if selected is None:
+            return np.ones(len(labels) + 1, dtype=bool)
+        return np.append(labels.isin(list(selected)), False)
+
+    @profiled('cube.select')
+    def select(
+        self,
+        estados: Optional[Sequence[str]] = None,
+        setores: Optional[Sequence[str]] = None,
+        regioes: Optional[Sequence[str]] = None,
+        score: Optional[tuple[float, float]] = None,
+        prazo: Optional[tuple[float, float]] = None
+    ) -> PortfolioAggregate:
+        """
+        Agregado dos contratos que passam pelos filtros, somando as células do cubo.
+
+        O resultado responde às versões filtradas de `calculate_metrics` (`metrics`),
+        dos totais de Bad/Loss_cat (`class_totals`) e de `compute_risk_tables`
+        (`risk_tables`, para render_categorical_analysis).
+
+        Parâmetros:
+        - estados, setores, regioes (Sequence[str], opcional): Categorias aceitas. None = todas.
+        - score, prazo (tuple, opcional): Intervalo (mín., máx.), com mín. <= valor < máx. Os
+          limites são arredondados para fora até os cortes de SCORE_EDGES e PRAZO_EDGES; com
+          limites sobre os cortes o resultado é exato.
+
+        Retorna:
+        - PortfolioAggregate: Agregado da seleção.
+        """
+        s0, s1 = _range_bounds(score, SCORE_EDGES)
+        p0, p1 = _range_bounds(prazo, PRAZO_EDGES)
+        p = self.prefix
+        block = p[..., s1, p1] - p[..., s0, p1] - p[..., s1, p0] + p[..., s0, p0]
+
+        estado_mask = self._mask(self.estados, estados)
+        if regioes is not None:
+            estado_mask[:-1] &= self._estado_regiao[self.regioes.isin(list(regioes))].any(axis=0)
+            estado_mask[-1] = False
+        setor_mask = self._mask(self.setores, setores)
+        block = block * estado_mask[None, :, None] * setor_mask[None, None, :]
+        return self._to_aggregate(np.rint(block[:3]).astype(np.int64), block[3:])
+
+    def _to_aggregate(self, counts: np.ndarray, sums: np.ndarray) -> PortfolioAggregate:
+        n_contratos, n_bad, n_loss = counts.sum(axis=(1, 2))
+        soma_valor, soma_taxa, soma_prazo = sums.sum(axis=(1, 2))
+        by_estado = counts[:, :-1].sum(axis=2).T
+        by_setor = counts[:, :, :-1].sum(axis=1).T
+        flags = ['Contratos', 'Bad', 'Loss_cat']
+        group_counts = {
+            'estado': pd.DataFrame(by_estado, index=self.estados, columns=flags),
+            'setor': pd.DataFrame(by_setor, index=self.setores, columns=flags),
+            'regiao': pd.DataFrame(self._estado_regiao @ by_estado, index=self.regioes, columns=flags),
+        }
+        return PortfolioAggregate(
+            n_contratos=int(n_contratos),
+            soma_valor_contrato=float(soma_valor),
+            soma_taxa_ponderada=float(soma_taxa),
+            soma_prazo_ponderado=float(soma_prazo),
+            n_bad=int(n_bad),
+            n_loss=int(n_loss),
+            group_counts={col: group_counts[col] for col in GROUP_COLUMNS},
+        )
+
+
+@st.cache_resource
+@ARTIFACTS.cached('cube')
+def _load_cube_cached(version: tuple[int, int]) -> RiskCube:
+    return RiskCube.from_frame(load_data(CUBE_COLUMNS))
+
+
+@profiled()
+def load_cube() -> RiskCube:
+    """
+    Cubo da base atual, montado uma vez por versão do arquivo e compartilhado entre sessões.
+
+    Retorna:
+    - RiskCube: Cubo da base.
+    """
+    return _load_cube_cached(data_version())
@@ -0,0 +1,228 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from profiling import profiled
+from utils import ARTIFACTS, data_version, load_features
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Paleta padrão do Seaborn ("deep"), para manter as cores dos gráficos antigos
+CLASS_COLORS: list[str] = ['#4C72B0', '#DD8452', '#55A868', '#C44E52']
+
+
+@dataclass
+class DistributionSummary:
+    """
+    Resumo compacto da distribuição de uma coluna numérica por classe.
+
+    Guarda apenas o que os gráficos precisam (bins, curvas KDE e quantis do boxplot),
+    com tamanho independente do número de linhas da base.
+
+    Atributos:
+    - column (str): Coluna numérica resumida.
+    - target (str): Coluna de classe usada para separar as distribuições.
+    - edges (np.ndarray): Bordas dos bins do histograma, comuns a todas as classes.
+    - density (dict): Densidade do histograma por classe (normalizada por classe).
+    - kde_x (np.ndarray): Grade de avaliação das curvas KDE.
+    - kde_y (dict): Curva KDE por classe.
+    - box (pd.DataFrame): Por classe: 'q1', 'median', 'q3', 'lowerfence', 'upperfence' e 'n'.
+    - outliers (dict): Amostra (limitada) dos pontos fora dos whiskers, por classe.
+    """
+    column: str
+    target: str
+    edges: np.ndarray
+    density: dict = field(default_factory=dict)
+    kde_x: np.ndarray = field(default_factory=lambda: np.empty(0))
+    kde_y: dict = field(default_factory=dict)
+    box: pd.DataFrame = field(default_factory=pd.DataFrame)
+    outliers: dict = field(default_factory=dict)
+
+
+def _scott_bandwidth(values: np.ndarray) -> float:
+    # Banda de Scott em 1D, como `scipy.stats.gaussian_kde` (usada pelo Seaborn)
+    n = len(values)
+    return float(values.std(ddof=1) * n ** (-1 / 5)) if n >= 2 else 0.0
+
+
+def _binned_kde(values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    KDE gaussiana (banda de Scott, como o Seaborn) aproximada por binning linear.
+
+    Os valores são distribuídos linearmente entre os pontos da grade e a contagem é
+    convoluída com o kernel amostrado na grade, com custo O(n + grade × kernel).
+    """
+    n = len(values)
+    if n < 2 or grid[-1] <= grid[0]:
+        return np.zeros_like(grid)
+    bandwidth = _scott_bandwidth(values)
+    if bandwidth <= 0:
+        return np.zeros_like(grid)
+
+    dx = grid[1] - grid[0]
+    pos = (values - grid[0]) / dx
+    left = np.clip(np.floor(pos).astype(np.int64), 0, len(grid) - 2)
+    frac = pos - left
+    mass = np.bincount(left, weights=1 - frac, minlength=len(grid))
+    mass += np.bincount(left + 1, weights=frac, minlength=len(grid))
+
+    half = min(int(np.ceil(4 * bandwidth / dx)), len(grid) - 1)
+    offsets = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    return np.convolve(mass, kernel, mode='full')[half:half + len(grid)] / n
+
+
+@profiled()
+def summarize_distribution(
+    df: pd.DataFrame,
+    column: str,
+    target: str,
+    bins: int = 40,
+    grid_size: int = 200,
+    max_outliers: int = 500,
+    cut: float = 0.0
+) -> DistributionSummary:
+    """
+    Calcula em NumPy o histograma, a KDE e os quantis do boxplot de uma coluna por classe.
+
+    A grade da KDE é comum às classes e, como em `sns.histplot(kde=True)` (que usa
+    cut=0), vai do mínimo ao máximo dos dados. Com `cut` > 0 ela é estendida em `cut`
+    bandas da base inteira de cada lado, como em `sns.kdeplot` (cut=3).
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com os dados.
+    - column (str): Coluna numérica.
+    - target (str): Coluna de classe.
+    - bins (int): Número de bins do histograma (bordas comuns a todas as classes).
+    - grid_size (int): Número de pontos da grade da KDE.
+    - max_outliers (int): Máximo de outliers guardados por classe (amostra determinística).
+    - cut (float): Extensão da grade da KDE além dos dados, em bandas.
+
+    Retorna:
+    - DistributionSummary: Resumo pronto para os gráficos.
+    """
+    values = df[column].to_numpy(dtype=np.float64)
+    classes = df[target].to_numpy()
+    finite = np.isfinite(values)
+    values, classes = values[finite], classes[finite]
+
+    edges = np.histogram_bin_edges(values, bins=bins)
+    pad = cut * _scott_bandwidth(values)
+    grid = np.linspace(edges[0] - pad, edges[-1] + pad, grid_size)
+    summary = DistributionSummary(column=column, target=target, edges=edges, kde_x=grid)
+    rng = np.random.default_rng(0)
+
+    box_rows = {}
+    for cls in np.unique(classes):
+        v = values[classes == cls]
+        summary.density[cls] = np.histogram(v, bins=edges, density=True)[0]
+        summary.kde_y[cls] = _binned_kde(v, grid)
+
+        q1, median, q3 = np.quantile(v, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = v[(v >= q1 - 1.5 * iqr) & (v <= q3 + 1.5 * iqr)]
+        box_rows[cls] = {
+            'q1': q1, 'median': median, 'q3': q3,
+            'lowerfence': inside.min(), 'upperfence': inside.max(), 'n': len(v)
+        }
+        out = v[(v < inside.min()) | (v > inside.max())]
+        if len(out) > max_outliers:
+            out = rng.choice(out, max_outliers, replace=False)
+        summary.outliers[cls] = out
+    summary.box = pd.DataFrame.from_dict(box_rows, orient='index')
+    return summary
+
+
+@st.cache_data
+@ARTIFACTS.cached('distribution_summary')
+def _load_distribution_summary_cached(column: str, target: str, version: tuple[int, int]) -> DistributionSummary:
+    return summarize_distribution(load_features(), column, target)
+
+
+@profiled()
+def load_distribution_summary(column: str, target: str) -> DistributionSummary:
+    """
+    Versão memoizada de `summarize_distribution` sobre `load_features()`.
+
+    O cache é indexado por (coluna, alvo, versão do arquivo): uma nova execução da
+    página com as mesmas entradas apenas lê o resumo.
+
+    Parâmetros:
+    - column (str): Coluna numérica.
+    - target (str): Coluna de classe.
+
+    Retorna:
+    - DistributionSummary: Resumo da distribuição.
+    """
+    return _load_distribution_summary_cached(column, target, data_version())
+
+
+def plot_histogram_summary(summary: DistributionSummary, title: str) -> 'go.Figure':
+    """
+    Histograma em degraus com KDE por classe, desenhado a partir do resumo.
+
+    Parâmetros:
+    - summary (DistributionSummary): Resumo da distribuição.
+    - title (str): Título do gráfico.
+
+    Retorna:
+    - plotly.graph_objects.Figure: Figura do histograma.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    centers = (summary.edges[:-1] + summary.edges[1:]) / 2
+    for i, cls in enumerate(summary.density):
+        color = CLASS_COLORS[i % len(CLASS_COLORS)]
+        fig.add_trace(go.Scatter(
+            x=centers, y=summary.density[cls], mode='lines', line_shape='hvh',
+            fill='tozeroy', opacity=0.4, line=dict(color=color),
+            name=f'{summary.target} = {cls}', legendgroup=str(cls)
+        ))
+        fig.add_trace(go.Scatter(
+            x=summary.kde_x, y=summary.kde_y[cls], mode='lines', line=dict(color=color),
+            name=f'KDE {summary.target} = {cls}', legendgroup=str(cls), showlegend=False
+        ))
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=14)),
+        xaxis_title=summary.column, yaxis_title='Densidade',
+        height=350, margin=dict(l=10, r=10, t=40, b=10)
+    )
+    return fig
+
+
+def plot_boxplot_summary(summary: DistributionSummary, title: str) -> 'go.Figure':
+    """
+    Boxplot por classe desenhado a partir dos quantis pré-calculados.
+
+    Parâmetros:
+    - summary (DistributionSummary): Resumo da distribuição.
+    - title (str): Título do gráfico.
+
+    Retorna:
+    - plotly.graph_objects.Figure: Figura do boxplot.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for i, (cls, row) in enumerate(summary.box.iterrows()):
+        color = CLASS_COLORS[i % len(CLASS_COLORS)]
+        fig.add_trace(go.Box(
+            x=[str(cls)], q1=[row['q1']], median=[row['median']], q3=[row['q3']],
+            lowerfence=[row['lowerfence']], upperfence=[row['upperfence']],
+            marker_color=color, name=str(cls), boxpoints=False
+        ))
+        outliers = summary.outliers[cls]
+        fig.add_trace(go.Scatter(
+            x=[str(cls)] * len(outliers), y=outliers, mode='markers',
+            marker=dict(color=color, size=4, symbol='diamond-open'), showlegend=False
+        ))
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=14)),
+        xaxis_title=summary.target, yaxis_title=summary.column,
+        height=350, margin=dict(l=10, r=10, t=40, b=10), showlegend=False
+    )
+    return fig
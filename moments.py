@@ -0,0 +1,312 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from profiling import profiled
+from utils import ARTIFACTS, NUMERIC_COLUMNS, data_version, load_features, plot_correlation_heatmap
+
+# Variáveis da matriz de correlação da Questão 2: numéricas, Bad e Loss
+CORRELATION_COLUMNS: List[str] = NUMERIC_COLUMNS + ['Bad', 'Loss', 'Loss_cat']
+
+
+@dataclass
+class ClassMoments:
+    """
+    Estatísticas suficientes de colunas numéricas por classe de um alvo binário.
+
+    Valores ausentes (ou infinitos) são descartados como no pandas: por coluna nas
+    médias e variâncias (`describe()`) e por par de colunas na covariância e na
+    correlação (`df.corr()`). Por isso cada estatística é guardada por par (i, j),
+    sobre as linhas válidas nas duas colunas; a diagonal (i, i) tem as estatísticas
+    de cada coluna. Médias, variâncias, covariâncias e correlações por classe e da base
+    inteira saem dessas matrizes, sem materializar os subconjuntos de bons e maus
+    pagadores. Partes da base são combinadas com `merge` (fórmula de Chan), o que
+    mantém a estabilidade numérica de somas centradas.
+
+    Atributos:
+    - target (str): Coluna de classe.
+    - columns (List[str]): Colunas numéricas.
+    - classes (np.ndarray): Valores do alvo, em ordem crescente.
+    - counts (np.ndarray): Linhas válidas nas colunas i e j, por classe, forma (k, p, p).
+    - means (np.ndarray): Média da coluna i nessas linhas, forma (k, p, p).
+    - m2 (np.ndarray): Soma dos quadrados centrados da coluna i nessas linhas, forma (k, p, p).
+    - cross (np.ndarray): Produtos cruzados centrados de i e j nessas linhas, forma (k, p, p).
+    """
+    target: str
+    columns: List[str]
+    classes: np.ndarray = field(default_factory=lambda: np.empty(0))
+    counts: np.ndarray = field(default_factory=lambda: np.empty((0, 0, 0)))
+    means: np.ndarray = field(default_factory=lambda: np.empty((0, 0, 0)))
+    m2: np.ndarray = field(default_factory=lambda: np.empty((0, 0, 0)))
+    cross: np.ndarray = field(default_factory=lambda: np.empty((0, 0, 0)))
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        target: str,
+        columns: Optional[Sequence[str]] = None,
+        block_size: int = 1_000_000
+    ) -> 'ClassMoments':
+        """
+        Calcula as estatísticas em passadas vetorizadas por blocos de linhas.
+
+        Linhas sem valor no alvo são descartadas; valores ausentes nas colunas numéricas,
+        por coluna e por par (ver a classe).
+
+        Parâmetros:
+        - df (pd.DataFrame): DataFrame com as colunas numéricas e o alvo.
+        - target (str): Coluna de classe.
+        - columns (Sequence[str], opcional): Colunas numéricas. Por padrão, NUMERIC_COLUMNS.
+        - block_size (int): Linhas por bloco; limita a memória temporária a um bloco.
+
+        Retorna:
+        - ClassMoments: Estatísticas por classe.
+        """
+        columns = list(columns) if columns is not None else list(NUMERIC_COLUMNS)
+        stats = cls(target=target, columns=columns)
+        for start in range(0, len(df), block_size):
+            block = df.iloc[start:start + block_size]
+            stats.merge(cls._from_block(block[columns].to_numpy(dtype=np.float64), block[target].to_numpy(), target, columns))
+        return stats
+
+    @classmethod
+    def _from_block(cls, X: np.ndarray, y: np.ndarray, target: str, columns: List[str]) -> 'ClassMoments':
+        codes, classes = pd.factorize(y, sort=True)
+        classes = np.asarray(classes)
+        if (codes < 0).any():
+            X, codes = X[codes >= 0], codes[codes >= 0]
+        valid = np.isfinite(X)
+        W = valid.astype(np.float64)
+        # Deslocado pela média de cada coluna no bloco (somas menores, sem cancelamento);
+        # valores ausentes viram zero e saem das somas pelos pesos W
+        with np.errstate(invalid='ignore'):
+            shift = np.nan_to_num(np.nanmean(np.where(valid, X, np.nan), axis=0)) if len(X) else np.zeros(X.shape[1])
+        Xc = np.where(valid, X - shift, 0.0)
+        Xc2 = Xc * Xc
+
+        k, p = len(classes), X.shape[1]
+        counts, means, m2, cross = (np.zeros((k, p, p)) for _ in range(4))
+        for c in range(k):
+            in_class = (codes == c).astype(np.float64)[:, None]
+            Wc = W * in_class
+            n = W.T @ Wc
+            # [i, j]: somas da coluna i nas linhas válidas em i e j
+            mean = np.divide(Xc.T @ Wc, n, out=np.zeros((p, p)), where=n > 0)
+            counts[c] = n
+            means[c] = mean + shift[:, None]
+            m2[c] = np.maximum(Xc2.T @ Wc - n * mean * mean, 0)
+            cross[c] = Xc.T @ (Xc * in_class) - n * mean * mean.T
+        return cls(target=target, columns=columns, classes=classes, counts=counts, means=means, m2=m2, cross=cross)
+
+    def merge(self, other: 'ClassMoments') -> 'ClassMoments':
+        """
+        Combina as estatísticas de outra parte da base a estas.
+
+        Parâmetros:
+        - other (ClassMoments): Estatísticas das mesmas colunas e alvo.
+
+        Retorna:
+        - ClassMoments: O próprio objeto, atualizado.
+        """
+        if other.columns != self.columns or other.target != self.target:
+            raise ValueError("Só é possível combinar estatísticas das mesmas colunas e alvo.")
+        # Sem classes ainda, mantém o tipo do alvo (a união com o vetor vazio o converteria em float)
+        classes = np.union1d(self.classes, other.classes) if len(self.classes) else np.asarray(other.classes)
+        p = len(self.columns)
+        merged = [np.zeros((len(classes), p, p)) for _ in range(4)]
+        for part in (self, other):
+            idx = np.searchsorted(classes, part.classes)
+            for i, j in enumerate(idx):
+                combined = _combine(
+                    tuple(m[j] for m in merged), (part.counts[i], part.means[i], part.m2[i], part.cross[i])
+                )
+                for m, value in zip(merged, combined):
+                    m[j] = value
+        self.classes = classes
+        self.counts, self.means, self.m2, self.cross = merged
+        return self
+
+    def total(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Combina as classes nas estatísticas da base inteira.
+
+        Retorna:
+        - tuple: Contagens, médias, M2 e produtos cruzados por par de colunas, forma (p, p) cada.
+        """
+        p = len(self.columns)
+        stats = tuple(np.zeros((p, p)) for _ in range(4))
+        for i in range(len(self.classes)):
+            stats = _combine(stats, (self.counts[i], self.means[i], self.m2[i], self.cross[i]))
+        return stats
+
+    def class_counts(self) -> pd.DataFrame:
+        """
+        Valores válidos por classe e variável, como a linha 'count' de `describe()`.
+        """
+        counts = np.diagonal(self.counts, axis1=1, axis2=2)
+        return pd.DataFrame(counts, index=pd.Index(self.classes, name=self.target), columns=self.columns)
+
+    def class_means(self) -> pd.DataFrame:
+        """
+        Médias por classe (linhas: classes; colunas: variáveis), como a linha 'mean' de `describe()`.
+        """
+        means = np.diagonal(self.means, axis1=1, axis2=2)
+        means = np.where(np.diagonal(self.counts, axis1=1, axis2=2) > 0, means, np.nan)
+        return pd.DataFrame(means, index=pd.Index(self.classes, name=self.target), columns=self.columns)
+
+    def class_variances(self, ddof: int = 1) -> pd.DataFrame:
+        """
+        Variâncias por classe (ddof=1, como `describe()` e `var()` do pandas).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variances = np.diagonal(self.m2, axis1=1, axis2=2) / (np.diagonal(self.counts, axis1=1, axis2=2) - ddof)
+        return pd.DataFrame(variances, index=pd.Index(self.classes, name=self.target), columns=self.columns)
+
+    def covariance(self, ddof: int = 1) -> pd.DataFrame:
+        """
+        Matriz de covariância da base inteira (todas as classes), por pares, como `df.cov()`.
+        """
+        n, _, _, cross = self.total()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = np.where(n > ddof, cross / (n - ddof), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Matriz de correlação de Pearson da base inteira, igual a `df[columns].corr()`.
+        """
+        _, _, m2, cross = self.total()
+        # Desvios de i e de j nas linhas válidas no par: m2[i, j] e m2[j, i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cross / np.sqrt(m2 * m2.T)
+        np.fill_diagonal(corr, np.where(np.diagonal(m2) > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def mean_percent_diff(self, good=0, bad=1) -> pd.Series:
+        """
+        Diferença percentual das médias entre as classes: (bom − mau) / mau × 100.
+
+        Variáveis com média zero entre os maus pagadores têm diferença 0. Se uma das
+        classes não ocorre na base, todas as diferenças são NaN.
+
+        Parâmetros:
+        - good: Valor do alvo dos bons pagadores.
+        - bad: Valor do alvo dos maus pagadores.
+
+        Retorna:
+        - pd.Series: Diferença percentual por variável.
+        """
+        means = self.class_means()
+        if good not in means.index or bad not in means.index:
+            return pd.Series(np.nan, index=self.columns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = (means.loc[good] - means.loc[bad]) / means.loc[bad] * 100
+        return percent.replace([np.inf, -np.inf], 0).fillna(0)
+
+
+def _combine(a: tuple, b: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Combina duas partes (contagens, médias, M2, produtos cruzados), elemento a elemento
+    por par de colunas, pela fórmula paralela de Chan et al.
+    """
+    n_a, mean_a, m2_a, cross_a = a
+    n_b, mean_b, m2_b, cross_b = b
+    n = n_a + n_b
+    share_b = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+    weight = n_a * share_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * share_b
+    m2 = m2_a + m2_b + delta * delta * weight
+    cross = cross_a + cross_b + delta * delta.T * weight
+    return n, mean, m2, cross
+
+
+def spearman_correlation(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Correlação de Spearman: Pearson sobre os postos (empates com posto médio).
+
+    Ao contrário das médias e covariâncias, os postos dependem da base inteira, de modo
+    que esta matriz não é combinável entre partes. Com valores ausentes, os postos são
+    os de cada coluna, enquanto `df.corr(method='spearman')` reordena cada par só nas
+    linhas válidas nele: os resultados podem diferir levemente.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com as colunas numéricas.
+    - columns (Sequence[str], opcional): Colunas. Por padrão, NUMERIC_COLUMNS.
+
+    Retorna:
+    - pd.DataFrame: Matriz de correlação de Spearman.
+    """
+    columns = list(columns) if columns is not None else list(NUMERIC_COLUMNS)
+    ranks = df[columns].rank(method='average')
+    ranks['_classe'] = 0
+    return ClassMoments.from_frame(ranks, '_classe', columns).correlation()
+
+
+@st.cache_data
+@ARTIFACTS.cached('class_moments')
+def _load_class_moments_cached(target: str, columns: tuple[str, ...], version: tuple[int, int]) -> ClassMoments:
+    return ClassMoments.from_frame(load_features(), target, columns)
+
+
+@profiled()
+def load_class_moments(target: str = 'Bad', columns: Optional[Sequence[str]] = None) -> ClassMoments:
+    """
+    Versão memoizada de `ClassMoments.from_frame` sobre `load_features()`, por alvo,
+    colunas e versão do arquivo.
+
+    Parâmetros:
+    - target (str): Coluna de classe.
+    - columns (Sequence[str], opcional): Colunas numéricas. Por padrão, NUMERIC_COLUMNS.
+
+    Retorna:
+    - ClassMoments: Estatísticas por classe.
+    """
+    columns = tuple(columns) if columns is not None else tuple(NUMERIC_COLUMNS)
+    return _load_class_moments_cached(target, columns, data_version())
+
+
+@st.cache_data
+@ARTIFACTS.cached('spearman')
+def _load_spearman_cached(columns: tuple[str, ...], version: tuple[int, int]) -> pd.DataFrame:
+    return spearman_correlation(load_features(), columns)
+
+
+@profiled()
+def load_spearman_correlation(columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Versão memoizada de `spearman_correlation` sobre `load_features()`.
+
+    Parâmetros:
+    - columns (Sequence[str], opcional): Colunas. Por padrão, NUMERIC_COLUMNS.
+
+    Retorna:
+    - pd.DataFrame: Matriz de correlação de Spearman.
+    """
+    columns = tuple(columns) if columns is not None else tuple(NUMERIC_COLUMNS)
+    return _load_spearman_cached(columns, data_version())
+
+
+@st.cache_data
+@ARTIFACTS.cached('correlation_figure')
+def _load_correlation_figure_cached(method: str, version: tuple[int, int]):
+    if method == 'spearman':
+        return plot_correlation_heatmap(load_spearman_correlation(CORRELATION_COLUMNS), "Matriz de Correlação (Spearman)")
+    return plot_correlation_heatmap(load_class_moments('Bad', CORRELATION_COLUMNS).correlation(), "Matriz de Correlação")
+
+
+@profiled()
+def load_correlation_figure(method: str = 'pearson'):
+    """
+    Figura da matriz de correlação de CORRELATION_COLUMNS, por método e versão da base.
+
+    Parâmetros:
+    - method (str): 'pearson' ou 'spearman'.
+
+    Retorna:
+    - plotly.graph_objects.Figure: Figura da matriz de correlação.
+    """
+    return _load_correlation_figure_cached(method, data_version())
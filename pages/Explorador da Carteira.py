@@ -0,0 +1,59 @@
+import streamlit as st
+from cube import PRAZO_EDGES, SCORE_EDGES, load_cube
+from utils import REGIOES, render_categorical_analysis
+from profiling import begin_page, end_page
+from precompute import ensure_precompute_worker
+
+st.set_page_config(layout="wide")
+st.title("Explorador da Carteira")
+begin_page("Explorador da Carteira")
+ensure_precompute_worker()
+
+# Cubo pré-agregado: cada filtro soma células em vez de reprocessar os contratos
+cube = load_cube()
+
+st.markdown("Filtre a carteira por região, estado, setor, score e prazo; métricas e tabelas de risco são recalculadas a partir do cubo.")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    regioes = st.multiselect("Região", list(cube.regioes), key='cube_regioes')
+with col2:
+    # Filtros cruzados: só os estados das regiões escolhidas e os setores com contratos neles
+    estados_disponiveis = cube.estados if not regioes else cube.estados[cube.estados.map(REGIOES).isin(regioes)]
+    estados = st.multiselect("Estado", list(estados_disponiveis), key='cube_estados')
+with col3:
+    setor_counts = cube.select(estados=estados or None, regioes=regioes or None).group_counts['setor']['Contratos']
+    setores = st.multiselect("Setor", list(setor_counts.index[setor_counts > 0]), key='cube_setores')
+
+col1, col2 = st.columns(2)
+with col1:
+    score = st.slider("Score", int(SCORE_EDGES[0]), int(SCORE_EDGES[-1]), (int(SCORE_EDGES[0]), int(SCORE_EDGES[-1])), step=int(SCORE_EDGES[1] - SCORE_EDGES[0]), key='cube_score')
+with col2:
+    prazo = st.slider("Prazo (anos)", int(PRAZO_EDGES[0]), int(PRAZO_EDGES[-1]), (int(PRAZO_EDGES[0]), int(PRAZO_EDGES[-1])), step=int(PRAZO_EDGES[1] - PRAZO_EDGES[0]), key='cube_prazo')
+
+# Nos extremos dos sliders o intervalo fica aberto, incluindo valores fora dos cortes
+selecao = cube.select(
+    estados=estados or None,
+    setores=setores or None,
+    regioes=regioes or None,
+    score=(None if score[0] == SCORE_EDGES[0] else score[0], None if score[1] == SCORE_EDGES[-1] else score[1]),
+    prazo=(None if prazo[0] == PRAZO_EDGES[0] else prazo[0], None if prazo[1] == PRAZO_EDGES[-1] else prazo[1]),
+)
+
+if selecao.n_contratos == 0:
+    st.warning("Nenhum contrato na seleção.")
+else:
+    ticket_medio, taxa_media, prazo_medio = selecao.metrics()
+    cols = st.columns(5)
+    cols[0].metric(label="Contratos", value=f"{selecao.n_contratos:,}")
+    cols[1].metric(label="Ticket Médio", value=f"R$ {ticket_medio:,.2f}")
+    cols[2].metric(label="Taxa Média", value=f"{taxa_media:.4f}%")
+    cols[3].metric(label="Prazo Médio", value=f"{prazo_medio:.2f} anos")
+    cols[4].metric(label="% Bad", value=f"{selecao.n_bad / selecao.n_contratos * 100:.2f}%")
+
+    class_column = st.radio("Alvo:", ['Bad', 'Loss_cat'], horizontal=True, key='cube_alvo')
+    categorical_columns = ['regiao', 'estado', 'setor']
+    tabelas, totais = selecao.risk_tables(categorical_columns, [class_column])
+    render_categorical_analysis(tabelas, totais, categorical_columns, class_column)
+
+end_page()
@@ -1,10 +1,15 @@
 import streamlit as st
-from utils import load_data, calculate_metrics
+from aggregation import load_aggregate
+from segments import load_segment_statistics
+from profiling import begin_page, end_page
+from precompute import ensure_precompute_worker
 
 st.title("Questão 1: Métricas Gerais")
+begin_page("Questão 1")
+ensure_precompute_worker()
 
-df = load_data()
-ticket_medio, taxa_media, prazo_medio = calculate_metrics(df)
+# Agregação em blocos: não exige a base inteira em memória
+ticket_medio, taxa_media, prazo_medio = load_aggregate().metrics()
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -13,3 +18,39 @@ with col2:
     st.metric(label="Taxa Média", value=f"{taxa_media:.4f}%")
 with col3:
     st.metric(label="Prazo Médio", value=f"{prazo_medio:.2f} anos")
+
+# Estatísticas por segmento calculadas em uma passada, sem manter as linhas em memória
+stats = load_segment_statistics()
+carteira = stats.table('carteira').iloc[0]
+col1, col2 = st.columns(2)
+with col1:
+    st.metric(label="Ticket Mediano", value=f"R$ {carteira['p50 valor_contrato']:,.2f}")
+with col2:
+    st.metric(label="P95 do Valor em Aberto", value=f"R$ {carteira['p95 valor_em_aberto']:,.2f}")
+
+st.markdown("### Métricas por segmento")
+group = st.radio(
+    "Segmentar por", ['estado', 'setor', 'regiao'], horizontal=True,
+    format_func={'estado': 'Estado', 'setor': 'Setor', 'regiao': 'Região'}.get
+)
+st.dataframe(
+    stats.table(group).sort_values('Contratos', ascending=False),
+    use_container_width=True,
+    column_config={
+        'Ticket Médio': st.column_config.NumberColumn(format='R$ %.2f'),
+        'Desvio Ticket': st.column_config.NumberColumn(format='R$ %.2f'),
+        'Taxa Média': st.column_config.NumberColumn(format='%.4f%%'),
+        'Desvio Taxa': st.column_config.NumberColumn(format='%.4f'),
+        'Prazo Médio': st.column_config.NumberColumn(format='%.2f anos'),
+        'Desvio Prazo': st.column_config.NumberColumn(format='%.2f'),
+        'Valor em Aberto': st.column_config.NumberColumn(format='R$ %.2f'),
+        'p50 valor_contrato': st.column_config.NumberColumn('Ticket Mediano', format='R$ %.2f'),
+        'p95 valor_em_aberto': st.column_config.NumberColumn('P95 Valor em Aberto', format='R$ %.2f'),
+    }
+)
+st.caption(
+    "Médias e desvios são exatos (taxa e prazo ponderados pelo valor do contrato); "
+    "mediana e P95 são aproximados por sketches de quantis."
+)
+
+end_page()
@@ -1,32 +1,30 @@
 import streamlit as st
-import plotly.express as px
 import plotly.graph_objects as go
-from utils import load_data, create_bad_column, plot_boxplot, plot_correlation_matrix, plot_scatter, plot_seaborn_histogram, analyze_categorical_features
-import numpy as np
-import pandas as pd
+from utils import NUMERIC_COLUMNS, data_version, load_features, scatter_jobs, render_categorical_analysis
+from aggregation import load_aggregate
+from moments import load_class_moments, load_correlation_figure
+from precompute import ensure_precompute_worker
+from rendering import display_figures
+from profiling import begin_page, end_page, profile_step
+from distributions import load_distribution_summary, plot_boxplot_summary, plot_histogram_summary
 
 st.set_page_config(layout='wide')
 st.title("Questão 2: Contratos Bons vs Ruins")
+begin_page("Questão 2")
+ensure_precompute_worker()
 
 # Load data
-df = load_data()
-df, df_bad, df_good = create_bad_column(df)
+df = load_features()
+version = data_version()
+categorical_columns = ['estado', 'setor', 'regiao']
+numerical_columns = list(NUMERIC_COLUMNS)
 
-# Container for Good vs Bad Comparison
-with st.container():
+
+def section_mean_comparison() -> None:
     st.markdown("## Comparação: Contratos Bons vs Ruins")
-    
-    numerical_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-    numerical_columns.remove('Bad')
-    
-    good_stats = df_good[numerical_columns].describe().round(2)
-    bad_stats = df_bad[numerical_columns].describe().round(2)
-    
-    # Plot percentage differences in means
     st.markdown("### Diferença Percentual nas Médias (Bom - Mau)")
-    mean_diff = good_stats.loc['mean'] - bad_stats.loc['mean']
-    percent_diff = mean_diff / bad_stats.loc['mean'] * 100
-    percent_diff = percent_diff.replace([np.inf, -np.inf], 0) 
+    # Médias por classe das estatísticas suficientes, sem separar bons e maus em cópias
+    percent_diff = load_class_moments('Bad').mean_percent_diff()
     fig = go.Figure()
     fig.add_trace(
         go.Bar(
@@ -45,37 +43,36 @@ with st.container():
     )
     st.plotly_chart(fig, use_container_width=True)
 
-# Container para Análise Numérica
-with st.container():
-    st.markdown("## Análise Numérica")
-    numerical_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-    numerical_columns.remove('Bad')
-    selected_numerical = st.multiselect("Selecione as variáveis numéricas para análise", numerical_columns, default=numerical_columns)
 
-    # Histogramas em colunas
-    st.markdown("### Histogramas")
+def section_distributions(target: str) -> None:
+    st.markdown(f"### Histogramas para {target}")
     cols = st.columns(3)
     for i, col in enumerate(selected_numerical):
         with cols[i % 3]:
-            plot_seaborn_histogram(df, col, 'Bad', f"Distribuição de {col} por Bad")
+            st.plotly_chart(plot_histogram_summary(load_distribution_summary(col, target), f"Distribuição de {col} por {target}"), use_container_width=True)
 
-    # Boxplots
-    st.markdown("### Boxplots")
+    st.markdown(f"### Boxplots para {target}")
     cols = st.columns(3)
     for i, col in enumerate(selected_numerical):
         with cols[i % 3]:
-            plot_boxplot(df, 'Bad', col, f"Boxplot de {col} por Bad")
+            st.plotly_chart(plot_boxplot_summary(load_distribution_summary(col, target), f"Boxplot de {col} por {target}"), use_container_width=True)
+
+
+def section_scatter(base: str) -> None:
+    st.markdown(f"### Scatter Plots para {base}")
+    display_figures(scatter_jobs(df, base, selected_numerical), n_columns=4, cache_key=('scatter', base, version))
+
 
-    # Scatter Plots
-    st.markdown("### Scatter Plots para Bad")
-    plot_scatter(df, 'Bad', selected_numerical)
+def section_categorical(class_column: str) -> None:
+    st.markdown(f"## Análise Categórica para {class_column}")
+    # Tabelas do agregado da carteira, mantido por deltas na ingestão incremental
+    risk_tables, risk_totals = load_aggregate().risk_tables(categorical_columns, ['Bad', 'Loss_cat'])
+    render_categorical_analysis(risk_tables, risk_totals, categorical_columns, class_column)
+    if class_column == 'Bad':
+        st.markdown(BAD_ANALYSIS_MD)
 
-# Container para Análise Categórica
-with st.container():
-    st.markdown("## Análise Categórica")
-    analyze_categorical_features(df, ['estado', 'setor', 'regiao'], 'Bad')
 
-st.markdown("""# Análise de Crédito: Perfil de Bons vs Maus Pagadores
+BAD_ANALYSIS_MD = """# Análise de Crédito: Perfil de Bons vs Maus Pagadores
 
 ## 📊 Análise Numérica (Variáveis Quantitativas)
 
@@ -145,36 +142,41 @@ A análise sugere que, apesar de apresentarem maior faturamento, esses clientes
 | Sudeste | 26.21% | Na média |
 | Nordeste | 24.05% | |
 | Sul | 24.40% | |
-| Norte | 24.03% | |""")
+| Norte | 24.03% | |"""
 
-# Container para Loss
-with st.container():
-    st.markdown("## Análise de Loss")
-    df['Loss'] = df['valor_em_aberto'] / df['valor_contrato_mais_juros']
-    df['Loss_cat'] = pd.cut(df['Loss'], bins=[0, 0.2, float('inf')], labels=[0, 1], include_lowest=True).astype(int)
 
+def section_correlation() -> None:
     st.markdown("### Matriz de Correlação")
-    fig_corr = plot_correlation_matrix(df, "Matriz de Correlação")
-    st.plotly_chart(fig_corr)
-
-    st.markdown("### Histogramas para Loss_cat")
-    cols = st.columns(3)
-    for i, col in enumerate(selected_numerical):
-        with cols[i % 3]:
-            plot_seaborn_histogram(df.round(2), col, 'Loss_cat', f"Distribuição de {col} por Loss_cat")
-
-    st.markdown("### Boxplots para Loss_cat")
-    cols = st.columns(3)
-    for i, col in enumerate(selected_numerical):
-        with cols[i % 3]:
-            plot_boxplot(df, 'Loss_cat', col, f"Boxplot de {col} por Loss_cat")
-
-    st.markdown("### Scatter Plots para Loss")
-    plot_scatter(df, 'Loss', selected_numerical)
-
-    st.markdown("### Análise Categórica para Loss_cat")
-    analyze_categorical_features(df, ['estado', 'setor', 'regiao'], 'Loss_cat')
+    st.plotly_chart(load_correlation_figure('pearson'))
+    if st.toggle("Incluir correlação de Spearman (postos)", key='q2_spearman'):
+        st.plotly_chart(load_correlation_figure('spearman'))
+
+
+# Cada seção só é calculada quando selecionada; os resultados ficam memoizados
+# por seção e por seleção de variáveis, então alternar entre seções é incremental.
+SECTIONS = {
+    "Comparação de médias": section_mean_comparison,
+    "Distribuições por Bad": lambda: section_distributions('Bad'),
+    "Scatter por Bad": lambda: section_scatter('Bad'),
+    "Análise categórica (Bad)": lambda: section_categorical('Bad'),
+    "Matriz de correlação": section_correlation,
+    "Distribuições por Loss_cat": lambda: section_distributions('Loss_cat'),
+    "Scatter por Loss": lambda: section_scatter('Loss'),
+    "Análise categórica (Loss_cat)": lambda: section_categorical('Loss_cat'),
+}
+
+section = st.radio("Seção", list(SECTIONS), horizontal=True, key='q2_section')
+# Sempre renderizado, para que a seleção persista ao alternar entre seções
+selected_numerical = st.multiselect(
+    "Selecione as variáveis numéricas para análise", numerical_columns,
+    default=numerical_columns, key='q2_numerical'
+)
+
+with st.container(), profile_step(f"Seção: {section}"):
+    SECTIONS[section]()
 
 st.markdown("""
 ### Após as análises, podemos concluir que as métricas para bons e maus pagadores com Loss e Bad são bem parecidas, inclusive, ao separar o loss na categoria de <20% e >20%, temos uma distribuição bem parecida com a do Bad, uma vez que Bad e Loss estão fortemente relacionados.
-""")
\ No newline at end of file
+""")
+
+end_page()
@@ -1,14 +1,17 @@
 import streamlit as st
-from utils import load_data, create_new_features, plot_seaborn_histogram, plot_boxplot, plot_scatter,create_bad_column
-import pandas as pd
+from utils import NEW_METRIC_COLUMNS, data_version, load_features, scatter_jobs
+from rendering import display_figures
+from distributions import load_distribution_summary, plot_histogram_summary
+from profiling import begin_page, end_page
+from binning import IV_COLUMNS, load_binnings, plot_woe, rank_by_iv
+from precompute import ensure_precompute_worker
 
 st.set_page_config(layout="wide")
 st.title("Questão 3: Novas Métricas")
+begin_page("Questão 3")
+ensure_precompute_worker()
 
-df = load_data()
-df, df_bad, df_good = create_bad_column(df)
-df['Loss'] = df['valor_em_aberto'] / df['valor_contrato_mais_juros']
-df['Loss_cat'] = pd.cut(df['Loss'], bins=[0, 0.2, float('inf')], labels=[0, 1], include_lowest=True).astype(int)
+df = load_features()
 
 st.markdown("""
 # Novas Métricas para Análise de Crédito
@@ -29,27 +32,43 @@ Ambas as métricas têm o objetivo de mostrar que qualquer métrica que consider
 
 ---
 """)
-new_metrics_df = create_new_features(df)
+new_metrics_df = df
 
-new_cols = ['ratio_contrato_faturamento','score','ratio_valor_prazo','ratio_atraso_prazo','ratio_contrato_faturamento_cat','score_cat']
+new_cols = NEW_METRIC_COLUMNS
+version = data_version()
+
+st.markdown("""
+### Ranking das Métricas por Information Value
+
+Cada métrica é dividida em faixas com cortes escolhidos para maximizar a separação entre bons e maus pagadores (**Bad**).
+O **Information Value (IV)** resume essa separação: abaixo de 0,02 a métrica não é preditiva; acima de 0,5, vale verificar se ela não usa informação posterior à concessão.
+""")
+binnings = load_binnings(IV_COLUMNS, 'Bad')
+st.dataframe(rank_by_iv(binnings).style.format({'IV': '{:.4f}'}), hide_index=True)
+selected = st.selectbox("Faixas e WoE da métrica:", list(binnings), key='q3_binning')
+cols = st.columns(2)
+with cols[0]:
+    st.plotly_chart(plot_woe(binnings[selected]), use_container_width=True)
+with cols[1]:
+    st.dataframe(binnings[selected].table.style.format({'% Mau Pagador': '{:.2f}', 'WoE': '{:.3f}', 'IV': '{:.4f}'}), hide_index=True)
 
 st.markdown("### Histogramas para Novas Métricas por Bad")
 cols = st.columns(3)
 for i, col in enumerate(new_cols):
     with cols[i % 3]:
-        plot_seaborn_histogram(new_metrics_df, col, 'Bad', f"Distribuição de {col} por Bad")
+        st.plotly_chart(plot_histogram_summary(load_distribution_summary(col, 'Bad'), f"Distribuição de {col} por Bad"), use_container_width=True)
 
 st.markdown("### Scatter Plots para Novas Métricas por Bad")
-plot_scatter(new_metrics_df,'Bad',new_cols)
+display_figures(scatter_jobs(new_metrics_df, 'Bad', new_cols), n_columns=4, cache_key=('scatter', 'Bad', version))
 
 st.markdown("### Histogramas para Novas Métricas por Loss categórico")
 cols = st.columns(3)
 for i, col in enumerate(new_cols):
     with cols[i % 3]:
-        plot_seaborn_histogram(new_metrics_df, col, 'Loss_cat', f"Distribuição de {col} por Loss")
+        st.plotly_chart(plot_histogram_summary(load_distribution_summary(col, 'Loss_cat'), f"Distribuição de {col} por Loss"), use_container_width=True)
 
 st.markdown("### Scatter Plots para Novas Métricas por Loss")
-plot_scatter(new_metrics_df,'Loss',new_cols)
+display_figures(scatter_jobs(new_metrics_df, 'Loss', new_cols), n_columns=4, cache_key=('scatter', 'Loss', version))
 
 st.markdown("""
 ## Conclusões
@@ -58,3 +77,5 @@ Conforme mencionado anteriormente, métricas baseadas em atraso e valor devido a
 A métrica que utiliza a razão entre o valor do contrato e o faturamento se aproxima do desempenho do score tradicional, conseguindo separar razoavelmente bem bons e maus pagadores.
 Essa abordagem reforça a importância de criar métricas que capturem características financeiras relevantes no momento da concessão do crédito, possibilitando uma análise mais eficaz e antecipada do risco.
 """)
+
+end_page()
@@ -0,0 +1,63 @@
+import numpy as np
+import streamlit as st
+import plotly.express as px
+from scenarios import DEFAULT_ATRASO_CORTES, load_scenarios, pareto_frontier
+from profiling import begin_page, end_page
+from precompute import ensure_precompute_worker
+
+st.set_page_config(layout="wide")
+st.title("Simulador de Cenários")
+begin_page("Simulador de Cenários")
+ensure_precompute_worker()
+
+st.markdown("""
+Cada cenário combina uma **definição de Bad** (corte de atraso), um **score mínimo de aprovação**, um **choque na taxa** e uma **mudança no prazo**.
+Para cada um são calculados o volume aprovado, a taxa de Bad, a perda esperada e a taxa média ponderada; a grade inteira é avaliada de uma vez.
+""")
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    atraso_cortes = st.multiselect("Cortes de atraso (dias)", [0, 30, 60, 90, 120, 180, 270, 360], default=list(DEFAULT_ATRASO_CORTES), key='cen_atraso')
+with col2:
+    passo_score = st.select_slider("Passo do score mínimo", [10, 25, 50, 100], value=50, key='cen_passo')
+with col3:
+    choques = st.slider("Choque na taxa (p.p.)", -3.0, 3.0, (-1.0, 1.0), step=0.5, key='cen_choque')
+with col4:
+    fatores = st.slider("Fator de prazo", 0.5, 1.5, (0.75, 1.25), step=0.25, key='cen_prazo')
+
+if not atraso_cortes:
+    st.warning("Escolha ao menos um corte de atraso.")
+else:
+    cenarios = load_scenarios(
+        sorted(atraso_cortes),
+        range(0, 1000, passo_score),
+        np.arange(choques[0], choques[1] + 0.25, 0.5),
+        np.arange(fatores[0], fatores[1] + 0.125, 0.25),
+    )
+    st.markdown(f"**{len(cenarios):,} cenários avaliados.**")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        eixo_x = st.selectbox("Risco (eixo X)", ['Perda Esperada (%)', 'Taxa de Bad (%)'], key='cen_x')
+    with col2:
+        eixo_y = st.selectbox("Retorno (eixo Y)", ['Volume Aprovado', 'Resultado', 'Juros'], key='cen_y')
+    with col3:
+        cor = st.selectbox("Cor", ['score_minimo', 'atraso_corte', 'choque_taxa', 'fator_prazo'], key='cen_cor')
+
+    # Cada corte de atraso é uma definição de Bad: os riscos só são comparáveis dentro do mesmo corte
+    eficiente = pareto_frontier(cenarios, maximize=eixo_y, minimize=eixo_x, by='atraso_corte')
+    fronteira = cenarios[eficiente].sort_values(['atraso_corte', eixo_x])
+    fig = px.scatter(
+        cenarios, x=eixo_x, y=eixo_y, color=cor, opacity=0.5,
+        hover_data=['score_minimo', 'atraso_corte', 'choque_taxa', 'fator_prazo', 'Contratos Aprovados', 'Taxa Média'],
+        title=f"Fronteira: {eixo_y} × {eixo_x}"
+    )
+    for corte, pontos in fronteira.groupby('atraso_corte'):
+        fig.add_scatter(x=pontos[eixo_x], y=pontos[eixo_y], mode='lines+markers', name=f'Fronteira (atraso > {corte:g} dias)')
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### Cenários da fronteira eficiente")
+    st.markdown("Uma fronteira por corte de atraso: cenários com definições de Bad diferentes não são comparados entre si.")
+    st.dataframe(fronteira.round(2), hide_index=True)
+
+end_page()
@@ -0,0 +1,206 @@
+"""
+Execução particionada das análises sobre uma base dividida em vários arquivos.
+
+Uso pela linha de comando:
+    python partitions.py dividir data/base_de_dados_case.csv data/particoes/
+    python partitions.py metricas "data/particoes/*.csv" --workers 4
+"""
+import argparse
+import glob
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+import streamlit as st
+
+from aggregation import AGGREGATE_COLUMNS, PortfolioAggregate
+from profiling import profiled
+from utils import (
+    ARTIFACTS, DATA_PATH, ID_COLUMN, SCHEMA, data_version, derive_features, read_contracts, worker_context,
+    write_contracts
+)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers: Optional[int] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_pool(max_workers: Optional[int]) -> Executor:
+    """
+    Devolve o pool de processos das partições, criado uma vez com `utils.worker_context`
+    e recriado se o número de workers mudar; a trava impede que duas sessões criem pools
+    ao mesmo tempo.
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=worker_context())
+            _process_pool_workers = max_workers
+        return _process_pool
+
+
+def _shard_aggregate(path: Path) -> PortfolioAggregate:
+    return PortfolioAggregate.from_frame(read_contracts(path, AGGREGATE_COLUMNS))
+
+
+def _shard_features(path: Path) -> pd.DataFrame:
+    return derive_features(read_contracts(path).drop(columns=ID_COLUMN))
+
+
+class PartitionedDataset:
+    """
+    Base de contratos dividida em arquivos (partições), por exemplo um CSV por estado.
+
+    Cada partição é processada em uma tarefa de um pool de processos e os resultados
+    parciais são combinados na ordem das partições. Contagens e tabelas de risco são
+    idênticas às do arquivo único; as médias podem diferir apenas no arredondamento de
+    ponto flutuante causado pela ordem das somas (como em `aggregation.aggregate_file`).
+
+    Atributos:
+    - shards (List[Path]): Arquivos das partições, em ordem.
+    - max_workers (int, opcional): Número de processos. Por padrão, um por CPU.
+    """
+
+    def __init__(self, source: Union[str, Path, List[Path]], max_workers: Optional[int] = None):
+        """
+        Parâmetros:
+        - source (str, Path ou List[Path]): Pasta (todos os *.csv dela), padrão glob
+          (ex.: 'data/particoes/*.csv'), arquivo único ou lista de arquivos.
+        - max_workers (int, opcional): Número de processos.
+        """
+        if isinstance(source, (list, tuple)):
+            shards = [Path(p) for p in source]
+        elif Path(source).is_dir():
+            shards = sorted(Path(source).glob('*.csv'))
+        elif Path(source).is_file():
+            shards = [Path(source)]
+        else:
+            shards = sorted(Path(p) for p in glob.glob(str(source)))
+        if not shards:
+            raise ValueError(f"Nenhuma partição encontrada em '{source}'.")
+        self.shards: List[Path] = shards
+        self.max_workers = max_workers
+
+    def version(self) -> tuple:
+        """
+        Versão do conjunto de partições, para as chaves de cache.
+
+        Retorna:
+        - tuple: Caminho e `data_version` de cada partição.
+        """
+        return tuple((str(p), data_version(p)) for p in self.shards)
+
+    def _map(self, func, shards: List[Path]) -> list:
+        if len(shards) == 1:
+            return [func(shards[0])]
+        return list(_get_pool(self.max_workers).map(func, shards))
+
+    @profiled('partitions.aggregate')
+    def aggregate(self) -> PortfolioAggregate:
+        """
+        Agrega a base inteira, uma tarefa por partição.
+
+        O resultado fornece as métricas de `calculate_metrics` (`metrics`), os totais de
+        Bad/Loss (`class_totals`) e as tabelas de risco por categoria (`risk_tables`).
+
+        Retorna:
+        - PortfolioAggregate: Agregado de todas as partições.
+        """
+        aggregate = PortfolioAggregate()
+        for partial in self._map(_shard_aggregate, self.shards):
+            aggregate.merge(partial)
+        return aggregate
+
+    @profiled('partitions.derive_features')
+    def derive_features(self) -> pd.DataFrame:
+        """
+        Aplica `utils.derive_features` (Bad, Loss e colunas derivadas) a cada partição em
+        paralelo e concatena os resultados na ordem das partições.
+
+        Retorna:
+        - pd.DataFrame: Base completa com as colunas derivadas, sem a coluna de id.
+        """
+        frames = self._map(_shard_features, self.shards)
+        df = pd.concat(frames, ignore_index=True)
+        # Cada partição tem suas próprias categorias; a concatenação volta ao tipo do schema
+        categorical = [col for col, dtype in SCHEMA.items() if dtype == 'category' and col in df.columns]
+        df[categorical] = df[categorical].astype('category')
+        return df
+
+
+def split_by_column(
+    path: Path = DATA_PATH,
+    output_dir: Path = Path('data/particoes'),
+    column: str = 'estado'
+) -> List[Path]:
+    """
+    Divide a base de contratos em um CSV por valor de `column`.
+
+    Parâmetros:
+    - path (Path): CSV de origem.
+    - output_dir (Path): Pasta das partições.
+    - column (str): Coluna de particionamento.
+
+    Retorna:
+    - List[Path]: Arquivos gravados.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for value, shard in read_contracts(path).groupby(column, observed=True, sort=True):
+        shard_path = output_dir / f'{column}={value}.csv'
+        write_contracts(shard.reset_index(drop=True), shard_path)
+        paths.append(shard_path)
+    return paths
+
+
+@st.cache_data
+@ARTIFACTS.cached('partitioned_aggregate')
+def _load_partitioned_aggregate_cached(source: str, version: tuple) -> PortfolioAggregate:
+    return PartitionedDataset(source).aggregate()
+
+
+def load_partitioned_aggregate(source: Union[str, Path]) -> PortfolioAggregate:
+    """
+    Versão memoizada de `PartitionedDataset(source).aggregate()`, invalidada quando
+    qualquer partição muda, é criada ou removida.
+
+    Parâmetros:
+    - source (str ou Path): Pasta ou padrão glob das partições.
+
+    Retorna:
+    - PortfolioAggregate: Agregado de todas as partições.
+    """
+    return _load_partitioned_aggregate_cached(str(source), PartitionedDataset(source).version())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    split = commands.add_parser('dividir', help='Divide o CSV em uma partição por estado.')
+    split.add_argument('path', type=Path)
+    split.add_argument('output_dir', type=Path)
+    split.add_argument('--column', default='estado')
+    metrics = commands.add_parser('metricas', help='Métricas e tabelas de risco das partições.')
+    metrics.add_argument('source')
+    metrics.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'dividir':
+        paths = split_by_column(args.path, args.output_dir, args.column)
+        print(f'{len(paths)} partições gravadas em {args.output_dir}')
+        return
+
+    aggregate = PartitionedDataset(args.source, args.workers).aggregate()
+    ticket_medio, taxa_media, prazo_medio = aggregate.metrics()
+    print(f'Ticket Médio: R$ {ticket_medio:,.2f}  Taxa Média: {taxa_media:.4f}%  Prazo Médio: {prazo_medio:.2f} anos')
+    tabelas, totais = aggregate.risk_tables(['estado', 'setor', 'regiao'], ['Bad', 'Loss_cat'])
+    print(totais.to_string())
+
+
+if __name__ == '__main__':
+    main()
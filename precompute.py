@@ -0,0 +1,195 @@
+"""
+Pré-cálculo em segundo plano dos artefatos das páginas.
+
+Quando o arquivo de dados muda, recalcula a base derivada, os agregados, as tabelas e
+as figuras que as páginas usam e os grava no cache em disco (`utils.ARTIFACTS`). As
+páginas e os workers de renderização leem o mesmo cache: uma requisição só calcula algo
+se o pré-cálculo da versão atual ainda não chegou àquele artefato.
+
+As páginas que leem a base iniciam o worker com `ensure_precompute_worker()` (um processo
+por servidor; com `fcntl`, um por máquina); a página inicial não o inicia, para o início a
+frio não disputar CPU com ele. O worker roda com prioridade reduzida (`nice`), cedendo a
+CPU às requisições. Ele é desativado com APP_PRECOMPUTE=0.
+
+Uso:
+    python precompute.py                 # pré-calcula a versão atual e sai
+    python precompute.py --watch         # observa o arquivo e pré-calcula a cada mudança
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import streamlit as st
+
+from utils import ARTIFACTS, CACHE_DIR, DATA_PATH, data_version
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava, workers duplicados apenas repetem gravações atômicas
+    fcntl = None
+
+PRECOMPUTE_ENV = 'APP_PRECOMPUTE'
+LOCK_PATH = CACHE_DIR / 'precompute.lock'
+ROOT = Path(__file__).resolve().parent
+
+
+def precompute_tasks() -> list[tuple[str, Callable[[], Any]]]:
+    """
+    Artefatos pré-calculados, com as mesmas chaves que as páginas pedem.
+
+    Os módulos são importados aqui para não pesar na importação das páginas.
+
+    Retorna:
+    - list[tuple[str, Callable]]: Nome e função de cada tarefa, na ordem de execução.
+    """
+    from aggregation import load_aggregate
+    from binning import IV_COLUMNS, load_binnings
+    from cube import load_cube
+    from distributions import load_distribution_summary
+    from moments import CORRELATION_COLUMNS, load_class_moments, load_correlation_figure, load_spearman_correlation
+    from rendering import precompute_figures
+    from scenarios import load_scenarios
+    from segments import load_segment_statistics
+    from utils import NEW_METRIC_COLUMNS, NUMERIC_COLUMNS, load_features, scatter_jobs
+
+    distribution_columns = list(dict.fromkeys(NUMERIC_COLUMNS + NEW_METRIC_COLUMNS))
+    tasks = [
+        ('Base derivada', load_features),
+        ('Agregado e tabelas de risco', load_aggregate),
+        ('Estatísticas por segmento', load_segment_statistics),
+        ('Momentos por classe', lambda: (load_class_moments('Bad'), load_class_moments('Bad', CORRELATION_COLUMNS))),
+        ('Correlação de Spearman', lambda: load_spearman_correlation(CORRELATION_COLUMNS)),
+        ('Matrizes de correlação', lambda: [load_correlation_figure(method) for method in ('pearson', 'spearman')]),
+        ('Distribuições', lambda: [
+            load_distribution_summary(col, target) for target in ('Bad', 'Loss_cat') for col in distribution_columns
+        ]),
+        ('Faixas e IV', lambda: load_binnings(IV_COLUMNS, 'Bad')),
+        ('Cubo de risco', load_cube),
+        ('Cenários', load_scenarios),
+    ]
+    for base in ('Bad', 'Loss'):
+        tasks.append((f'Scatter plots ({base})', lambda base=base: precompute_figures(
+            scatter_jobs(load_features(), base, distribution_columns), ('scatter', base, data_version())
+        )))
+    return tasks
+
+
+def precompute(verbose: bool = False) -> dict[str, float]:
+    """
+    Executa as tarefas de `precompute_tasks` para a versão atual do arquivo de dados.
+
+    Artefatos já gravados para essa versão são apenas lidos. Uma tarefa com erro não
+    interrompe as demais. Ao final, o limite de tamanho do cache em disco é aplicado
+    e os caches do Streamlit do processo são limpos: os resultados ficam só no disco.
+
+    Parâmetros:
+    - verbose (bool): Imprime o tempo de cada tarefa.
+
+    Retorna:
+    - dict[str, float]: Tempo (s) de cada tarefa concluída.
+    """
+    timings = {}
+    for name, task in precompute_tasks():
+        start = time.perf_counter()
+        try:
+            task()
+        except Exception as exc:
+            print(f"[precompute] {name}: {exc!r}", file=sys.stderr)
+            continue
+        timings[name] = time.perf_counter() - start
+        if verbose:
+            print(f"[precompute] {name:<28} {timings[name]:7.2f} s", flush=True)
+    ARTIFACTS.evict()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    return timings
+
+
+def _acquire_lock() -> Optional[Any]:
+    # Trava exclusiva por máquina; sem fcntl, o arquivo é aberto sem trava
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(LOCK_PATH, 'w')
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+    return handle
+
+
+def watch(interval: float = 2.0, parent_pid: Optional[int] = None, verbose: bool = False) -> None:
+    """
+    Pré-calcula a versão atual e depois a cada mudança do arquivo de dados.
+
+    Parâmetros:
+    - interval (float): Intervalo (s) entre as verificações do arquivo.
+    - parent_pid (int, opcional): Encerra quando este processo (o servidor) terminar.
+    - verbose (bool): Imprime o tempo de cada tarefa.
+    """
+    lock = _acquire_lock()
+    if lock is None:
+        return
+    if parent_pid is not None and hasattr(os, 'nice'):
+        # Iniciado pelo servidor: cede a CPU às requisições dos usuários (os pools herdam)
+        os.nice(10)
+    last_version = None
+    with lock:
+        while parent_pid is None or os.getppid() == parent_pid:
+            try:
+                version = data_version()
+            except OSError:
+                version = None
+            if version is not None and version != last_version:
+                timings = precompute(verbose)
+                if verbose:
+                    print(f"[precompute] versão {version}: {len(timings)} tarefas em {sum(timings.values()):.1f} s", flush=True)
+                last_version = version
+            time.sleep(interval)
+
+
+@st.cache_resource
+def ensure_precompute_worker() -> Optional[subprocess.Popen]:
+    """
+    Inicia, uma vez por processo do servidor, o worker `precompute.py --watch`.
+
+    O worker encerra junto com o servidor; se outro worker já detém a trava, o novo sai
+    imediatamente.
+
+    Retorna:
+    - subprocess.Popen ou None: O processo do worker, ou None se desativado (APP_PRECOMPUTE=0)
+      ou sem arquivo de dados.
+    """
+    if os.environ.get(PRECOMPUTE_ENV, '1').lower() in ('0', 'false') or not DATA_PATH.exists():
+        return None
+    return subprocess.Popen(
+        [sys.executable, str(ROOT / 'precompute.py'), '--watch', '--quiet', '--parent-pid', str(os.getpid())],
+        cwd=ROOT, stdin=subprocess.DEVNULL
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--watch', action='store_true', help='Observa o arquivo de dados e pré-calcula a cada mudança.')
+    parser.add_argument('--interval', type=float, default=2.0, help='Intervalo (s) entre as verificações do arquivo.')
+    parser.add_argument('--parent-pid', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--quiet', action='store_true', help='Não imprime os tempos das tarefas (só os erros).')
+    args = parser.parse_args()
+    # Fora do servidor os caches do Streamlit funcionam em modo 'bare'; os avisos repetidos são só ruído
+    st.config.get_option('logger.level')  # lê a configuração antes, senão ela restaura o nível
+    st.logger.set_log_level('error')
+
+    if args.watch:
+        watch(args.interval, args.parent_pid, verbose=not args.quiet)
+    else:
+        timings = precompute(verbose=not args.quiet)
+        if not args.quiet:
+            print(f"[precompute] {len(timings)} tarefas em {sum(timings.values()):.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Instrumentação leve dos caminhos quentes do app.
+
+Cada passo medido (função decorada com `profiled` ou bloco `profile_step`) registra
+tempo de parede, número de chamadas, linhas processadas e, com APP_PROFILING=1, o
+pico de memória alocada (tracemalloc). Os registros são por thread, de modo que cada
+execução de página só vê os próprios passos.
+
+O perfil é ativado com a variável de ambiente APP_PROFILING=1 ou com `?debug=1` na
+URL. Ativo, `end_page` mostra o painel na barra lateral e grava os passos em
+LOG_PATH (JSON por linha), para agregação posterior.
+
+O tracemalloc só é ligado pela variável de ambiente, na importação: ele rastreia toda
+alocação do processo, em todas as sessões, e custa caro demais para ser ligado por uma
+visita com `?debug=1`. O pico de memória de um passo é o do processo inteiro: com
+sessões simultâneas, inclui as alocações delas (e elas zeram o pico uma da outra).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import pandas as pd
+import streamlit as st
+
+LOG_PATH = Path('logs/profiling.jsonl')
+PROFILING_ENV = 'APP_PROFILING'
+
+_local = threading.local()
+
+
+def _env_enabled() -> bool:
+    return os.environ.get(PROFILING_ENV, '').lower() in ('1', 'true')
+
+
+if _env_enabled():
+    tracemalloc.start()
+
+
+@dataclass
+class StepRecord:
+    """
+    Uma execução de um passo medido.
+
+    Atributos:
+    - name (str): Nome do passo (ex.: 'utils.derive_features').
+    - depth (int): Nível de aninhamento (0 = passo de nível superior).
+    - seconds (float): Tempo de parede, incluindo os passos internos.
+    - rows (int, opcional): Linhas processadas, quando conhecidas.
+    - allocated_bytes (int, opcional): Pico de memória alocada no processo durante o passo (APP_PROFILING=1).
+    """
+    name: str
+    depth: int
+    seconds: float
+    rows: Optional[int] = None
+    allocated_bytes: Optional[int] = None
+
+
+class _Frame:
+    __slots__ = ('start_bytes', 'peak')
+
+    def __init__(self, start_bytes: int):
+        self.start_bytes = start_bytes
+        self.peak = start_bytes
+
+
+def _state() -> Optional[tuple[list[StepRecord], list[_Frame]]]:
+    """
+    Registros e pilha de passos da thread, ou None fora de uma página iniciada com
+    `begin_page` (ex.: workers de renderização e scripts), onde nada é acumulado.
+    """
+    if not hasattr(_local, 'records'):
+        return None
+    return _local.records, _local.stack
+
+
+def profiling_enabled() -> bool:
+    """
+    Indica se o perfil detalhado está ativo (APP_PROFILING=1 ou `?debug=1` na URL).
+    """
+    if _env_enabled():
+        return True
+    try:
+        return st.query_params.get('debug') == '1'
+    except Exception:
+        # Fora de uma execução do Streamlit (scripts e benchmarks)
+        return False
+
+
+def _count_rows(value: Any) -> Optional[int]:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple) and value and isinstance(value[0], (pd.DataFrame, pd.Series)):
+        return len(value[0])
+    return None
+
+
+@contextmanager
+def profile_step(name: str, rows: Optional[int] = None) -> Iterator[StepRecord]:
+    """
+    Mede um bloco de código como um passo.
+
+    Parâmetros:
+    - name (str): Nome do passo.
+    - rows (int, opcional): Linhas processadas pelo bloco.
+
+    Retorna:
+    - StepRecord: Registro do passo, preenchido ao fim do bloco.
+    """
+    record = StepRecord(name=name, depth=0, seconds=0.0, rows=rows)
+    state = _state()
+    if state is None:
+        yield record
+        return
+    records, stack = state
+    frame = None
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        # O pico global é repassado ao passo externo antes de ser zerado para este
+        if stack and stack[-1] is not None:
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        frame = _Frame(current)
+    stack.append(frame)
+    record.depth = len(stack) - 1
+    records.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        stack.pop()
+        if frame is not None and tracemalloc.is_tracing():
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            record.allocated_bytes = frame.peak - frame.start_bytes
+            if stack and stack[-1] is not None:
+                stack[-1].peak = max(stack[-1].peak, frame.peak)
+
+
+def profiled(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorador que mede cada chamada da função como um passo.
+
+    As linhas processadas são as do primeiro argumento, se for um DataFrame ou uma
+    Series, ou senão as do resultado.
+
+    Parâmetros:
+    - name (str, opcional): Nome do passo. Por padrão, 'módulo.função'.
+    """
+    def decorator(func: Callable) -> Callable:
+        step_name = name or f'{func.__module__}.{func.__name__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_step(step_name, _count_rows(args[0]) if args else None) as step:
+                result = func(*args, **kwargs)
+            if step.rows is None:
+                step.rows = _count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def begin_page(page: str) -> None:
+    """
+    Inicia a medição de uma execução de página: descarta os registros anteriores da
+    thread. O tracemalloc não é ligado aqui (ver o módulo).
+
+    Parâmetros:
+    - page (str): Nome da página, usado no painel e no log.
+    """
+    _local.records, _local.stack = [], []
+    _local.page = page
+    _local.page_start = time.perf_counter()
+
+
+def summarize_steps(records: list[StepRecord]) -> pd.DataFrame:
+    """
+    Agrupa os registros por passo.
+
+    Parâmetros:
+    - records (list[StepRecord]): Registros de uma execução.
+
+    Retorna:
+    - pd.DataFrame: Por passo: 'chamadas', 'segundos', 'linhas' e 'pico_alocado_mb', do mais lento ao mais rápido.
+    """
+    if not records:
+        return pd.DataFrame(columns=['passo', 'chamadas', 'segundos', 'linhas', 'pico_alocado_mb'])
+    df = pd.DataFrame([asdict(r) for r in records])
+    summary = df.groupby('name', sort=False).agg(
+        chamadas=('seconds', 'size'),
+        segundos=('seconds', 'sum'),
+        linhas=('rows', lambda rows: rows.sum(min_count=1)),
+        pico_alocado_mb=('allocated_bytes', 'max'),
+    )
+    summary['pico_alocado_mb'] = summary['pico_alocado_mb'] / 2**20
+    return summary.rename_axis('passo').sort_values('segundos', ascending=False).reset_index()
+
+
+def export_steps(page: str, records: list[StepRecord], path: Path = LOG_PATH) -> None:
+    """
+    Acrescenta os registros de uma execução ao log, um JSON por linha.
+
+    Parâmetros:
+    - page (str): Nome da página.
+    - records (list[StepRecord]): Registros da execução.
+    - path (Path): Caminho do log.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    run = {'timestamp': time.time(), 'pid': os.getpid(), 'page': page}
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps({**run, **asdict(record)}) + '\n')
+
+
+def end_page() -> None:
+    """
+    Encerra a medição da página. Com o perfil ativo, mostra o painel de desempenho na
+    barra lateral e grava os passos em LOG_PATH.
+    """
+    if not profiling_enabled():
+        return
+    records = _local.records if hasattr(_local, 'records') else []
+    page = getattr(_local, 'page', '?')
+    total = time.perf_counter() - getattr(_local, 'page_start', time.perf_counter())
+    export_steps(page, records)
+
+    with st.sidebar.expander("Desempenho desta execução", expanded=True):
+        st.metric("Tempo total da página", f"{total:.3f} s")
+        st.dataframe(
+            summarize_steps(records), hide_index=True, use_container_width=True,
+            column_config={
+                'segundos': st.column_config.NumberColumn(format='%.4f'),
+                'pico_alocado_mb': st.column_config.NumberColumn(format='%.2f'),
+            }
+        )
+        memoria = (
+            "Pico de memória do processo inteiro (inclui outras sessões simultâneas)."
+            if tracemalloc.is_tracing() else "Pico de memória só com APP_PROFILING=1."
+        )
+        st.caption(f"Tempos incluem os passos internos. {memoria} Log em {LOG_PATH}.")
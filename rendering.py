@@ -0,0 +1,189 @@
+import io
+import threading
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterator, Optional
+
+from profiling import profiled
+from utils import ARTIFACTS, data_version, worker_context
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Um job é uma função (de nível de módulo, para poder ser enviada a outro processo)
+# que devolve uma Figure, junto com seus argumentos nomeados.
+FigureJob = tuple[Callable[..., 'Figure'], dict[str, Any]]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+# PNGs já renderizados, compartilhados entre execuções e sessões do processo (LRU)
+FIGURE_CACHE_SIZE = 256
+_figure_cache: 'OrderedDict[tuple, bytes]' = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def _cache_get(key: tuple) -> Optional[bytes]:
+    with _figure_cache_lock:
+        png = _figure_cache.get(key)
+        if png is not None:
+            _figure_cache.move_to_end(key)
+        return png
+
+
+def _cache_put(key: tuple, png: bytes) -> None:
+    with _figure_cache_lock:
+        _figure_cache[key] = png
+        _figure_cache.move_to_end(key)
+        while len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+
+
+def figure_to_png(fig: 'Figure', dpi: int = 100) -> bytes:
+    """
+    Renderiza uma Figure com o backend Agg e devolve os bytes PNG.
+
+    Parâmetros:
+    - fig (Figure): Figura a renderizar.
+    - dpi (int): Resolução da imagem.
+
+    Retorna:
+    - bytes: Imagem PNG.
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _render_job(builder: Callable[..., 'Figure'], kwargs: dict[str, Any]) -> bytes:
+    return figure_to_png(builder(**kwargs))
+
+
+def _get_executor(max_workers: Optional[int], use_processes: bool) -> Executor:
+    """
+    Devolve o executor dos jobs de figura.
+
+    O pool de processos é criado uma vez (com `utils.worker_context`) e reaproveitado
+    entre execuções e sessões; a trava impede que duas sessões criem pools ao mesmo tempo.
+    """
+    global _process_pool
+    if not use_processes:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=worker_context())
+        return _process_pool
+
+
+def render_figures(
+    jobs: dict[str, FigureJob],
+    max_workers: Optional[int] = None,
+    use_processes: bool = True
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Renderiza figuras independentes em paralelo, devolvendo-as na ordem em que terminam.
+
+    Cada job monta sua própria Figure (sem o estado global do pyplot) e a converte em
+    PNG no worker, de modo que nada do Matplotlib é compartilhado entre jobs.
+
+    Parâmetros:
+    - jobs (dict[str, FigureJob]): Jobs indexados por uma chave.
+    - max_workers (int, opcional): Número de workers. Por padrão, o do executor.
+    - use_processes (bool): Usa o pool de processos (padrão). A montagem das figuras no
+      Seaborn/Matplotlib é código Python e, em threads, fica serializada pelo GIL; threads
+      só compensam para figuras triviais, em que enviar os dados ao worker custa mais.
+
+    Retorna:
+    - Iterator[tuple[str, bytes]]: Pares (chave, PNG) à medida que ficam prontos.
+    """
+    if not jobs:
+        return
+    executor = _get_executor(max_workers, use_processes)
+    try:
+        futures = {
+            executor.submit(_render_job, builder, kwargs): key
+            for key, (builder, kwargs) in jobs.items()
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        if not use_processes:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+@profiled()
+def display_figures(
+    jobs: dict[str, FigureJob],
+    n_columns: int = 3,
+    max_workers: Optional[int] = None,
+    use_processes: bool = True,
+    cache_key: Optional[Hashable] = None
+) -> None:
+    """
+    Exibe no Streamlit figuras renderizadas em paralelo, cada uma assim que fica pronta.
+
+    As posições são reservadas na ordem dos jobs, distribuídas em `n_columns` colunas,
+    e preenchidas conforme os workers terminam. Com `cache_key`, os PNGs ficam
+    memoizados por (cache_key, chave do job), em memória e no cache em disco
+    (`utils.ARTIFACTS`, preenchido por `precompute_figures`), e só os jobs ausentes
+    são renderizados.
+
+    Parâmetros:
+    - jobs (dict[str, FigureJob]): Jobs indexados por uma chave.
+    - n_columns (int): Número de colunas do layout.
+    - max_workers (int, opcional): Número de workers.
+    - use_processes (bool): Usa o pool de processos (padrão) ou threads (ver `render_figures`).
+    - cache_key (Hashable, opcional): Identifica os dados e parâmetros dos jobs (ex.: versão
+      do arquivo e alvo); deve mudar sempre que o conteúdo das figuras mudar.
+    """
+    cols = st.columns(n_columns)
+    placeholders = {key: cols[i % n_columns].empty() for i, key in enumerate(jobs)}
+    pending = {}
+    version = data_version()
+    for key, job in jobs.items():
+        png = _cached_png(cache_key, key, version) if cache_key is not None else None
+        if png is None:
+            pending[key] = job
+        else:
+            placeholders[key].image(png, use_container_width=True)
+    for key, png in render_figures(pending, max_workers, use_processes):
+        if cache_key is not None:
+            _cache_put((cache_key, key), png)
+            ARTIFACTS.put('figure', (cache_key, key), version, png)
+        placeholders[key].image(png, use_container_width=True)
+
+
+def _cached_png(cache_key: Hashable, key: str, version: tuple[int, int]) -> Optional[bytes]:
+    png = _cache_get((cache_key, key))
+    if png is None:
+        png = ARTIFACTS.get('figure', (cache_key, key), version)
+        if png is not None:
+            _cache_put((cache_key, key), png)
+    return png
+
+
+def precompute_figures(
+    jobs: dict[str, FigureJob],
+    cache_key: Hashable,
+    max_workers: Optional[int] = None,
+    use_processes: bool = True
+) -> int:
+    """
+    Renderiza e grava no cache em disco os PNGs que `display_figures` exibiria com o
+    mesmo `cache_key`, sem usar o Streamlit.
+
+    Parâmetros:
+    - jobs (dict[str, FigureJob]): Jobs indexados por uma chave.
+    - cache_key (Hashable): O mesmo `cache_key` usado pela página.
+    - max_workers (int, opcional): Número de workers.
+    - use_processes (bool): Usa o pool de processos (padrão) ou threads (ver `render_figures`).
+
+    Retorna:
+    - int: Número de figuras renderizadas (as já presentes no cache são puladas).
+    """
+    version = data_version()
+    pending = {key: job for key, job in jobs.items() if ARTIFACTS.get('figure', (cache_key, key), version) is None}
+    for key, png in render_figures(pending, max_workers, use_processes):
+        ARTIFACTS.put('figure', (cache_key, key), version, png)
+    return len(pending)
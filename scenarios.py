@@ -0,0 +1,206 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from typing import Optional, Sequence
+
+from profiling import profiled
+from utils import ARTIFACTS, BAD_ATRASO_DIAS, data_version, load_data
+
+# Colunas lidas da base para a simulação
+SCENARIO_COLUMNS: list[str] = [
+    'score', 'atraso_corrente', 'taxa', 'valor_contrato', 'valor_contrato_mais_juros', 'valor_em_aberto'
+]
+# Métricas de cada cenário, na ordem das colunas de `simulate_scenarios`
+SCENARIO_METRICS: list[str] = [
+    'Contratos Aprovados', 'Volume Aprovado', 'Taxa de Bad (%)', 'Perda Esperada', 'Perda Esperada (%)',
+    'Taxa Média', 'Juros', 'Resultado'
+]
+# Grade padrão de cenários (20 x 5 x 5 x 3 = 1.500 cenários)
+DEFAULT_ATRASO_CORTES: tuple[int, ...] = (30, 60, 90, BAD_ATRASO_DIAS, 360)
+DEFAULT_SCORES_MINIMOS: tuple[int, ...] = tuple(range(0, 1000, 50))
+DEFAULT_CHOQUES_TAXA: tuple[float, ...] = (-1.0, -0.5, 0.0, 0.5, 1.0)
+DEFAULT_FATORES_PRAZO: tuple[float, ...] = (0.75, 1.0, 1.25)
+
+
+def _reverse_cumsum(values: np.ndarray, axis: int) -> np.ndarray:
+    return np.flip(np.cumsum(np.flip(values, axis=axis), axis=axis), axis=axis)
+
+
+@profiled()
+def simulate_scenarios(
+    df: pd.DataFrame,
+    atraso_cortes: Sequence[float] = DEFAULT_ATRASO_CORTES,
+    scores_minimos: Sequence[float] = DEFAULT_SCORES_MINIMOS,
+    choques_taxa: Sequence[float] = DEFAULT_CHOQUES_TAXA,
+    fatores_prazo: Sequence[float] = DEFAULT_FATORES_PRAZO
+) -> pd.DataFrame:
+    """
+    Avalia a grade inteira de cenários de política de crédito de uma vez, sem laço por cenário.
+
+    Cada cenário combina:
+    - atraso_corte: definição de Bad (atraso_corrente > atraso_corte dias);
+    - score_minimo: aprovação dos contratos com score >= score_minimo;
+    - choque_taxa: variação da taxa, em pontos percentuais;
+    - fator_prazo: multiplicador do prazo.
+
+    Os juros de cada contrato ('valor_contrato_mais_juros' - 'valor_contrato') são
+    escalados na proporção de taxa × prazo (juros simples), e a perda esperada é a
+    fração em aberto dos contratos Bad ('valor_em_aberto' / 'valor_contrato_mais_juros')
+    aplicada à exposição com os juros do cenário. Choques de taxa e prazo não alteram
+    quem é Bad.
+
+    Os contratos são distribuídos em uma grade (faixa de score mínimo × faixa de atraso)
+    com uma passada de `np.bincount` por soma; somas acumuladas nos dois eixos dão os
+    totais de todos os pares (score mínimo, corte de atraso). Como a perda e os juros são
+    lineares no choque de taxa e no fator de prazo, as demais dimensões saem por
+    broadcasting dessas somas. O custo é O(n) nas linhas mais O(número de cenários).
+
+    Parâmetros:
+    - df (pd.DataFrame): Contratos com as colunas de SCENARIO_COLUMNS.
+    - atraso_cortes (Sequence[float]): Cortes de atraso (dias) para Bad.
+    - scores_minimos (Sequence[float]): Scores mínimos de aprovação.
+    - choques_taxa (Sequence[float]): Choques aditivos na taxa (p.p.).
+    - fatores_prazo (Sequence[float]): Fatores multiplicativos do prazo.
+
+    Retorna:
+    - pd.DataFrame: Um cenário por linha, com 'score_minimo', 'atraso_corte', 'choque_taxa',
+      'fator_prazo', 'Contratos Aprovados', 'Volume Aprovado', 'Taxa de Bad (%)', 'Perda Esperada',
+      'Perda Esperada (%)' (sobre o volume aprovado), 'Taxa Média' (ponderada pelo valor),
+      'Juros' e 'Resultado' (juros - perda esperada).
+    """
+    cortes = np.sort(np.asarray(atraso_cortes, dtype=np.float64))
+    scores = np.sort(np.asarray(scores_minimos, dtype=np.float64))
+    choques = np.asarray(choques_taxa, dtype=np.float64)
+    fatores = np.asarray(fatores_prazo, dtype=np.float64)
+
+    score = df['score'].to_numpy(dtype=np.float64)
+    atraso = df['atraso_corrente'].to_numpy(dtype=np.float64)
+    taxa = df['taxa'].to_numpy(dtype=np.float64)
+    valor = df['valor_contrato'].to_numpy(dtype=np.float64)
+    valor_com_juros = df['valor_contrato_mais_juros'].to_numpy(dtype=np.float64)
+    juros = valor_com_juros - valor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fracao_aberta = np.nan_to_num(df['valor_em_aberto'].to_numpy(dtype=np.float64) / valor_com_juros)
+        juros_por_taxa = np.nan_to_num(juros / taxa)
+
+    # g: quantos scores mínimos o contrato atinge; b: quantos cortes de atraso ele ultrapassa
+    g = np.searchsorted(scores, score, side='right')
+    b = np.searchsorted(cortes, atraso, side='left')
+    n_g, n_b = len(scores) + 1, len(cortes) + 1
+    cell = g * n_b + b
+    weights = {
+        'n': None, 'valor': valor, 'taxa_valor': taxa * valor, 'juros': juros, 'juros_taxa': juros_por_taxa,
+        'perda_valor': fracao_aberta * valor, 'perda_juros': fracao_aberta * juros, 'perda_juros_taxa': fracao_aberta * juros_por_taxa,
+    }
+    grid = {
+        name: np.bincount(cell, weights=w, minlength=n_g * n_b).reshape(n_g, n_b)
+        for name, w in weights.items()
+    }
+    # Aprovados pelo score mínimo i: faixas g > i; Bad pelo corte k: faixas b > k
+    aprovados = {name: _reverse_cumsum(h, axis=0)[1:] for name, h in grid.items()}
+    totais = {name: h.sum(axis=1) for name, h in aprovados.items()}
+    bad = {name: _reverse_cumsum(h, axis=1)[:, 1:] for name, h in aprovados.items()}
+
+    # Eixos: (score mínimo, corte de atraso, choque de taxa, fator de prazo)
+    shape = (len(scores), len(cortes), len(choques), len(fatores))
+    delta = choques[None, None, :, None]
+    fator = fatores[None, None, None, :]
+    n = totais['n'][:, None, None, None]
+    volume = totais['valor'][:, None, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        taxa_bad = np.nan_to_num(bad['n'] / totais['n'][:, None] * 100)[:, :, None, None]
+        taxa_media = totais['taxa_valor'][:, None, None, None] / volume + delta
+    perda = bad['perda_valor'][:, :, None, None] + fator * (bad['perda_juros'][:, :, None, None] + delta * bad['perda_juros_taxa'][:, :, None, None])
+    receita = fator * (totais['juros'][:, None, None, None] + delta * totais['juros_taxa'][:, None, None, None])
+
+    index = pd.MultiIndex.from_product(
+        [scores, cortes, choques, fatores], names=['score_minimo', 'atraso_corte', 'choque_taxa', 'fator_prazo']
+    )
+    resultado = pd.DataFrame({
+        'Contratos Aprovados': np.broadcast_to(n, shape).ravel().astype(np.int64),
+        'Volume Aprovado': np.broadcast_to(volume, shape).ravel(),
+        'Taxa de Bad (%)': np.broadcast_to(taxa_bad, shape).ravel(),
+        'Perda Esperada': np.broadcast_to(perda, shape).ravel(),
+        'Taxa Média': np.broadcast_to(taxa_media, shape).ravel(),
+        'Juros': np.broadcast_to(receita, shape).ravel(),
+    }, index=index).reset_index()
+    resultado['Perda Esperada (%)'] = np.divide(
+        resultado['Perda Esperada'] * 100, resultado['Volume Aprovado'],
+        out=np.zeros(len(resultado)), where=resultado['Volume Aprovado'] > 0
+    )
+    resultado['Resultado'] = resultado['Juros'] - resultado['Perda Esperada']
+    return resultado[list(index.names) + SCENARIO_METRICS]
+
+
+def pareto_frontier(
+    scenarios: pd.DataFrame,
+    maximize: str = 'Volume Aprovado',
+    minimize: str = 'Perda Esperada (%)',
+    by: Optional[str] = None
+) -> pd.Series:
+    """
+    Marca os cenários eficientes: nenhum outro tem `maximize` maior ou igual com `minimize` menor.
+
+    Com `by`, cada cenário só é comparado aos do mesmo grupo. Use by='atraso_corte' quando
+    a grade tem várias definições de Bad: a taxa de Bad e a perda esperada de cortes
+    diferentes medem riscos diferentes e não devem disputar a mesma fronteira.
+
+    Parâmetros:
+    - scenarios (pd.DataFrame): Resultado de `simulate_scenarios` (ou um recorte dele).
+    - maximize (str): Coluna a maximizar.
+    - minimize (str): Coluna a minimizar.
+    - by (str, opcional): Coluna de grupo; uma fronteira por valor.
+
+    Retorna:
+    - pd.Series: Booleano por cenário, alinhado ao índice de `scenarios`.
+    """
+    keys = [scenarios[minimize].to_numpy(), -scenarios[maximize].to_numpy()]
+    if by is not None:
+        keys.append(pd.factorize(scenarios[by])[0])
+    order = np.lexsort(keys)
+    values = scenarios[minimize].to_numpy()[order]
+    if by is None:
+        best_before = np.concatenate([[np.inf], np.minimum.accumulate(values)[:-1]])
+    else:
+        # Mínimo acumulado dentro de cada grupo, deslocado uma posição; o primeiro de cada grupo não tem antecessor
+        groups = keys[-1][order]
+        best_before = np.roll(pd.Series(values).groupby(groups).cummin().to_numpy(), 1)
+        best_before[np.r_[True, groups[1:] != groups[:-1]]] = np.inf
+    efficient = np.empty(len(order), dtype=bool)
+    efficient[order] = values < best_before
+    return pd.Series(efficient, index=scenarios.index)
+
+
+@st.cache_data
+@ARTIFACTS.cached('scenarios')
+def _load_scenarios_cached(
+    atraso_cortes: tuple[float, ...],
+    scores_minimos: tuple[float, ...],
+    choques_taxa: tuple[float, ...],
+    fatores_prazo: tuple[float, ...],
+    version: tuple[int, int]
+) -> pd.DataFrame:
+    return simulate_scenarios(load_data(SCENARIO_COLUMNS), atraso_cortes, scores_minimos, choques_taxa, fatores_prazo)
+
+
+@profiled()
+def load_scenarios(
+    atraso_cortes: Sequence[float] = DEFAULT_ATRASO_CORTES,
+    scores_minimos: Sequence[float] = DEFAULT_SCORES_MINIMOS,
+    choques_taxa: Sequence[float] = DEFAULT_CHOQUES_TAXA,
+    fatores_prazo: Sequence[float] = DEFAULT_FATORES_PRAZO
+) -> pd.DataFrame:
+    """
+    Versão memoizada de `simulate_scenarios` sobre a base atual, por grade e versão do arquivo.
+
+    Parâmetros:
+    - atraso_cortes, scores_minimos, choques_taxa, fatores_prazo (Sequence[float]): Eixos da grade.
+
+    Retorna:
+    - pd.DataFrame: Um cenário por linha (ver `simulate_scenarios`).
+    """
+    # Floats simples na chave: a mesma grade gerada com range, listas ou np.arange reaproveita o cache
+    return _load_scenarios_cached(
+        *(tuple(float(v) for v in axis) for axis in (atraso_cortes, scores_minimos, choques_taxa, fatores_prazo)),
+        data_version()
+    )
@@ -0,0 +1,311 @@
+"""
+Escoragem em lote de novas propostas de crédito.
+
+As métricas de concessão de `create_new_features` ('ratio_contrato_faturamento',
+'ratio_contrato_faturamento_cat' e 'score_cat') são calculadas em NumPy sobre o lote
+inteiro e alimentam uma regressão logística treinada no alvo 'Bad' da base.
+
+Uso pela linha de comando:
+    python scoring.py score propostas.csv [saida.csv]
+    python scoring.py serve [--port 8000]
+
+O servidor aceita POST em /score com corpo CSV (Content-Type: text/csv) ou JSON
+(lista de registros, ou objeto coluna -> lista de valores) e responde
+{"probabilidade_bad": [...]}; propostas com valores ausentes recebem null.
+"""
+import argparse
+import io
+import json
+import sys
+import zipfile
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Mapping, Optional
+
+from utils import BAD_ATRASO_DIAS, CACHE_DIR, DATA_PATH, data_version, read_contracts
+
+# Colunas da proposta disponíveis no momento da concessão
+APPLICATION_COLUMNS: list[str] = [
+    'score', 'taxa', 'prazo', 'faturamento_informado', 'divida_total_pj',
+    'valor_contrato', 'valor_contrato_mais_juros'
+]
+MODEL_FEATURES: list[str] = [
+    'score', 'taxa', 'prazo', 'log_faturamento_informado', 'log_divida_total_pj',
+    'log_valor_contrato', 'ratio_contrato_faturamento_limitada', 'ratio_contrato_faturamento_cat', 'score_cat'
+]
+MODEL_PATH = CACHE_DIR / 'risk_model.npz'
+
+
+def compute_application_features(batch: Mapping[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Calcula as métricas de concessão de um lote de propostas, coluna a coluna.
+
+    As três métricas de `create_new_features` seguem a mesma definição (NaN de 0/0
+    vira 0; corte de 0.25 para a razão e de 400 para o score).
+
+    Parâmetros:
+    - batch (Mapping[str, np.ndarray]): DataFrame ou dicionário com APPLICATION_COLUMNS.
+
+    Retorna:
+    - dict[str, np.ndarray]: Métricas de concessão e as variáveis do modelo (MODEL_FEATURES).
+    """
+    missing = [col for col in APPLICATION_COLUMNS if col not in batch]
+    if missing:
+        raise ValueError(f"Propostas sem as colunas: {missing}.")
+    col = {c: np.asarray(batch[c], dtype=np.float64) for c in APPLICATION_COLUMNS}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = col['valor_contrato_mais_juros'] / col['faturamento_informado']
+    ratio = np.nan_to_num(ratio, nan=0.0, posinf=np.inf)
+    return {
+        'score': col['score'],
+        'taxa': col['taxa'],
+        'prazo': col['prazo'],
+        'log_faturamento_informado': np.log1p(np.maximum(col['faturamento_informado'], 0)),
+        'log_divida_total_pj': np.log1p(np.maximum(col['divida_total_pj'], 0)),
+        'log_valor_contrato': np.log1p(np.maximum(col['valor_contrato'], 0)),
+        'ratio_contrato_faturamento': ratio,
+        # Faturamento zero gera razão infinita; no modelo ela é limitada para não dominar o ajuste
+        'ratio_contrato_faturamento_limitada': np.minimum(ratio, 10.0),
+        'ratio_contrato_faturamento_cat': (ratio > 0.25).astype(np.float64),
+        'score_cat': (col['score'] > 400).astype(np.float64),
+    }
+
+
+def _design_matrix(features: Mapping[str, np.ndarray]) -> np.ndarray:
+    return np.column_stack([features[f] for f in MODEL_FEATURES])
+
+
+@dataclass
+class RiskModel:
+    """
+    Regressão logística sobre MODEL_FEATURES padronizadas.
+
+    Atributos:
+    - mean (np.ndarray): Média de cada variável na base de treino.
+    - scale (np.ndarray): Desvio padrão de cada variável na base de treino.
+    - coef (np.ndarray): Coeficientes das variáveis padronizadas.
+    - intercept (float): Intercepto.
+    """
+    mean: np.ndarray
+    scale: np.ndarray
+    coef: np.ndarray
+    intercept: float
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, l2: float = 1e-3, max_iter: int = 50, tol: float = 1e-8) -> 'RiskModel':
+        """
+        Treina o modelo no alvo 'Bad' da base por Newton-Raphson (IRLS) com penalização L2.
+
+        Parâmetros:
+        - df (pd.DataFrame): Base com APPLICATION_COLUMNS e 'atraso_corrente'.
+        - l2 (float): Penalização L2 dos coeficientes (não aplicada ao intercepto).
+        - max_iter (int): Número máximo de iterações.
+        - tol (float): Tolerância na variação dos coeficientes.
+
+        Retorna:
+        - RiskModel: Modelo treinado.
+        """
+        X = _design_matrix(compute_application_features(df))
+        y = (df['atraso_corrente'].to_numpy() > BAD_ATRASO_DIAS).astype(np.float64)
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = np.column_stack([np.ones(len(X)), (X - mean) / scale])
+
+        beta = np.zeros(Z.shape[1])
+        penalty = np.full(Z.shape[1], l2 * len(Z))
+        penalty[0] = 0.0
+        for _ in range(max_iter):
+            p = 1 / (1 + np.exp(-Z @ beta))
+            gradient = Z.T @ (y - p) - penalty * beta
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            beta += step
+            if np.abs(step).max() < tol:
+                break
+        return cls(mean=mean, scale=scale, coef=beta[1:], intercept=float(beta[0]))
+
+    def predict_proba(self, batch: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Probabilidade de 'Bad' para cada proposta do lote.
+
+        Parâmetros:
+        - batch (Mapping[str, np.ndarray]): DataFrame ou dicionário com APPLICATION_COLUMNS.
+
+        Retorna:
+        - np.ndarray: Probabilidades, na ordem do lote.
+        """
+        return self.predict_proba_features(compute_application_features(batch))
+
+    def predict_proba_features(self, features: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Probabilidade de 'Bad' a partir das variáveis de `compute_application_features`.
+        """
+        X = _design_matrix(features)
+        logits = ((X - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1 / (1 + np.exp(-logits))
+
+    def save(self, path: Path = MODEL_PATH, version: Optional[tuple[int, int]] = None) -> None:
+        """
+        Grava os parâmetros do modelo em um arquivo .npz.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path, mean=self.mean, scale=self.scale, coef=self.coef, intercept=self.intercept,
+            features=np.array(MODEL_FEATURES), version=np.array(version or (-1, -1))
+        )
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH, version: Optional[tuple[int, int]] = None) -> Optional['RiskModel']:
+        """
+        Lê um modelo gravado, se existir, tiver as mesmas variáveis e (se informada) a mesma versão da base.
+
+        Um arquivo corrompido ou incompleto é tratado como ausente (o modelo é treinado de novo).
+        """
+        try:
+            with np.load(path) as data:
+                if list(data['features']) != MODEL_FEATURES:
+                    return None
+                if version is not None and tuple(data['version']) != tuple(version):
+                    return None
+                return cls(
+                    mean=data['mean'], scale=data['scale'], coef=data['coef'], intercept=float(data['intercept'])
+                )
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+
+def get_risk_model(path: Path = DATA_PATH) -> RiskModel:
+    """
+    Modelo treinado na versão atual da base, reaproveitando o arquivo gravado quando possível.
+
+    Retorna:
+    - RiskModel: Modelo pronto para escorar lotes.
+    """
+    version = data_version(path)
+    model = RiskModel.load(version=version)
+    if model is None:
+        model = RiskModel.fit(read_contracts(path, APPLICATION_COLUMNS + ['atraso_corrente']))
+        model.save(version=version)
+    return model
+
+
+def score_batch(batch: pd.DataFrame, model: RiskModel) -> pd.DataFrame:
+    """
+    Escora um lote de propostas, devolvendo as métricas de concessão e a probabilidade de Bad.
+
+    Parâmetros:
+    - batch (pd.DataFrame): Propostas com APPLICATION_COLUMNS.
+    - model (RiskModel): Modelo treinado.
+
+    Retorna:
+    - pd.DataFrame: 'ratio_contrato_faturamento', 'ratio_contrato_faturamento_cat', 'score_cat'
+      e 'probabilidade_bad', com o mesmo índice do lote.
+    """
+    features = compute_application_features(batch)
+    return pd.DataFrame({
+        'ratio_contrato_faturamento': features['ratio_contrato_faturamento'],
+        'ratio_contrato_faturamento_cat': features['ratio_contrato_faturamento_cat'].astype(int),
+        'score_cat': features['score_cat'].astype(int),
+        'probabilidade_bad': model.predict_proba_features(features),
+    }, index=batch.index)
+
+
+def parse_payload(body: bytes, content_type: str) -> pd.DataFrame:
+    """
+    Converte o corpo de uma requisição (CSV ou JSON) em um lote de propostas.
+
+    Parâmetros:
+    - body (bytes): Corpo da requisição.
+    - content_type (str): Content-Type da requisição.
+
+    Retorna:
+    - pd.DataFrame: Lote de propostas.
+    """
+    if 'csv' in content_type:
+        return pd.read_csv(io.BytesIO(body))
+    payload = json.loads(body)
+    if isinstance(payload, dict) and 'propostas' in payload:
+        payload = payload['propostas']
+    return pd.DataFrame(payload)
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """
+    Endpoint local de escoragem: POST /score com propostas em CSV ou JSON.
+    """
+    model: RiskModel
+
+    def do_POST(self) -> None:
+        if self.path.rstrip('/') != '/score':
+            self._reply(404, {'erro': 'Use POST /score.'})
+            return
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            batch = parse_payload(body, self.headers.get('Content-Type', 'application/json'))
+            probabilities = self.model.predict_proba(batch)
+        except (ValueError, KeyError, pd.errors.ParserError) as e:
+            self._reply(400, {'erro': str(e)})
+            return
+        # NaN (proposta com valor ausente) não é JSON válido: vai como null
+        probabilities = [p if np.isfinite(p) else None for p in probabilities.tolist()]
+        self._reply(200, {'probabilidade_bad': probabilities})
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def make_server(model: RiskModel, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    """
+    Cria o servidor HTTP de escoragem (ainda não iniciado).
+
+    Parâmetros:
+    - model (RiskModel): Modelo usado pelas requisições.
+    - host (str): Endereço de escuta.
+    - port (int): Porta (0 escolhe uma porta livre).
+
+    Retorna:
+    - ThreadingHTTPServer: Servidor; use `serve_forever()` para atender.
+    """
+    handler = type('BoundScoringHandler', (ScoringHandler,), {'model': model})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description='Escoragem em lote de propostas de crédito.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    score = commands.add_parser('score', help='Escora um CSV de propostas.')
+    score.add_argument('input', type=Path)
+    score.add_argument('output', type=Path, nargs='?')
+    serve = commands.add_parser('serve', help='Inicia o endpoint HTTP local.')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    model = get_risk_model()
+    if args.command == 'score':
+        batch = pd.read_csv(args.input)
+        result = batch.join(score_batch(batch, model))
+        if args.output:
+            result.to_csv(args.output, index=False)
+        else:
+            result.to_csv(sys.stdout, index=False)
+    else:
+        server = make_server(model, args.host, args.port)
+        print(f'Servindo em http://{args.host}:{server.server_port}/score')
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,346 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from profiling import profiled
+from utils import ARTIFACTS, DATA_PATH, REGIOES, data_version, iter_contract_chunks
+
+# Colunas lidas do arquivo para as estatísticas por segmento
+SEGMENT_COLUMNS: List[str] = ['estado', 'setor', 'taxa', 'prazo', 'valor_contrato', 'valor_em_aberto']
+# Segmentações disponíveis; 'carteira' tem uma única categoria ('Total') com a base inteira
+SEGMENT_GROUPS: List[str] = ['carteira', 'estado', 'setor', 'regiao']
+# Colunas com sketch de quantis
+QUANTILE_COLUMNS: List[str] = ['valor_contrato', 'valor_em_aberto']
+# Somas exatas guardadas por categoria (pesos: 'valor_contrato')
+MOMENT_COLUMNS: List[str] = [
+    'n', 'soma_valor', 'soma_valor2', 'soma_taxa_pond', 'soma_taxa2_pond',
+    'soma_prazo_pond', 'soma_prazo2_pond', 'soma_aberto'
+]
+
+
+@dataclass
+class QuantileSketch:
+    """
+    Sketch de quantis aproximados no estilo t-digest (variante "merging"), em NumPy.
+
+    Guarda no máximo cerca de `compression / 2` centroides (média e peso). Os centroides
+    são menores nas caudas, de modo que quantis extremos (ex.: p95, p99) têm erro
+    relativo de rank menor que a mediana. Mínimo e máximo são exatos. Dois sketches
+    são combinados com `merge`, o que permite montá-los por bloco ou por worker.
+
+    Atributos:
+    - compression (float): Parâmetro de precisão (mais alto = mais centroides).
+    - means (np.ndarray): Média de cada centroide, em ordem crescente.
+    - weights (np.ndarray): Peso de cada centroide.
+    - min (float): Menor valor visto.
+    - max (float): Maior valor visto.
+    """
+    compression: float = 500.0
+    means: np.ndarray = field(default_factory=lambda: np.empty(0))
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0))
+    min: float = np.inf
+    max: float = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray, weights: Optional[np.ndarray] = None) -> 'QuantileSketch':
+        """
+        Incorpora um lote de valores (NaN são ignorados).
+
+        Parâmetros:
+        - values (np.ndarray): Valores do lote.
+        - weights (np.ndarray, opcional): Peso de cada valor. Por padrão, 1.
+
+        Retorna:
+        - QuantileSketch: O próprio sketch, atualizado.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = np.isfinite(values) & (weights > 0)
+        values, weights = values[keep], weights[keep]
+        if len(values):
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Combina outro sketch a este.
+
+        Parâmetros:
+        - other (QuantileSketch): Sketch de outro bloco ou partição.
+
+        Retorna:
+        - QuantileSketch: O próprio sketch, atualizado.
+        """
+        if len(other.means):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Agrupa pontos vizinhos em centroides cujo intervalo de quantis cabe em uma
+        unidade da função de escala k1 (k = δ/2π · arcsen(2q − 1)).
+        """
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        # Clusters consecutivos: renumera para 0..m-1
+        cluster = np.concatenate([[0], np.cumsum(np.diff(cluster) != 0)])
+        total = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=weights * means) / total
+        self.weights = total
+
+    def quantile(self, q):
+        """
+        Quantil aproximado, interpolando linearmente entre os centros dos centroides.
+
+        Parâmetros:
+        - q (float ou array): Probabilidade(s) entre 0 e 1.
+
+        Retorna:
+        - float ou np.ndarray: Quantil(is) estimado(s); NaN se o sketch estiver vazio.
+        """
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan)[()] if np.ndim(q) else np.nan
+        cumulative = np.cumsum(self.weights)
+        centers = (cumulative - self.weights / 2) / cumulative[-1]
+        xp = np.concatenate([[0.0], centers, [1.0]])
+        fp = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q, xp, fp)
+
+
+def _segment_keys(df: pd.DataFrame, group: str) -> pd.Series:
+    if group == 'carteira':
+        return pd.Series(pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), ['Total']))
+    if group == 'regiao' and group not in df.columns:
+        # Em colunas categóricas, o map é aplicado só às categorias
+        return df['estado'].map(REGIOES)
+    return df[group]
+
+
+@dataclass
+class SegmentStatistics:
+    """
+    Estatísticas mescláveis da carteira por segmento ('carteira', 'estado', 'setor', 'regiao').
+
+    Para cada categoria guarda somas exatas (contagem, Σ valor, Σ valor², e as somas de
+    taxa e prazo, e de seus quadrados, ponderadas pelo valor do contrato) e sketches de
+    quantis de 'valor_contrato' e 'valor_em_aberto'. O tamanho não depende do número de
+    linhas: a base pode ser percorrida em blocos (`update`) ou em partições combinadas
+    com `merge`.
+
+    Atributos:
+    - compression (float): Precisão dos sketches de quantis.
+    - moments (dict[str, pd.DataFrame]): Por segmentação, as somas de MOMENT_COLUMNS por categoria.
+    - sketches (dict[str, dict]): Por segmentação e categoria, um QuantileSketch por coluna de QUANTILE_COLUMNS.
+    """
+    compression: float = 500.0
+    moments: dict[str, pd.DataFrame] = field(default_factory=dict)
+    sketches: dict[str, dict] = field(default_factory=dict)
+
+    def update(self, chunk: pd.DataFrame) -> 'SegmentStatistics':
+        """
+        Incorpora um bloco de contratos.
+
+        Parâmetros:
+        - chunk (pd.DataFrame): Bloco com as colunas de SEGMENT_COLUMNS.
+
+        Retorna:
+        - SegmentStatistics: O próprio objeto, atualizado.
+        """
+        return self.merge(SegmentStatistics.from_frame(chunk, self.compression))
+
+    def merge(self, other: 'SegmentStatistics') -> 'SegmentStatistics':
+        """
+        Combina as estatísticas de outro bloco ou partição a estas.
+
+        Parâmetros:
+        - other (SegmentStatistics): Estatísticas a combinar.
+
+        Retorna:
+        - SegmentStatistics: O próprio objeto, atualizado.
+        """
+        for group, moments in other.moments.items():
+            if group in self.moments:
+                self.moments[group] = self.moments[group].add(moments, fill_value=0)
+            else:
+                self.moments[group] = moments.copy()
+        for group, categories in other.sketches.items():
+            mine = self.sketches.setdefault(group, {})
+            for category, sketches in categories.items():
+                if category not in mine:
+                    mine[category] = {col: QuantileSketch(self.compression) for col in QUANTILE_COLUMNS}
+                for col, sketch in sketches.items():
+                    mine[category][col].merge(sketch)
+        return self
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, compression: float = 500.0) -> 'SegmentStatistics':
+        """
+        Calcula as estatísticas de um DataFrame em memória.
+
+        Parâmetros:
+        - df (pd.DataFrame): DataFrame com as colunas de SEGMENT_COLUMNS.
+        - compression (float): Precisão dos sketches de quantis.
+
+        Retorna:
+        - SegmentStatistics: Estatísticas do DataFrame.
+        """
+        valor = df['valor_contrato'].to_numpy(dtype=np.float64)
+        taxa = df['taxa'].to_numpy(dtype=np.float64)
+        prazo = df['prazo'].to_numpy(dtype=np.float64)
+        terms = {
+            'n': np.ones_like(valor),
+            'soma_valor': valor,
+            'soma_valor2': valor ** 2,
+            'soma_taxa_pond': taxa * valor,
+            'soma_taxa2_pond': taxa ** 2 * valor,
+            'soma_prazo_pond': prazo * valor,
+            'soma_prazo2_pond': prazo ** 2 * valor,
+            'soma_aberto': df['valor_em_aberto'].to_numpy(dtype=np.float64),
+        }
+        # Cada coluna de quantis é ordenada uma única vez; por segmentação, uma ordenação
+        # estável (radix) pelo código separa as categorias mantendo os valores em ordem.
+        by_value = {}
+        for col in QUANTILE_COLUMNS:
+            values = df[col].to_numpy(dtype=np.float64)
+            order = np.argsort(values, kind='stable')
+            by_value[col] = (values[order], order)
+
+        stats = cls(compression=compression)
+        for group in SEGMENT_GROUPS:
+            codes, categories = pd.factorize(_segment_keys(df, group), sort=True)
+            categories = pd.Index(np.asarray(categories, dtype=object), name=group)
+            # Linhas sem categoria (código -1) ficam fora da segmentação, como no groupby
+            valid = codes >= 0
+            stats.moments[group] = pd.DataFrame(
+                {
+                    name: np.bincount(codes[valid], weights=values[valid], minlength=len(categories))
+                    for name, values in terms.items()
+                },
+                index=categories
+            )
+            sketches = {category: {} for category in categories}
+            for col, (sorted_values, order) in by_value.items():
+                sorted_codes = codes[order].astype(np.int16 if len(categories) < 2**15 else np.int64)
+                by_code = np.argsort(sorted_codes, kind='stable')
+                bounds = np.searchsorted(sorted_codes[by_code], np.arange(len(categories) + 1))
+                for i, category in enumerate(categories):
+                    segment = sorted_values[by_code[bounds[i]:bounds[i + 1]]]
+                    sketches[category][col] = QuantileSketch(compression).update(segment)
+            stats.sketches[group] = sketches
+        return stats
+
+    def table(
+        self,
+        group: str,
+        quantiles: Optional[dict[str, List[float]]] = None
+    ) -> pd.DataFrame:
+        """
+        Métricas por categoria de uma segmentação.
+
+        Médias e desvios são exatos (desvios populacionais; taxa e prazo ponderados pelo
+        valor do contrato, como em `utils.calculate_metrics`); quantis são aproximados.
+
+        Parâmetros:
+        - group (str): Segmentação, entre SEGMENT_GROUPS.
+        - quantiles (dict[str, List[float]], opcional): Quantis por coluna. Por padrão,
+          mediana de 'valor_contrato' e p95 de 'valor_em_aberto'.
+
+        Retorna:
+        - pd.DataFrame: Uma linha por categoria, com 'Contratos', 'Ticket Médio',
+          'Desvio Ticket', 'Taxa Média', 'Desvio Taxa', 'Prazo Médio', 'Desvio Prazo',
+          'Valor em Aberto' e uma coluna por quantil pedido (ex.: 'p50 valor_contrato').
+        """
+        if quantiles is None:
+            quantiles = {'valor_contrato': [0.5], 'valor_em_aberto': [0.95]}
+        m = self.moments[group]
+        m = m[m['n'] > 0]
+        n, valor = m['n'], m['soma_valor']
+
+        def std(sum_x2: pd.Series, mean: pd.Series, weight: pd.Series) -> pd.Series:
+            return np.sqrt(np.maximum(sum_x2 / weight - mean ** 2, 0))
+
+        ticket = valor / n
+        taxa = m['soma_taxa_pond'] / valor
+        prazo = m['soma_prazo_pond'] / valor
+        result = pd.DataFrame({
+            'Contratos': n.astype(np.int64),
+            'Ticket Médio': ticket,
+            'Desvio Ticket': std(m['soma_valor2'], ticket, n),
+            'Taxa Média': taxa,
+            'Desvio Taxa': std(m['soma_taxa2_pond'], taxa, valor),
+            'Prazo Médio': prazo,
+            'Desvio Prazo': std(m['soma_prazo2_pond'], prazo, valor),
+            'Valor em Aberto': m['soma_aberto'],
+        })
+        for col, qs in quantiles.items():
+            estimates = np.array([self.sketches[group][category][col].quantile(qs) for category in m.index])
+            for j, q in enumerate(qs):
+                result[f'p{q * 100:g} {col}'] = estimates[:, j]
+        return result
+
+
+def segment_chunks(chunks: Iterable[pd.DataFrame], compression: float = 500.0) -> SegmentStatistics:
+    """
+    Calcula as estatísticas por segmento de uma sequência de blocos.
+
+    Parâmetros:
+    - chunks (Iterable[pd.DataFrame]): Blocos com as colunas de SEGMENT_COLUMNS.
+    - compression (float): Precisão dos sketches de quantis.
+
+    Retorna:
+    - SegmentStatistics: Estatísticas de todos os blocos.
+    """
+    stats = SegmentStatistics(compression=compression)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+@profiled()
+def segment_file(path: Path = DATA_PATH, chunksize: int = 100_000) -> SegmentStatistics:
+    """
+    Calcula as estatísticas por segmento em uma passada pelo arquivo, em blocos.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de contratos.
+    - chunksize (int): Número de linhas por bloco.
+
+    Retorna:
+    - SegmentStatistics: Estatísticas da base inteira.
+    """
+    return segment_chunks(iter_contract_chunks(path, SEGMENT_COLUMNS, chunksize))
+
+
+@st.cache_data
+@ARTIFACTS.cached('segment_statistics')
+def _load_segment_statistics_cached(path: str, version: tuple[int, int], chunksize: int) -> SegmentStatistics:
+    return segment_file(Path(path), chunksize)
+
+
+@profiled()
+def load_segment_statistics(path: Path = DATA_PATH, chunksize: int = 100_000) -> SegmentStatistics:
+    """
+    Versão memoizada de `segment_file`, invalidada quando o arquivo muda.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de contratos.
+    - chunksize (int): Número de linhas por bloco.
+
+    Retorna:
+    - SegmentStatistics: Estatísticas da base inteira.
+    """
+    return _load_segment_statistics_cached(str(path), data_version(path), chunksize)
@@ -0,0 +1,36 @@
+"""
+Configuração comum dos testes: raiz do app no sys.path e base do case como referência.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import DATA_PATH, read_contracts  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app_root():
+    # Os caminhos do app (DATA_PATH, CACHE_DIR) são relativos à raiz
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    yield ROOT
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope='session')
+def _contracts(app_root) -> pd.DataFrame:
+    return read_contracts(ROOT / DATA_PATH)
+
+
+@pytest.fixture
+def contracts(_contracts) -> pd.DataFrame:
+    """
+    Cópia da base do case, tipada e com a coluna de id.
+    """
+    return _contracts.copy()
@@ -0,0 +1,108 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+
+from artifacts import ArtifactCache, read_columns, source_fingerprint, write_columns
+
+
+def test_new_version_replaces_old(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    cache.put('tabela', ('estado',), (1, 100), {'valor': 1})
+    assert cache.get('tabela', ('estado',), (1, 100)) == {'valor': 1}
+
+    cache.put('tabela', ('estado',), (2, 100), {'valor': 2})
+    assert cache.get('tabela', ('estado',), (1, 100)) is None
+    assert cache.get('tabela', ('estado',), (2, 100)) == {'valor': 2}
+    assert len(cache.entries()) == 1
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    payload = np.zeros(1000)
+    cache = ArtifactCache(tmp_path, max_bytes=10**9)
+    for i in range(4):
+        cache.put('x', i, 1, payload)
+        path = cache._find('x', i, 1)
+        os.utime(path, (i, i))
+    size = cache.entries()[0][1]
+
+    cache.get('x', 0, 1)  # o mais antigo passa a ser o mais recente
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert [cache.get('x', i, 1) is not None for i in range(4)] == [True, False, False, True]
+
+
+def test_put_does_not_scan_the_cache_below_the_limit(tmp_path, monkeypatch):
+    cache = ArtifactCache(tmp_path, max_bytes=10**9)
+    cache.put('x', 'primeiro', 1, b'0' * 100)
+    scans = []
+    original = cache.entries
+    monkeypatch.setattr(cache, 'entries', lambda: scans.append(1) or original())
+    for i in range(50):
+        cache.put('x', i, 1, b'0' * 100)
+    assert scans == []
+
+    cache.max_bytes = 1000
+    cache.put('x', 'grande', 1, b'0' * 2000)
+    assert len(scans) == 1
+    assert sum(size for _, size, _ in original()) <= 1000
+
+
+def test_cached_decorator_keys_by_arguments_and_version(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    calls = []
+
+    @cache.cached('soma')
+    def soma(a, b=1, version=None):
+        calls.append((a, b, version))
+        return a + b
+
+    assert soma(1, version=(1, 0)) == 2
+    assert soma(1, b=1, version=(1, 0)) == 2
+    assert soma(2, version=(1, 0)) == 3
+    assert soma(1, version=(2, 0)) == 2
+    assert calls == [(1, 1, (1, 0)), (2, 1, (1, 0)), (1, 1, (2, 0))]
+
+
+def test_column_frames_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'valor': np.arange(5, dtype=np.float32),
+        'estado': pd.Categorical(['SP', 'RJ', 'SP', 'MG', 'RJ']),
+        'regiao': pd.Series(['Sudeste'] * 5, dtype=object),
+    })
+    write_columns(tmp_path / 'frame', df)
+    pd.testing.assert_frame_equal(read_columns(tmp_path / 'frame'), df)
+
+    cache = ArtifactCache(tmp_path / 'cache')
+    cache.put('frame', (), 1, df)
+    assert cache._find('frame', (), 1).suffix == '.columns'
+    pd.testing.assert_frame_equal(cache.get('frame', (), 1), df)
+
+
+def test_code_version_is_part_of_the_key(tmp_path):
+    ArtifactCache(tmp_path, code_version='a').put('tabela', (), (1, 100), {'valor': 1})
+
+    assert ArtifactCache(tmp_path, code_version='b').get('tabela', (), (1, 100)) is None
+    assert ArtifactCache(tmp_path, code_version='a').get('tabela', (), (1, 100)) == {'valor': 1}
+
+
+def test_source_fingerprint_tracks_module_contents(tmp_path):
+    (tmp_path / 'modulo.py').write_text('LOSS_CORTE = 0.2\n')
+    before = source_fingerprint(tmp_path)
+    (tmp_path / 'modulo.py').write_text('LOSS_CORTE = 0.3\n')
+    assert source_fingerprint(tmp_path) != before
+
+
+def test_unpicklable_entry_is_a_miss(tmp_path, monkeypatch):
+    module = types.ModuleType('modulo_removido')
+    exec('class Resultado:\n    pass\n', module.__dict__)
+    module.Resultado.__module__ = 'modulo_removido'
+    monkeypatch.setitem(sys.modules, 'modulo_removido', module)
+    cache = ArtifactCache(tmp_path)
+    cache.put('x', (), 1, module.Resultado())
+    assert cache.get('x', (), 1) is not None
+
+    monkeypatch.delitem(sys.modules, 'modulo_removido')
+    assert cache.get('x', (), 1) is None
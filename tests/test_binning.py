@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from binning import FeatureBinning, fit_binning
+
+
+def test_values_on_edges_go_to_upper_bin():
+    binning = FeatureBinning(column='x', kind='numeric', edges=np.array([1.0, 2.0, 3.0]), woe=np.zeros(5))
+    values = [-np.inf, 0.5, 1, 1.5, 2, 3, 10, np.inf, np.nan]
+
+    np.testing.assert_array_equal(binning.transform_bins(values), [0, 0, 1, 1, 2, 3, 3, 3, 4])
+
+
+def test_bins_reproduce_fitted_counts():
+    rng = np.random.default_rng(3)
+    # Valores inteiros repetidos: parte das linhas cai exatamente sobre os cortes
+    x = rng.integers(0, 40, 3000).astype(float)
+    y = (rng.random(3000) < 0.05 + x / 80).astype(int)
+    x[rng.random(3000) < 0.03] = np.nan
+    df = pd.DataFrame({'x': x, 'Bad': y})
+
+    binning = fit_binning(df, 'x')
+    bins = binning.transform_bins(df['x'])
+    assert np.isin(binning.edges, x).all()
+    np.testing.assert_array_equal(np.bincount(bins, minlength=binning.n_bins + 1), binning.table['Contratos'])
+    np.testing.assert_array_equal(np.bincount(bins, weights=y, minlength=binning.n_bins + 1), binning.table['Mau Pagador'])
+
+
+def test_unknown_and_missing_categories_use_missing_bin():
+    df = pd.DataFrame({'uf': ['SP', 'RJ', 'MG', 'SP', None] * 40, 'Bad': [0, 1, 0, 1, 0] * 40})
+    binning = fit_binning(df, 'uf', min_bin_share=0.0)
+
+    bins = binning.transform_bins(['SP', 'XX', None])
+    assert bins[0] == binning.category_bins['SP']
+    assert list(bins[1:]) == [binning.n_bins, binning.n_bins]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregation import PortfolioAggregate
+from cube import RiskCube
+from utils import REGIOES
+
+FILTERS = [
+    {},
+    {'estados': ['SP', 'RJ', 'MG']},
+    {'setores': ['VAREJO', 'ATACADO'], 'score': (200, 700)},
+    {'regioes': ['Sul', 'Nordeste'], 'prazo': (6, 18)},
+    {'estados': ['SP', 'PR'], 'regioes': ['Sul'], 'score': (0, 500), 'prazo': (3, 27)},
+]
+
+
+def filter_rows(df, estados=None, setores=None, regioes=None, score=None, prazo=None):
+    keep = np.ones(len(df), dtype=bool)
+    if estados is not None:
+        keep &= df['estado'].isin(estados).to_numpy()
+    if setores is not None:
+        keep &= df['setor'].isin(setores).to_numpy()
+    if regioes is not None:
+        keep &= df['estado'].map(REGIOES).isin(regioes).to_numpy()
+    for column, limits in (('score', score), ('prazo', prazo)):
+        if limits is not None:
+            keep &= ((df[column] >= limits[0]) & (df[column] < limits[1])).to_numpy()
+    return df[keep]
+
+
+@pytest.fixture(scope='module')
+def cube(_contracts):
+    return RiskCube.from_frame(_contracts)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_select_matches_row_filtering(cube, contracts, filters):
+    rows = filter_rows(contracts, **filters)
+    assert len(rows) > 0
+    selected, expected = cube.select(**filters), PortfolioAggregate.from_frame(rows)
+
+    assert selected.n_contratos == len(rows)
+    np.testing.assert_allclose(selected.metrics(), expected.metrics(), rtol=1e-9)
+    for class_column in ('Bad', 'Loss_cat'):
+        pd.testing.assert_series_equal(selected.class_totals(class_column), expected.class_totals(class_column))
+    columns = ['estado', 'setor', 'regiao']
+    # risk_tables omite categorias sem contratos, então as duas tabelas devem coincidir linha a linha
+    for got, want in zip(selected.risk_tables(columns, ['Bad']), expected.risk_tables(columns, ['Bad'])):
+        pd.testing.assert_frame_equal(got, want)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+from seaborn._statistics import KDE
+
+from distributions import summarize_distribution
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        'x': np.r_[rng.lognormal(0, 0.5, 3000), rng.normal(4, 1, 1000)],
+        'Bad': np.r_[np.zeros(3000, dtype=int), np.ones(1000, dtype=int)],
+    })
+
+
+@pytest.mark.parametrize('cut', [0, 3])
+def test_kde_matches_seaborn(sample, cut):
+    summary = summarize_distribution(sample, 'x', 'Bad', cut=cut)
+    # Grade comum às classes, como o Seaborn com common_grid (histplot usa cut=0)
+    kde = KDE(cut=cut, gridsize=200)
+    kde.define_support(sample['x'].to_numpy())
+    np.testing.assert_allclose(summary.kde_x, kde.support, rtol=1e-9)
+
+    for cls, group in sample.groupby('Bad'):
+        density, _ = kde(group['x'].to_numpy())
+        # Aproximação do binning linear: erro pequeno frente ao pico da curva
+        assert np.abs(summary.kde_y[cls] - density).max() < 0.02 * density.max()
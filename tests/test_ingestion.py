@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregation
+import utils
+from aggregation import PortfolioAggregate
+from ingestion import ContractBook
+from utils import ID_COLUMN, write_contracts
+
+
+def assert_aggregates_equal(incremental: PortfolioAggregate, full: PortfolioAggregate) -> None:
+    np.testing.assert_allclose(incremental.metrics(), full.metrics(), rtol=1e-9)
+    for class_column in ('Bad', 'Loss_cat'):
+        pd.testing.assert_series_equal(incremental.class_totals(class_column), full.class_totals(class_column))
+    columns = ['estado', 'setor', 'regiao']
+    for got, expected in zip(incremental.risk_tables(columns, ['Bad', 'Loss_cat']), full.risk_tables(columns, ['Bad', 'Loss_cat'])):
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_upsert_matches_full_recompute(contracts):
+    book = ContractBook(contracts)
+    ids = contracts[ID_COLUMN].to_numpy()
+
+    # 40 contratos passam a atrasar 400 dias, 10 são reenviados sem mudança
+    updates = pd.DataFrame({
+        ID_COLUMN: ids[:50],
+        'atraso_corrente': np.r_[np.full(40, 400), contracts['atraso_corrente'].to_numpy()[40:50]],
+        'valor_em_aberto': contracts['valor_em_aberto'].to_numpy()[:50],
+    })
+    inserts = contracts.iloc[100:130].copy()
+    inserts[ID_COLUMN] = ids.max() + 1 + np.arange(len(inserts))
+    updated = book.upsert(updates)
+    inserted = book.upsert(inserts)
+
+    assert (updated.inseridos, inserted.inseridos, inserted.atualizados) == (0, 30, 0)
+    assert updated.atualizados == int((contracts['atraso_corrente'].to_numpy()[:40] != 400).sum())
+    assert len(book.frame) == len(contracts) + 30
+    assert (book.frame.loc[ids[:40], 'atraso_corrente'] == 400).all()
+    assert_aggregates_equal(book.aggregate, PortfolioAggregate.from_frame(book.frame))
+
+
+def test_upsert_without_changes_counts_nothing(contracts):
+    book = ContractBook(contracts)
+    result = book.upsert(contracts[[ID_COLUMN, 'atraso_corrente', 'estado']].head(25))
+    assert (result.inseridos, result.atualizados) == (0, 0)
+    assert_aggregates_equal(book.aggregate, PortfolioAggregate.from_frame(contracts))
+
+
+def test_upsert_rejects_incomplete_inserts(contracts):
+    book = ContractBook(contracts)
+    batch = pd.DataFrame({ID_COLUMN: [contracts[ID_COLUMN].max() + 1], 'atraso_corrente': [10]})
+    with pytest.raises(ValueError):
+        book.upsert(batch)
+
+
+def test_duplicate_ids_are_rejected(contracts):
+    with pytest.raises(ValueError):
+        ContractBook(pd.concat([contracts, contracts.head(1)]))
+
+
+def test_from_file_reuses_saved_aggregate(contracts, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(aggregation, 'CACHE_DIR', tmp_path / 'cache')
+    path = tmp_path / 'contratos.csv'
+    write_contracts(contracts, path)
+    book = ContractBook.from_file(path)
+    book.upsert(pd.DataFrame({ID_COLUMN: contracts[ID_COLUMN].head(5), 'atraso_corrente': 400}))
+    book.save(path)
+
+    def fail(df):
+        raise AssertionError('base reagregada por inteiro')
+    with monkeypatch.context() as m:
+        m.setattr(PortfolioAggregate, 'from_frame', fail)
+        reloaded = ContractBook.from_file(path)
+    assert_aggregates_equal(reloaded.aggregate, PortfolioAggregate.from_frame(reloaded.frame))
+
+    # Arquivo alterado por fora: o agregado gravado não vale mais
+    write_contracts(contracts, path)
+    assert_aggregates_equal(ContractBook.from_file(path).aggregate, PortfolioAggregate.from_frame(contracts))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from moments import ClassMoments
+
+COLUMNS = ['a', 'b', 'c']
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(7)
+    n = 5000
+    df = pd.DataFrame({
+        'a': rng.normal(1e6, 3, n),
+        'b': rng.normal(0, 1, n),
+        'c': rng.exponential(2, n),
+        'Bad': rng.integers(0, 2, n),
+    })
+    df['b'] += 0.5 * (df['a'] - 1e6) + df['Bad']
+    for col, share in (('a', 0.05), ('b', 0.2), ('c', 0.1)):
+        df.loc[rng.random(n) < share, col] = np.nan
+    return df
+
+
+def test_matches_pandas_with_missing_values(sample):
+    moments = ClassMoments.from_frame(sample, 'Bad', COLUMNS)
+    by_class = sample.groupby('Bad')[COLUMNS]
+
+    pd.testing.assert_frame_equal(moments.correlation(), sample[COLUMNS].corr(), rtol=1e-9)
+    pd.testing.assert_frame_equal(moments.covariance(), sample[COLUMNS].cov(), rtol=1e-9)
+    pd.testing.assert_frame_equal(moments.class_means(), by_class.mean(), rtol=1e-12)
+    pd.testing.assert_frame_equal(moments.class_variances(), by_class.var(), rtol=1e-9)
+    pd.testing.assert_frame_equal(moments.class_counts(), by_class.count().astype(float))
+
+
+def test_blocks_merge_to_single_pass(sample):
+    single = ClassMoments.from_frame(sample, 'Bad', COLUMNS)
+    blocks = ClassMoments.from_frame(sample, 'Bad', COLUMNS, block_size=777)
+
+    pd.testing.assert_frame_equal(blocks.correlation(), single.correlation(), rtol=1e-9)
+    pd.testing.assert_frame_equal(blocks.class_variances(), single.class_variances(), rtol=1e-9)
+
+
+def test_mean_percent_diff_without_class_is_nan(sample):
+    only_good = ClassMoments.from_frame(sample[sample['Bad'] == 0], 'Bad', COLUMNS)
+
+    diff = only_good.mean_percent_diff()
+    assert list(diff.index) == COLUMNS
+    assert diff.isna().all()
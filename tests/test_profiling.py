@@ -0,0 +1,14 @@
+import tracemalloc
+
+import profiling
+from profiling import begin_page, profile_step
+
+
+def test_debug_visit_does_not_start_tracemalloc(monkeypatch):
+    monkeypatch.setattr(profiling, 'profiling_enabled', lambda: True)
+    begin_page('teste')
+    with profile_step('passo') as step:
+        sum(range(1000))
+
+    assert not tracemalloc.is_tracing()
+    assert step.seconds > 0 and step.allocated_bytes is None
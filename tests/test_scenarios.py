@@ -0,0 +1,64 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scenarios import SCENARIO_METRICS, pareto_frontier, simulate_scenarios
+
+CORTES = (30, 90, 360)
+SCORES = (0, 400, 700, 990)
+CHOQUES = (-1.0, 0.5)
+FATORES = (0.75, 1.25)
+
+
+def scenario_by_rows(df, corte, score_minimo, choque, fator):
+    aprovados = df[df['score'] >= score_minimo]
+    bad = aprovados['atraso_corrente'] > corte
+    valor = aprovados['valor_contrato']
+    juros = aprovados['valor_contrato_mais_juros'] - valor
+    juros_cenario = fator * juros * (aprovados['taxa'] + choque) / aprovados['taxa']
+    fracao_aberta = aprovados['valor_em_aberto'] / aprovados['valor_contrato_mais_juros']
+    perda = (fracao_aberta * (valor + juros_cenario))[bad].sum()
+    volume = valor.sum()
+    return {
+        'Contratos Aprovados': len(aprovados),
+        'Volume Aprovado': volume,
+        'Taxa de Bad (%)': bad.mean() * 100 if len(aprovados) else 0.0,
+        'Perda Esperada': perda,
+        'Perda Esperada (%)': perda / volume * 100 if volume > 0 else 0.0,
+        'Taxa Média': (aprovados['taxa'] * valor).sum() / volume + choque if volume > 0 else np.nan,
+        'Juros': juros_cenario.sum(),
+        'Resultado': juros_cenario.sum() - perda,
+    }
+
+
+def test_grid_matches_per_scenario_loop(contracts):
+    grid = simulate_scenarios(contracts, CORTES, SCORES, CHOQUES, FATORES).set_index(
+        ['score_minimo', 'atraso_corte', 'choque_taxa', 'fator_prazo']
+    )
+    expected = pd.DataFrame([
+        scenario_by_rows(contracts, corte, score, choque, fator)
+        for score, corte, choque, fator in itertools.product(SCORES, CORTES, CHOQUES, FATORES)
+    ], index=grid.index)[SCENARIO_METRICS]
+
+    assert len(grid) == len(SCORES) * len(CORTES) * len(CHOQUES) * len(FATORES)
+    pd.testing.assert_frame_equal(grid, expected, check_dtype=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize('by', [None, 'atraso_corte'])
+def test_pareto_frontier_matches_pairwise_dominance(contracts, by):
+    grid = simulate_scenarios(contracts, CORTES, SCORES, CHOQUES, FATORES)
+    efficient = pareto_frontier(grid, maximize='Resultado', minimize='Taxa de Bad (%)', by=by)
+
+    groups = grid.groupby(by) if by else [(None, grid)]
+    for _, group in groups:
+        # Cenários empatados nas duas métricas contam uma vez só na fronteira
+        points = group[['Resultado', 'Taxa de Bad (%)']].drop_duplicates().to_numpy()
+        expected = {
+            (up, down) for up, down in points
+            if not ((points[:, 0] >= up) & (points[:, 1] <= down) & ((points[:, 0] > up) | (points[:, 1] < down))).any()
+        }
+        chosen = group.loc[efficient[group.index], ['Resultado', 'Taxa de Bad (%)']]
+        assert set(map(tuple, chosen.to_numpy())) == expected
+        assert len(chosen) == len(expected)
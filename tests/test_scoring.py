@@ -0,0 +1,47 @@
+import json
+import threading
+import urllib.request
+
+import numpy as np
+import pytest
+
+from scoring import APPLICATION_COLUMNS, RiskModel, make_server
+
+
+@pytest.fixture(scope='module')
+def model(_contracts):
+    return RiskModel.fit(_contracts)
+
+
+@pytest.mark.parametrize('content', [b'', b'lixo', b'PK\x03\x04truncado'])
+def test_corrupt_model_file_counts_as_missing(tmp_path, content):
+    path = tmp_path / 'modelo.npz'
+    path.write_bytes(content)
+    assert RiskModel.load(path) is None
+
+
+def test_saved_model_round_trip(tmp_path, model):
+    path = tmp_path / 'modelo.npz'
+    model.save(path, version=(1, 2))
+    loaded = RiskModel.load(path, version=(1, 2))
+    np.testing.assert_array_equal(loaded.coef, model.coef)
+    assert RiskModel.load(path, version=(3, 4)) is None
+
+
+def test_server_replies_null_for_missing_values(model, _contracts):
+    records = _contracts[APPLICATION_COLUMNS].head(2).to_dict('records')
+    records[1]['score'] = None
+    server = make_server(model, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{server.server_port}/score', data=json.dumps(records).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request) as response:
+            probabilities = json.loads(response.read())['probabilidade_bad']
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 0 < probabilities[0] < 1
+    assert probabilities[1] is None
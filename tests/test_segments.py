@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from segments import QuantileSketch
+
+QUANTILES = np.array([0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999])
+
+
+@pytest.fixture(scope='module')
+def values():
+    return np.random.default_rng(11).lognormal(8, 1.5, 200_000)
+
+
+def rank_error(sketch, values):
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(QUANTILES)) / len(values)
+    return np.abs(ranks - QUANTILES)
+
+
+@pytest.mark.parametrize('blocks', [1, 20])
+def test_rank_error_is_small_and_smaller_in_tails(values, blocks):
+    sketch = QuantileSketch()
+    for block in np.array_split(values, blocks):
+        sketch.merge(QuantileSketch().update(block))
+
+    error = rank_error(sketch, values)
+    assert error.max() < 2e-3
+    # Nas caudas o erro fica abaixo de 10% da massa além do quantil (ex.: p99.9)
+    assert (error / np.minimum(QUANTILES, 1 - QUANTILES)).max() < 0.1
+    assert len(sketch.means) <= sketch.compression / 2 + 1
+    assert sketch.count == len(values)
+    assert (sketch.quantile(0.0), sketch.quantile(1.0)) == (values.min(), values.max())
+
+
+def test_empty_sketch_and_nan_values():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    assert np.isnan(QuantileSketch().quantile([0.1, 0.9])).all()
+    sketch = QuantileSketch().update(np.array([1.0, np.nan, 3.0]))
+    assert sketch.count == 2
+    assert sketch.quantile(0.5) == 2.0
@@ -0,0 +1,72 @@
+import os
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, 'CACHE_DIR', tmp_path / 'cache')
+    path = tmp_path / 'dados.csv'
+    path.write_text('a,b\n1,2\n')
+    utils._write_sidecar(path, pd.DataFrame({'a': [1], 'b': [2]}))
+    return path
+
+
+def test_touched_csv_is_hashed_once(csv, monkeypatch):
+    stat = csv.stat()
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert utils._sidecar_is_fresh(csv)
+
+    def fail(path):
+        raise AssertionError('hash recalculado')
+    monkeypatch.setattr(utils, '_file_sha256', fail)
+    assert utils._sidecar_is_fresh(csv)
+
+
+def test_changed_csv_invalidates_sidecar(csv):
+    stat = csv.stat()
+    csv.write_text('a,b\n3,4\n')
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not utils._sidecar_is_fresh(csv)
+
+
+def test_workers_do_not_rerun_the_main_script(tmp_path, monkeypatch):
+    # Como no Streamlit: o script da página instalado como __main__
+    marker = tmp_path / 'executou.txt'
+    page = tmp_path / 'pagina.py'
+    page.write_text(f'open({str(marker)!r}, "w").close()\n')
+    main = types.ModuleType('__main__')
+    main.__file__ = str(page)
+    monkeypatch.setitem(sys.modules, '__main__', main)
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=utils.worker_context()) as pool:
+        assert pool.submit(os.getpid).result() != os.getpid()
+    assert not marker.exists()
+
+
+@pytest.mark.parametrize('x, y', [
+    ([], []),
+    ([np.nan, np.inf, 1.0], [1.0, 2.0, np.nan]),
+    ([3.0, 3.0, 3.0, np.nan], [1.0, 2.0, 3.0, 4.0]),
+])
+def test_trend_needs_two_distinct_x(x, y):
+    assert utils.linear_trend(np.array(x), np.array(y)) is None
+
+
+def test_scalable_scatter_skips_degenerate_trend():
+    df = pd.DataFrame({'constante': np.full(50, 2.0), 'alvo': np.arange(50.0)})
+    fig = utils.build_scatter_figure(df, 'alvo', ['constante'], max_points=10)
+    assert not fig.axes[0].lines
+
+    grid, fitted, lower, upper = utils.linear_trend(np.array([0.0, 1.0, 2.0]), np.array([1.0, 3.0, 5.0]))
+    np.testing.assert_allclose(fitted, 1 + 2 * grid)
+    np.testing.assert_allclose(upper - lower, 0, atol=1e-12)
@@ -1,23 +1,490 @@
+import os
+import shutil
+import hashlib
+import functools
+import multiprocessing.context
+import multiprocessing.spawn
 import streamlit as st
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-import plotly.express as px
-from typing import List
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence
 
-@st.cache_data
-def load_data() -> pd.DataFrame:
+from artifacts import ArtifactCache, read_columns, source_fingerprint, write_columns
+from profiling import profile_step, profiled
+
+# seaborn, matplotlib e plotly.express custam segundos de importação; são importados
+# apenas pelas funções que desenham, para não atrasar o início de páginas que não os usam
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+DATA_PATH = Path('data/base_de_dados_case.csv')
+CACHE_DIR = DATA_PATH.parent / '.cache'
+# Artefatos derivados (DataFrames, agregados e figuras) pré-calculados por precompute.py
+ARTIFACTS = ArtifactCache(
+    CACHE_DIR / 'artifacts', max_bytes=int(os.environ.get('APP_ARTIFACT_CACHE_MB', 2048)) << 20,
+    code_version=source_fingerprint(Path(__file__).resolve().parent)
+)
+ID_COLUMN = 'Unnamed: 0'
+
+# Definições de risco usadas em todo o app
+BAD_ATRASO_DIAS = 180
+LOSS_CORTE = 0.2
+
+REGIOES: dict[str, str] = {
+    'AC': 'Norte', 'AP': 'Norte', 'AM': 'Norte', 'PA': 'Norte', 'RO': 'Norte', 'RR': 'Norte', 'TO': 'Norte',
+    'AL': 'Nordeste', 'BA': 'Nordeste', 'CE': 'Nordeste', 'MA': 'Nordeste', 'PB': 'Nordeste', 'PE': 'Nordeste',
+    'PI': 'Nordeste', 'RN': 'Nordeste', 'SE': 'Nordeste',
+    'DF': 'Centro-Oeste', 'GO': 'Centro-Oeste', 'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste',
+    'ES': 'Sudeste', 'MG': 'Sudeste', 'RJ': 'Sudeste', 'SP': 'Sudeste',
+    'PR': 'Sul', 'RS': 'Sul', 'SC': 'Sul'
+}
+
+# Schema explícito da base. Os tipos numéricos são o alvo de downcast e só são
+# aplicados quando a conversão é exata; caso contrário a coluna fica em 64 bits.
+SCHEMA: dict[str, str] = {
+    'estado': 'category',
+    'setor': 'category',
+    'faturamento_informado': 'float32',
+    'divida_total_pj': 'float32',
+    'score': 'int16',
+    'taxa': 'float32',
+    'atraso_corrente': 'int16',
+    'prazo': 'float32',
+    'valor_contrato': 'float32',
+    'valor_contrato_mais_juros': 'float32',
+    'valor_em_aberto': 'float32',
+}
+NUMERIC_COLUMNS: List[str] = [col for col, dtype in SCHEMA.items() if dtype != 'category']
+# Métricas criadas por `create_new_features` e analisadas na Questão 3
+NEW_METRIC_COLUMNS: List[str] = [
+    'ratio_contrato_faturamento', 'score', 'ratio_valor_prazo', 'ratio_atraso_prazo',
+    'ratio_contrato_faturamento_cat', 'score_cat'
+]
+
+
+def _file_sha256(path: Path) -> str:
+    """
+    Calcula o hash SHA-256 de um arquivo lendo-o em blocos.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _apply_schema(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Carrega os dados da planilha Excel e remove a coluna 'id'.
+    Aplica o SCHEMA ao DataFrame lido do CSV, fazendo downcast apenas quando é sem perda.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com os tipos padrão do pandas.
 
     Retorna:
-    - pd.DataFrame: DataFrame com os dados carregados.
+    - pd.DataFrame: DataFrame com categorias e tipos numéricos reduzidos.
     """
-    df = pd.read_csv('data/base_de_dados_case.csv').drop('Unnamed: 0',axis=1)
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if dtype == 'category':
+            df[col] = df[col].astype('category')
+            continue
+        values = df[col].to_numpy()
+        if np.issubdtype(np.dtype(dtype), np.integer) and not np.issubdtype(values.dtype, np.integer):
+            continue
+        converted = values.astype(dtype)
+        if np.array_equal(converted.astype(values.dtype), values, equal_nan=values.dtype.kind == 'f'):
+            df[col] = converted
     return df
 
+
+def cache_stem(path: Path) -> str:
+    """
+    Nome base dos arquivos de cache derivados de um arquivo de dados.
+
+    Arquivos na pasta de DATA_PATH usam o próprio nome; os demais (ex.: partições com o
+    mesmo nome em pastas diferentes) recebem um sufixo com o hash da pasta.
+    """
+    path = Path(path)
+    parent = path.parent.resolve()
+    if parent == DATA_PATH.parent.resolve():
+        return path.stem
+    return f'{path.stem}-{hashlib.sha1(str(parent).encode()).hexdigest()[:8]}'
+
+
+def _pyarrow():
+    # pyarrow custa centenas de ms de importação: só as funções do sidecar o carregam,
+    # e páginas que não leem a base (ex.: a inicial) não pagam por ele
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # sem pyarrow o loader lê sempre o CSV
+        return None, None
+    return pa, pq
+
+
+def _sidecar_path(path: Path) -> Path:
+    return CACHE_DIR / f'{cache_stem(path)}.parquet'
+
+
+def _stamp_path(path: Path) -> Path:
+    return _sidecar_path(path).with_suffix('.stamp')
+
+
+def _sidecar_is_fresh(path: Path) -> bool:
+    """
+    Indica se o sidecar Parquet ainda corresponde ao CSV de origem.
+
+    O sidecar guarda nos metadados o mtime, o tamanho e o SHA-256 do CSV. Se mtime e
+    tamanho batem, o sidecar é considerado válido; se não, o hash decide. Quando o CSV
+    foi só tocado (hash igual), o novo mtime e tamanho vão para um carimbo ao lado do
+    sidecar, e as leituras seguintes voltam a decidir só pelo `stat`.
+    """
+    sidecar = _sidecar_path(path)
+    pa, pq = _pyarrow()
+    if pq is None or not sidecar.exists():
+        return False
+    try:
+        meta = pq.read_schema(sidecar).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    stat = path.stat()
+    source = f'{stat.st_mtime_ns} {stat.st_size}'
+    if source.encode() == meta.get(b'source_mtime_ns', b'') + b' ' + meta.get(b'source_size', b''):
+        return True
+    sha256 = meta.get(b'source_sha256', b'').decode()
+    stamp = _stamp_path(path)
+    try:
+        if stamp.read_text() == f'{source} {sha256}':
+            return True
+    except OSError:
+        pass
+    if sha256 != _file_sha256(path):
+        return False
+    try:
+        tmp = stamp.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(f'{source} {sha256}')
+        os.replace(tmp, stamp)
+    except OSError:
+        # Diretório somente leitura: o hash continua sendo conferido a cada leitura.
+        pass
+    return True
+
+
+def _read_sidecar(path: Path, columns: Optional[Sequence[str]]) -> Optional[pd.DataFrame]:
+    """
+    Lê o sidecar Parquet se ele estiver atualizado.
+
+    Retorna:
+    - pd.DataFrame ou None: dados do sidecar, ou None se ausente/desatualizado.
+    """
+    if not _sidecar_is_fresh(path):
+        return None
+    return pd.read_parquet(_sidecar_path(path), columns=list(columns) if columns is not None else None)
+
+
+def _write_sidecar(path: Path, df: pd.DataFrame) -> None:
+    """
+    Grava o sidecar Parquet de forma atômica, com a chave do CSV de origem nos metadados.
+    """
+    pa, pq = _pyarrow()
+    if pq is None:
+        return
+    stat = path.stat()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b'source_sha256': _file_sha256(path).encode(),
+        b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+        b'source_size': str(stat.st_size).encode(),
+    })
+    sidecar = _sidecar_path(path)
+    try:
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        tmp = sidecar.with_suffix(f'.{os.getpid()}.tmp')
+        pq.write_table(table, tmp)
+        os.replace(tmp, sidecar)
+    except OSError:
+        # Diretório somente leitura: seguimos apenas com o CSV.
+        pass
+
+
+@profiled()
+def read_contracts(path: Path = DATA_PATH, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Lê a base de contratos com o schema tipado, usando o sidecar Parquet quando válido.
+
+    Se o sidecar estiver ausente ou desatualizado, o CSV é lido por completo, tipado
+    e o sidecar é regravado para as próximas leituras.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de origem.
+    - columns (Sequence[str], opcional): Colunas a carregar. Por padrão, todas.
+
+    Retorna:
+    - pd.DataFrame: DataFrame tipado (inclui a coluna de id original).
+    """
+    path = Path(path)
+    df = _read_sidecar(path, columns)
+    if df is not None:
+        return df
+    df = _apply_schema(pd.read_csv(path))
+    _write_sidecar(path, df)
+    return df[list(columns)] if columns is not None else df
+
+
+def write_contracts(df: pd.DataFrame, path: Path = DATA_PATH) -> None:
+    """
+    Grava a base de contratos no CSV de origem e atualiza o sidecar Parquet.
+
+    O CSV é gravado de forma atômica, com cabeçalho e a coluna de id primeiro e sem
+    nome, como no arquivo original. O sidecar e o armazenamento colunar são gerados a partir
+    do próprio DataFrame, sem reler o CSV.
+
+    Parâmetros:
+    - df (pd.DataFrame): Base completa, com a coluna de id (ID_COLUMN).
+    - path (Path): Caminho do CSV de destino.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    df.rename(columns={ID_COLUMN: ''}).to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    _write_sidecar(path, df)
+    try:
+        build_column_store(path, df)
+    except OSError:
+        pass
+
+
+def iter_contract_chunks(
+    path: Path = DATA_PATH,
+    columns: Optional[Sequence[str]] = None,
+    chunksize: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    """
+    Percorre a base de contratos em blocos de tamanho fixo, sem carregá-la inteira.
+
+    Usa o sidecar Parquet (em lotes) quando ele está atualizado e, caso contrário,
+    lê o CSV em chunks. Nenhum dos caminhos regrava o sidecar.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de origem.
+    - columns (Sequence[str], opcional): Colunas a carregar. Por padrão, todas.
+    - chunksize (int): Número máximo de linhas por bloco.
+
+    Retorna:
+    - Iterator[pd.DataFrame]: Blocos consecutivos da base, na ordem do arquivo.
+    """
+    path = Path(path)
+    columns = list(columns) if columns is not None else None
+    if _sidecar_is_fresh(path):
+        parquet_file = _pyarrow()[1].ParquetFile(_sidecar_path(path))
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        yield chunk[columns] if columns is not None else chunk
+
+
+def data_version(path: Path = DATA_PATH) -> tuple[int, int]:
+    """
+    Identificador barato da versão do arquivo de dados, usado nas chaves de cache.
+
+    Retorna:
+    - tuple[int, int]: mtime (ns) e tamanho do arquivo.
+    """
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class AppWorkerProcess(multiprocessing.context.SpawnProcess):
+    """
+    Processo 'spawn' dos pools do app. O nome ('AppWorkerProcess-N') marca o processo
+    para `_preparation_data`: o filho não reexecuta o `__main__` do pai.
+    """
+
+
+class _WorkerContext(multiprocessing.context.SpawnContext):
+    Process = AppWorkerProcess
+
+
+def _without_main(get_preparation_data):
+    """
+    Envolve `multiprocessing.spawn.get_preparation_data` para omitir o módulo principal
+    nos processos de AppWorkerProcess.
+
+    O Streamlit instala o script da página como `__main__` (e o deixa lá entre as
+    execuções); com 'spawn', cada worker novo o reexecutaria ao iniciar. Sem ele, o
+    worker importa só os módulos das funções das tarefas. Os demais processos não mudam.
+    """
+    @functools.wraps(get_preparation_data)
+    def wrapper(name):
+        data = get_preparation_data(name)
+        if name.startswith(AppWorkerProcess.__name__):
+            data.pop('init_main_from_path', None)
+            data.pop('init_main_from_name', None)
+        return data
+    wrapper.skips_app_main = True
+    return wrapper
+
+
+# Instalado uma vez, na importação (sob a trava de importação), e nunca desfeito
+if not getattr(multiprocessing.spawn.get_preparation_data, 'skips_app_main', False):
+    multiprocessing.spawn.get_preparation_data = _without_main(multiprocessing.spawn.get_preparation_data)
+
+_WORKER_CONTEXT = _WorkerContext()
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """
+    Contexto 'spawn' para os pools de processos do app (`mp_context` do ProcessPoolExecutor).
+
+    Seguro dentro do servidor do Streamlit, que tem várias threads, e sem reexecutar a
+    página nos workers (ver `AppWorkerProcess`). As funções das tarefas precisam estar em
+    módulos importáveis, não no script da página.
+    """
+    return _WORKER_CONTEXT
+
+
+def _column_store_dir(path: Path) -> Path:
+    mtime_ns, size = data_version(path)
+    return CACHE_DIR / f'{cache_stem(path)}.columns' / f'{mtime_ns}-{size}'
+
+
+def build_column_store(path: Path = DATA_PATH, df: Optional[pd.DataFrame] = None) -> Path:
+    """
+    Grava a base em um armazenamento colunar: um arquivo `.npy` por coluna.
+
+    Colunas categóricas (e de texto) são gravadas com codificação de dicionário: os
+    códigos inteiros no `.npy` e as categorias no 'manifest.json'. A pasta é específica
+    da versão do arquivo de origem e é criada de forma atômica (gravada em uma pasta
+    temporária e renomeada); versões anteriores são removidas.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de origem.
+    - df (pd.DataFrame, opcional): Base já tipada (ex.: de `read_contracts`). Por padrão, lida de `path`.
+
+    Retorna:
+    - Path: Pasta do armazenamento.
+    """
+    path = Path(path)
+    store = _column_store_dir(path)
+    if (store / 'manifest.json').exists():
+        return store
+    df = read_contracts(path) if df is None else df
+
+    tmp = store.with_name(f'{store.name}.{os.getpid()}.tmp')
+    write_columns(tmp, df)
+    try:
+        os.rename(tmp, store)
+    except OSError:
+        # Outro processo gravou a mesma versão primeiro
+        shutil.rmtree(tmp, ignore_errors=True)
+    for old in store.parent.iterdir():
+        if old != store and not old.name.endswith('.tmp'):
+            # Processos que ainda mapeiam a versão antiga continuam lendo os arquivos removidos
+            shutil.rmtree(old, ignore_errors=True)
+    return store
+
+
+@profiled()
+def open_column_store(path: Path = DATA_PATH) -> pd.DataFrame:
+    """
+    Abre o armazenamento colunar da base como um DataFrame mapeado em memória.
+
+    Cada coluna é um `np.memmap` somente leitura, sem cópia: processos que abrem a mesma
+    versão compartilham as páginas do arquivo no cache do sistema operacional, e só as
+    colunas efetivamente usadas são lidas do disco. As funções de `utils` rodam sobre
+    o DataFrame normalmente; operações que alteram colunas criam arrays novos.
+
+    O armazenamento é criado com `build_column_store` se ainda não existir para a
+    versão atual do arquivo.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de origem.
+
+    Retorna:
+    - pd.DataFrame: Base tipada (inclui a coluna de id), com categorias para 'estado' e 'setor'.
+    """
+    path = Path(path)
+    store = _column_store_dir(path)
+    if not (store / 'manifest.json').exists():
+        store = build_column_store(path)
+    return read_columns(store)
+
+
+@st.cache_resource
+def _load_data_cached(columns: Optional[tuple[str, ...]], version: tuple[int, int]) -> pd.DataFrame:
+    try:
+        df = open_column_store(DATA_PATH)
+    except OSError:
+        # Pasta de cache sem permissão de escrita: base em memória
+        df = read_contracts(DATA_PATH)
+    if columns is None:
+        return df.drop(columns=ID_COLUMN)
+    return df[list(columns)]
+
+
+@profiled()
+def load_data(columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Carrega os dados da base de contratos e remove a coluna 'id'.
+
+    As colunas vêm do armazenamento colunar mapeado em memória (`open_column_store`),
+    compartilhado entre processos pelo cache de páginas do sistema operacional. O
+    cache do Streamlit é indexado pelas colunas pedidas e pelo mtime/tamanho do CSV,
+    de modo que uma nova versão do arquivo invalida o resultado memoizado. O DataFrame
+    é compartilhado entre execuções e sessões sem cópia e deve ser tratado como
+    somente leitura.
+
+    Parâmetros:
+    - columns (Sequence[str], opcional): Colunas a carregar. Por padrão, todas exceto o id.
+
+    Retorna:
+    - pd.DataFrame: DataFrame com os dados carregados.
+    """
+    return _load_data_cached(tuple(columns) if columns is not None else None, data_version())
+
+
+def read_contracts_head(path: Path = DATA_PATH, n_rows: int = 5) -> pd.DataFrame:
+    """
+    Lê apenas as primeiras linhas do CSV, com o schema tipado, sem percorrer o resto do arquivo.
+
+    As colunas categóricas têm apenas as categorias presentes nas linhas lidas.
+
+    Parâmetros:
+    - path (Path): Caminho do CSV de origem.
+    - n_rows (int): Número de linhas.
+
+    Retorna:
+    - pd.DataFrame: Primeiras linhas (inclui a coluna de id original).
+    """
+    return _apply_schema(pd.read_csv(path, nrows=n_rows))
+
+
+@st.cache_data
+def _load_preview_cached(n_rows: int, version: tuple[int, int]) -> pd.DataFrame:
+    return read_contracts_head(DATA_PATH, n_rows).drop(columns=ID_COLUMN)
+
+
+@profiled()
+def load_preview(n_rows: int = 5) -> pd.DataFrame:
+    """
+    Primeiras linhas da base, sem a coluna 'id', para a visualização rápida da página inicial.
+
+    Não carrega a base inteira nem o armazenamento colunar.
+
+    Parâmetros:
+    - n_rows (int): Número de linhas.
+
+    Retorna:
+    - pd.DataFrame: Primeiras linhas da base.
+    """
+    return _load_preview_cached(n_rows, data_version())
+
 # Questão 1: Métricas Gerais
+@profiled()
 def calculate_metrics(df: pd.DataFrame) -> tuple[float, float, float]:
     """
     Calcula métricas gerais de crédito.
@@ -36,6 +503,7 @@ def calculate_metrics(df: pd.DataFrame) -> tuple[float, float, float]:
     return ticket_medio, taxa_media, prazo_medio
 
 # Questão 2: BAD e Loss
+@profiled()
 def create_bad_column(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Cria a coluna 'Bad' indicando maus pagadores e separa DataFrames de bons e maus.
@@ -44,16 +512,21 @@ def create_bad_column(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.
     - df (pd.DataFrame): DataFrame original com coluna 'atraso_corrente'.
 
     Retorna:
-    - df (pd.DataFrame): DataFrame original com coluna 'Bad'.
+    - df (pd.DataFrame): Cópia rasa do DataFrame original com coluna 'Bad'. O original não é alterado.
     - df_bad (pd.DataFrame): Subset com Bad == 1.
     - df_good (pd.DataFrame): Subset com Bad == 0.
+
+    Os subsets são cópias; para comparar médias, variâncias ou correlações entre as classes,
+    prefira `moments.ClassMoments`, que não os materializa.
     """
-    df['Bad'] = (df['atraso_corrente'] > 180).astype(int)
+    df = df.copy(deep=False)
+    df['Bad'] = _bad_flag(df)
     df_bad: pd.DataFrame = df[df['Bad'] == 1].reset_index(drop=True)
     df_good: pd.DataFrame = df[df['Bad'] == 0].reset_index(drop=True)
     return df, df_bad, df_good
 
 
+@profiled()
 def create_loss_column(df: pd.DataFrame) -> pd.DataFrame:
     """
     Cria as colunas 'Loss' e 'Loss_cat' para análise de perda.
@@ -62,14 +535,74 @@ def create_loss_column(df: pd.DataFrame) -> pd.DataFrame:
     - df (pd.DataFrame): DataFrame com colunas 'valor_em_aberto' e 'valor_contrato_mais_juros'.
 
     Retorna:
-    - pd.DataFrame: DataFrame com colunas 'Loss' e 'Loss_cat'.
+    - pd.DataFrame: Cópia rasa do DataFrame com colunas 'Loss' e 'Loss_cat'. O original não é alterado.
+    """
+    df = df.copy(deep=False)
+    df['Loss'] = _loss_ratio(df)
+    df['Loss_cat'] = _above_threshold(df['Loss'], LOSS_CORTE)
+    return df
+
+
+def _bad_flag(df: pd.DataFrame) -> pd.Series:
+    return (df['atraso_corrente'] > BAD_ATRASO_DIAS).astype(int)
+
+
+def _loss_ratio(df: pd.DataFrame) -> pd.Series:
+    return df['valor_em_aberto'] / df['valor_contrato_mais_juros']
+
+
+def _above_threshold(values: pd.Series, threshold: float) -> pd.Series:
+    """
+    Equivalente a `pd.cut(values, bins=[0, threshold, inf], labels=[0, 1], include_lowest=True)`
+    para valores não negativos, sem criar a categoria intermediária.
+    """
+    return (values > threshold).astype(int)
+
+
+@profiled()
+def derive_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deriva de uma só vez todas as colunas usadas pelas páginas do app.
+
+    Cria 'Bad', 'Loss', 'Loss_cat', 'regiao' e as métricas de concessão de
+    `create_new_features`, coluna a coluna, sobre uma cópia rasa: as colunas da base
+    são compartilhadas com o DataFrame original, que não é alterado.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame retornado por `load_data`.
+
+    Retorna:
+    - pd.DataFrame: DataFrame com as colunas originais e as derivadas.
     """
-    df['Loss'] = df['valor_em_aberto'] / df['valor_contrato_mais_juros']
-    df['Loss_cat'] = pd.cut(
-        df['Loss'], bins=[0, 0.2, float('inf')], labels=[0, 1], include_lowest=True
-    ).astype(int)
+    df = df.copy(deep=False)
+    df['Bad'] = _bad_flag(df)
+    df['Loss'] = _loss_ratio(df)
+    df['Loss_cat'] = _above_threshold(df['Loss'], LOSS_CORTE)
+    df['regiao'] = df['estado'].map(REGIOES)
+    for col, values in _new_feature_columns(df).items():
+        df[col] = values
     return df
 
+
+@st.cache_resource
+@ARTIFACTS.cached('features')
+def _load_features_cached(version: tuple[int, int]) -> pd.DataFrame:
+    return derive_features(load_data())
+
+
+@profiled()
+def load_features() -> pd.DataFrame:
+    """
+    Retorna a base com as colunas derivadas, calculada uma vez por versão do arquivo.
+
+    O resultado é compartilhado entre execuções e sessões sem cópia; deve ser tratado
+    como somente leitura.
+
+    Retorna:
+    - pd.DataFrame: Resultado de `derive_features(load_data())`.
+    """
+    return _load_features_cached(data_version())
+
 # Funções de plotagem reutilizáveis
 def plot_seaborn_histogram(
     df: pd.DataFrame,
@@ -86,17 +619,38 @@ def plot_seaborn_histogram(
     - hue (str): Coluna categórica usada como 'hue'.
     - title (str): Título do gráfico.
     """
-    df_hist = df.copy().round(2)
-    plt.figure(figsize=(6, 4))
+    fig = build_histogram_figure(df, x, hue, title)
+    with profile_step('st.pyplot'):
+        st.pyplot(fig)
+
+
+@profiled()
+def build_histogram_figure(
+    df: pd.DataFrame,
+    x: str,
+    hue: str,
+    title: str
+) -> 'Figure':
+    """
+    Monta a figura de `plot_seaborn_histogram` sem usar o estado global do pyplot.
+
+    Retorna:
+    - matplotlib.figure.Figure: Figura do histograma.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    df_hist = pd.DataFrame({x: df[x].round(2), hue: df[hue]})
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
     sns.histplot(
         data=df_hist, x=x, hue=hue, kde=True,
-        element="step", common_norm=False, stat='density'
+        element="step", common_norm=False, stat='density', ax=ax
     )
-    plt.title(title, fontsize=10)
-    plt.xlabel(x, fontsize=8)
-    plt.ylabel("Densidade", fontsize=8)
-    st.pyplot(plt)
-    plt.clf()
+    ax.set_title(title, fontsize=10)
+    ax.set_xlabel(x, fontsize=8)
+    ax.set_ylabel("Densidade", fontsize=8)
+    return fig
 
 
 def plot_boxplot(
@@ -114,39 +668,227 @@ def plot_boxplot(
     - y (str): Coluna numérica no eixo Y.
     - title (str): Título do gráfico.
     """
-    plt.figure(figsize=(6, 4))
-    sns.boxplot(data=df, x=x, y=y)
-    plt.title(title, fontsize=10)
-    st.pyplot(plt)
-    plt.clf()
+    fig = build_boxplot_figure(df, x, y, title)
+    with profile_step('st.pyplot'):
+        st.pyplot(fig)
+
+
+@profiled()
+def build_boxplot_figure(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    title: str
+) -> 'Figure':
+    """
+    Monta a figura de `plot_boxplot` sem usar o estado global do pyplot.
+
+    Retorna:
+    - matplotlib.figure.Figure: Figura do boxplot.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.boxplot(data=df, x=x, y=y, ax=ax)
+    ax.set_title(title, fontsize=10)
+    return fig
+
+
+def stratified_sample(
+    df: pd.DataFrame,
+    column: str,
+    n: int,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Amostra até `n` linhas mantendo todas as classes de `column`.
+
+    Cada classe tem reservadas `n // (2 * n_classes)` linhas (ou a classe inteira, se
+    menor) e o restante é dividido proporcionalmente ao tamanho das classes, de modo
+    que a classe minoritária continua visível no gráfico.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com os dados.
+    - column (str): Coluna de classe usada para estratificar.
+    - n (int): Tamanho aproximado da amostra.
+    - seed (int): Semente do gerador aleatório.
+
+    Retorna:
+    - pd.DataFrame: Amostra estratificada.
+    """
+    if len(df) <= n:
+        return df
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(df[column])
+    sizes = np.bincount(codes[codes >= 0])
+    reserved = np.minimum(sizes, n // (2 * len(sizes)))
+    capacity = sizes - reserved
+    quotas = reserved + np.floor((n - reserved.sum()) * capacity / capacity.sum()).astype(int)
+    positions = np.concatenate([
+        rng.choice(np.flatnonzero(codes == code), quota, replace=False)
+        for code, quota in enumerate(quotas)
+    ])
+    return df.iloc[np.sort(positions)]
+
+
+def linear_trend(
+    x: np.ndarray,
+    y: np.ndarray,
+    grid_size: int = 100,
+    z: float = 1.96
+) -> Optional[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Reta de mínimos quadrados com intervalo de confiança analítico para a média.
+
+    Substitui o bootstrap do `sns.regplot`: usa as somas suficientes de x e y e o erro
+    padrão da previsão média, `s * sqrt(1/n + (x - x̄)² / Sxx)`.
+
+    Parâmetros:
+    - x (np.ndarray): Valores do eixo X.
+    - y (np.ndarray): Valores do eixo Y.
+    - grid_size (int): Número de pontos em que a reta é avaliada.
+    - z (float): Quantil da normal para o intervalo (1.96 = 95%).
+
+    Retorna:
+    - grid, fitted, lower, upper (np.ndarray): Grade de X, reta ajustada e limites do intervalo,
+      ou None se houver menos de dois valores distintos de X entre os pontos finitos.
+    """
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite].astype(np.float64), y[finite].astype(np.float64)
+    n = len(x)
+    if n < 2 or x.min() == x.max():
+        return None
+    x_mean, y_mean = x.mean(), y.mean()
+    sxx = ((x - x_mean) ** 2).sum()
+    slope = ((x - x_mean) * (y - y_mean)).sum() / sxx
+    intercept = y_mean - slope * x_mean
+    residual_var = ((y - intercept - slope * x) ** 2).sum() / max(n - 2, 1)
+
+    grid = np.linspace(x.min(), x.max(), grid_size)
+    fitted = intercept + slope * grid
+    se = np.sqrt(residual_var * (1 / n + (grid - x_mean) ** 2 / sxx))
+    return grid, fitted, fitted - z * se, fitted + z * se
+
+
+# Acima deste número de linhas, plot_scatter troca o scatter completo pelo modo escalável
+SCATTER_MAX_POINTS = 20_000
 
 
 def plot_scatter(
     df: pd.DataFrame,
     base: str,
-    features: list[str]
+    features: list[str],
+    max_points: int = SCATTER_MAX_POINTS
 ) -> None:
     """
     Plota scatter plots com linha de tendência para múltiplas features.
 
+    Até `max_points` linhas, desenha todos os pontos com `sns.regplot`. Acima disso usa
+    o modo escalável: densidade hexbin quando `base` é contínua, amostra estratificada
+    quando `base` é binária (mantendo as duas classes) e, em ambos os casos, a reta de
+    `linear_trend` calculada sobre todas as linhas, com intervalo analítico.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com os dados.
+    - base (str): Coluna do eixo Y.
+    - features (list[str]): Lista de colunas do eixo X.
+    - max_points (int): Limite de linhas para o modo completo.
+    """
+    fig = build_scatter_figure(df, base, features, max_points)
+    with profile_step('st.pyplot'):
+        st.pyplot(fig)
+
+
+@profiled()
+def build_scatter_figure(
+    df: pd.DataFrame,
+    base: str,
+    features: list[str],
+    max_points: int = SCATTER_MAX_POINTS,
+    ncols: int = 4
+) -> 'Figure':
+    """
+    Monta a grade de `plot_scatter` sem usar o estado global do pyplot.
+
+    Com uma única feature, gera uma figura pequena e independente, adequada para ser
+    renderizada em paralelo (ver `rendering.display_figures`).
+
     Parâmetros:
     - df (pd.DataFrame): DataFrame com os dados.
     - base (str): Coluna do eixo Y.
     - features (list[str]): Lista de colunas do eixo X.
+    - max_points (int): Limite de linhas para o modo completo.
+    - ncols (int): Número de colunas da grade.
+
+    Retorna:
+    - matplotlib.figure.Figure: Figura com um eixo por feature.
     """
-    plt.figure(figsize=(20, 15))
-    for i, feat in enumerate(features):
-        plt.subplot(4, 4, i + 1)
-        sns.scatterplot(data=df, x=feat, y=base, alpha=0.6)
-        sns.regplot(data=df, x=feat, y=base, scatter=False, color='red')
-        plt.title(f'{base} vs {feat}')
-        plt.xlabel(feat)
-        plt.ylabel(base)
-    plt.tight_layout()
-    st.pyplot(plt)
-    plt.clf()
+    import seaborn as sns
+    from matplotlib.figure import Figure
 
+    scalable = len(df) > max_points
+    binary_base = scalable and df[base].nunique() <= 2
+    sample = stratified_sample(df, base, max_points) if binary_base else df
 
+    ncols = min(ncols, len(features))
+    nrows = -(-len(features) // ncols)
+    fig = Figure(figsize=(5 * ncols, 3.75 * nrows))
+    axes = fig.subplots(nrows, ncols, squeeze=False).ravel()
+    for ax, feat in zip(axes, features):
+        if not scalable:
+            sns.scatterplot(data=df, x=feat, y=base, alpha=0.6, ax=ax)
+            sns.regplot(data=df, x=feat, y=base, scatter=False, color='red', ax=ax)
+        else:
+            if binary_base:
+                sns.scatterplot(data=sample, x=feat, y=base, hue=base, alpha=0.3, s=10, legend=False, ax=ax)
+            else:
+                ax.hexbin(df[feat], df[base], gridsize=60, bins='log', mincnt=1, cmap='viridis')
+            trend = linear_trend(df[feat].to_numpy(), df[base].to_numpy())
+            if trend is not None:
+                grid, fitted, lower, upper = trend
+                ax.plot(grid, fitted, color='red')
+                ax.fill_between(grid, lower, upper, color='red', alpha=0.15)
+        ax.set_title(f'{base} vs {feat}')
+        ax.set_xlabel(feat)
+        ax.set_ylabel(base)
+    for ax in axes[len(features):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def scatter_jobs(
+    df: pd.DataFrame,
+    base: str,
+    features: list[str],
+    max_points: int = SCATTER_MAX_POINTS
+) -> dict[str, tuple]:
+    """
+    Um job de `build_scatter_figure` por feature, para `rendering.display_figures`.
+
+    Cada job recebe apenas as duas colunas que usa.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com os dados.
+    - base (str): Coluna do eixo Y.
+    - features (list[str]): Lista de colunas do eixo X.
+    - max_points (int): Limite de linhas para o modo completo.
+
+    Retorna:
+    - dict[str, tuple]: Jobs (função, argumentos) indexados pela feature.
+    """
+    return {
+        feat: (build_scatter_figure, {
+            'df': df[list(dict.fromkeys([feat, base]))],
+            'base': base, 'features': [feat], 'max_points': max_points
+        })
+        for feat in features
+    }
+
+
+@profiled()
 def plot_correlation_matrix(
     df: pd.DataFrame,
     title: str
@@ -162,10 +904,26 @@ def plot_correlation_matrix(
     - plotly.graph_objects.Figure: Figura da matriz de correlação.
     """
     corr = df.select_dtypes(include=[np.number]).corr()
-    fig = px.imshow(corr, text_auto=True, aspect='auto', title=title)
-    return fig
+    return plot_correlation_heatmap(corr, title)
+
+
+def plot_correlation_heatmap(corr: pd.DataFrame, title: str):
+    """
+    Desenha uma matriz de correlação já calculada (ex.: `moments.ClassMoments.correlation`).
+
+    Parâmetros:
+    - corr (pd.DataFrame): Matriz de correlação.
+    - title (str): Título da figura.
+
+    Retorna:
+    - plotly.graph_objects.Figure: Figura da matriz de correlação.
+    """
+    import plotly.express as px
+
+    return px.imshow(corr, text_auto=True, aspect='auto', title=title)
 
 # Questão 3: Novas Métricas
+@profiled()
 def create_new_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Cria novas métricas para análise de crédito disponiveis no momento da concessão.
@@ -174,25 +932,148 @@ def create_new_features(df: pd.DataFrame) -> pd.DataFrame:
     - df (pd.DataFrame): DataFrame original com colunas necessárias.
 
     Retorna:
-    - pd.DataFrame: DataFrame com métricas 'ratio_contrato_faturamento',
-      'ratio_valor_prazo' e 'ratio_atraso_prazo'.
+    - pd.DataFrame: Cópia rasa do DataFrame com métricas 'ratio_contrato_faturamento',
+      'ratio_valor_prazo' e 'ratio_atraso_prazo'. O original não é alterado.
     """
-    df_new = df.copy()
-    df_new['ratio_contrato_faturamento'] = df_new['valor_contrato_mais_juros'] / df_new['faturamento_informado']
-    df_new['ratio_contrato_faturamento_cat'] = pd.cut(df_new['ratio_contrato_faturamento'], bins=[0,0.25,float('inf')], labels=[0,1],include_lowest=True).astype(int)
-    df_new['ratio_valor_prazo'] = df_new['valor_em_aberto'] / df_new['prazo']
-    df_new['ratio_atraso_prazo'] = df_new['atraso_corrente'] / df_new['prazo']
-    df_new['score_cat'] = pd.cut(df_new['score'], bins=[0,400,float('inf')], labels=[0,1],include_lowest=True).astype(int)
-    return df_new.fillna(0)
+    df_new = df.copy(deep=False)
+    for col, values in _new_feature_columns(df).items():
+        df_new[col] = values
+    return df_new
 
 
-def analyze_categorical_features(
+def _new_feature_columns(df: pd.DataFrame) -> dict[str, pd.Series]:
+    """
+    Calcula as métricas de concessão, com NaN (divisões 0/0) substituído por 0.
+    """
+    ratio_contrato_faturamento = (df['valor_contrato_mais_juros'] / df['faturamento_informado']).fillna(0)
+    return {
+        'ratio_contrato_faturamento': ratio_contrato_faturamento,
+        'ratio_contrato_faturamento_cat': _above_threshold(ratio_contrato_faturamento, 0.25),
+        'ratio_valor_prazo': (df['valor_em_aberto'] / df['prazo']).fillna(0),
+        'ratio_atraso_prazo': (df['atraso_corrente'] / df['prazo']).fillna(0),
+        'score_cat': _above_threshold(df['score'], 400),
+    }
+
+
+@profiled()
+def compute_risk_tables(
     df: pd.DataFrame,
     categorical_columns: List[str],
+    class_columns: List[str]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Calcula, em uma passada por variável categórica, as tabelas de risco de todos os alvos.
+
+    Os alvos binários são combinados em um único código por linha e, junto com os
+    códigos da categoria, contados com `np.bincount`. Categorias sem nenhum caso de
+    uma das classes aparecem com contagem zero.
+
+    Parâmetros:
+    - df (pd.DataFrame): DataFrame com as colunas categóricas e de classe.
+    - categorical_columns (List[str]): Colunas categóricas a resumir ('regiao' é derivada de 'estado' se ausente).
+    - class_columns (List[str]): Colunas binárias alvo (0 = bom pagador, 1 = mau pagador).
+
+    Retorna:
+    - tabelas (pd.DataFrame): Formato longo, uma linha por ('variavel', 'alvo', 'categoria'), com
+      totais e percentuais internos e globais de bom e mau pagador.
+    - totais (pd.DataFrame): Totais e percentuais globais de cada classe, indexados pelo alvo.
+    """
+    n_alvos = len(class_columns)
+    target_code = np.zeros(len(df), dtype=np.int64)
+    for bit, class_column in enumerate(class_columns):
+        target_code |= df[class_column].to_numpy(dtype=np.int64) << bit
+    n_combos = 1 << n_alvos
+    mau_mask = np.array([[(combo >> bit) & 1 for combo in range(n_combos)] for bit in range(n_alvos)], dtype=bool)
+
+    global_counts = np.bincount(target_code, minlength=n_combos)
+    n_total = global_counts.sum()
+    totais_mau = (mau_mask * global_counts).sum(axis=1)
+    totais_bom = n_total - totais_mau
+    totais = pd.DataFrame({
+        'Total Bom Pagador': totais_bom,
+        'Total Mau Pagador': totais_mau,
+        '% Bom Pagador': percent_of(totais_bom, n_total),
+        '% Mau Pagador': percent_of(totais_mau, n_total),
+    }, index=pd.Index(class_columns, name='alvo'))
+
+    partes = []
+    for col in categorical_columns:
+        values = df[col] if col in df.columns else df['estado'].map(REGIOES)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, labels = values.cat.codes.to_numpy(dtype=np.int64), values.cat.categories
+        else:
+            codes, labels = pd.factorize(values, sort=True)
+        valid = codes >= 0
+        counts = np.bincount(
+            codes[valid] * n_combos + target_code[valid], minlength=len(labels) * n_combos
+        ).reshape(len(labels), n_combos)
+        total_categoria = counts.sum(axis=1)
+        observed = np.flatnonzero(total_categoria > 0)
+        observed = observed[np.argsort(np.asarray(labels[observed], dtype=object))]
+
+        for bit, class_column in enumerate(class_columns):
+            mau = counts[observed][:, mau_mask[bit]].sum(axis=1)
+            bom = total_categoria[observed] - mau
+            partes.append(pd.DataFrame({
+                'variavel': col,
+                'alvo': class_column,
+                'categoria': labels[observed],
+                'Total Bom Pagador': bom,
+                'Total Mau Pagador': mau,
+                '% Interno Bom Pagador': percent_of(bom, bom + mau),
+                '% Interno Mau Pagador': percent_of(mau, bom + mau),
+                '% Global Bom Pagador': percent_of(bom, totais_bom[bit]),
+                '% Global Mau Pagador': percent_of(mau, totais_mau[bit]),
+            }))
+    return pd.concat(partes, ignore_index=True), totais
+
+
+def percent_of(numerator: np.ndarray, denominator) -> np.ndarray:
+    """
+    Percentual com denominador zero tratado como 0% em vez de NaN/erro.
+    """
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.broadcast_to(np.asarray(denominator, dtype=np.float64), numerator.shape)
+    return np.divide(numerator * 100, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+@st.cache_data
+@ARTIFACTS.cached('risk_tables')
+def _load_risk_tables_cached(
+    categorical_columns: tuple[str, ...],
+    class_columns: tuple[str, ...],
+    version: tuple[int, int]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    return compute_risk_tables(load_features(), list(categorical_columns), list(class_columns))
+
+
+@profiled()
+def load_risk_tables(
+    categorical_columns: List[str],
+    class_columns: List[str]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Versão memoizada de `compute_risk_tables` sobre `load_features()`, por versão do arquivo.
+
+    Parâmetros:
+    - categorical_columns (List[str]): Colunas categóricas a resumir.
+    - class_columns (List[str]): Colunas binárias alvo.
+
+    Retorna:
+    - tuple[pd.DataFrame, pd.DataFrame]: Tabelas e totais, como em `compute_risk_tables`.
+    """
+    return _load_risk_tables_cached(tuple(categorical_columns), tuple(class_columns), data_version())
+
+
+@profiled()
+def render_categorical_analysis(
+    tabelas: pd.DataFrame,
+    totais: pd.DataFrame,
+    categorical_columns: List[str],
     class_column: str = 'Bad'
 ) -> None:
     """
-    Realiza análise exploratória para múltiplas variáveis categóricas em relação a uma variável de classe binária.
+    Exibe no Streamlit a análise categórica a partir das tabelas de `compute_risk_tables`.
 
     Para cada variável categórica:
     - Exibe totais globais e percentuais da classe alvo
@@ -201,58 +1082,33 @@ def analyze_categorical_features(
     - Plota gráfico de barras empilhadas da proporção interna usando Plotly e exibe no Streamlit
 
     Parâmetros:
-    -----------
-    df : pd.DataFrame
-        DataFrame contendo os dados.
-    categorical_columns : List[str]
-        Lista de colunas categóricas a serem analisadas.
-    class_column : str, default='Bad'
-        Nome da coluna da variável binária alvo (ex: 0 = bom pagador, 1 = mau pagador).
-
-    Retorno:
-    --------
-    None
-        Função exibe resultados diretamente no Streamlit.
+    - tabelas (pd.DataFrame): Tabelas em formato longo de `compute_risk_tables`.
+    - totais (pd.DataFrame): Totais globais de `compute_risk_tables`.
+    - categorical_columns (List[str]): Colunas categóricas a exibir.
+    - class_column (str): Alvo a exibir.
     """
-    df = df.copy()
-    if 'regiao' not in df.columns and 'estado' in df.columns:
-        df['regiao'] = df['estado'].map({
-            'AC': 'Norte', 'AP': 'Norte', 'AM': 'Norte', 'PA': 'Norte', 'RO': 'Norte', 'RR': 'Norte', 'TO': 'Norte',
-            'AL': 'Nordeste', 'BA': 'Nordeste', 'CE': 'Nordeste', 'MA': 'Nordeste', 'PB': 'Nordeste', 'PE': 'Nordeste',
-            'PI': 'Nordeste', 'RN': 'Nordeste', 'SE': 'Nordeste',
-            'DF': 'Centro-Oeste', 'GO': 'Centro-Oeste', 'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste',
-            'ES': 'Sudeste', 'MG': 'Sudeste', 'RJ': 'Sudeste', 'SP': 'Sudeste',
-            'PR': 'Sul', 'RS': 'Sul', 'SC': 'Sul'
-        })
+    import plotly.express as px
 
-    total_classe = df[class_column].value_counts()
-    total_classe_percent = df[class_column].value_counts(normalize=True) * 100
+    total = totais.loc[class_column]
 
     st.markdown("📌 **Totais globais:**")
-    st.markdown(f"**Total Bom Pagador ({class_column} = 0):** {total_classe[0]} ({total_classe_percent[0]:.2f}%)  ")
-    st.markdown(f"**Total Mau Pagador ({class_column} = 1):** {total_classe[1]} ({total_classe_percent[1]:.2f}%)")
+    st.markdown(f"**Total Bom Pagador ({class_column} = 0):** {int(total['Total Bom Pagador'])} ({total['% Bom Pagador']:.2f}%)  ")
+    st.markdown(f"**Total Mau Pagador ({class_column} = 1):** {int(total['Total Mau Pagador'])} ({total['% Mau Pagador']:.2f}%)")
 
     for col in categorical_columns:
         st.markdown(f"\n📊 **Análise categórica: {col}**")
-        freq_abs = df.groupby([col, class_column]).size().unstack(fill_value=0)
-        freq_prop_interna = freq_abs.div(freq_abs.sum(axis=1), axis=0) * 100
-        freq_prop_global = pd.DataFrame({
-            '% Global Bom Pagador': freq_abs[0] / total_classe[0] * 100,
-            '% Global Mau Pagador': freq_abs[1] / total_classe[1] * 100
-        })
-
-        resumo = freq_abs.copy()
-        resumo.columns = ['Total Bom Pagador', 'Total Mau Pagador']
-        resumo['% Interno Bom Pagador'] = freq_prop_interna[0]
-        resumo['% Interno Mau Pagador'] = freq_prop_interna[1]
-        resumo['% Global Bom Pagador'] = freq_prop_global['% Global Bom Pagador']
-        resumo['% Global Mau Pagador'] = freq_prop_global['% Global Mau Pagador']
+        resumo = (
+            tabelas[(tabelas['variavel'] == col) & (tabelas['alvo'] == class_column)]
+            .drop(columns=['variavel', 'alvo'])
+            .set_index('categoria')
+            .rename_axis(col)
+        )
 
         st.markdown("\n📌 **Resumo por categoria:**")
         st.write(resumo.round(2))
 
-        limite_mau = 1.1 * total_classe_percent[1]
-        limite_bom = 1.1 * total_classe_percent[0]
+        limite_mau = 1.1 * total['% Mau Pagador']
+        limite_bom = 1.1 * total['% Bom Pagador']
         alto_risco = resumo[resumo['% Interno Mau Pagador'] > limite_mau]
         alto_desempenho = resumo[resumo['% Interno Bom Pagador'] > limite_bom]
 
@@ -261,5 +1117,36 @@ def analyze_categorical_features(
         st.markdown(f"\n✅ **Categorias com desempenho acima da média global ({limite_bom:.2f}%):**")
         st.write(alto_desempenho.round(2))
 
+        freq_prop_interna = resumo[['% Interno Bom Pagador', '% Interno Mau Pagador']].set_axis([0, 1], axis=1).rename_axis(class_column, axis=1)
         fig = px.bar(freq_prop_interna, barmode='stack', title=f'Proporção (%) de Bom e Mau Pagador por "{col}"')
         st.plotly_chart(fig)
+
+
+def analyze_categorical_features(
+    df: pd.DataFrame,
+    categorical_columns: List[str],
+    class_column: str = 'Bad'
+) -> None:
+    """
+    Realiza análise exploratória para múltiplas variáveis categóricas em relação a uma variável de classe binária.
+
+    Calcula as tabelas com `compute_risk_tables` e as exibe com `render_categorical_analysis`.
+    Para exibir vários alvos sobre os mesmos dados, prefira calcular as tabelas uma vez
+    (ou usar `load_risk_tables`) e chamar apenas a renderização.
+
+    Parâmetros:
+    -----------
+    df : pd.DataFrame
+        DataFrame contendo os dados.
+    categorical_columns : List[str]
+        Lista de colunas categóricas a serem analisadas.
+    class_column : str, default='Bad'
+        Nome da coluna da variável binária alvo (ex: 0 = bom pagador, 1 = mau pagador).
+
+    Retorno:
+    --------
+    None
+        Função exibe resultados diretamente no Streamlit.
+    """
+    tabelas, totais = compute_risk_tables(df, categorical_columns, [class_column])
+    render_categorical_analysis(tabelas, totais, categorical_columns, class_column)